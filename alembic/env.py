@@ -46,6 +46,19 @@ def run_migrations_online() -> None:
         connection.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
         connection.commit()
 
+        # Session settings for the HNSW index (re)builds done by migrations, when configured
+        postgres = settings.POSTGRES
+        if postgres.get("hnsw_maintenance_work_mem"):
+            connection.execute(
+                text("SELECT set_config('maintenance_work_mem', :value, false)"),
+                {"value": str(postgres["hnsw_maintenance_work_mem"])},
+            )
+        if postgres.get("hnsw_max_parallel_maintenance_workers") is not None:
+            connection.execute(
+                text("SELECT set_config('max_parallel_maintenance_workers', :value, false)"),
+                {"value": str(int(postgres["hnsw_max_parallel_maintenance_workers"]))},
+            )
+
         context.configure(connection=connection, target_metadata=target_metadata)
 
         with context.begin_transaction():
@@ -0,0 +1,67 @@
+"""add reference_json generated column
+
+Precomputes the API source reference of each chunk (source_name,
+source_type, url, title and extras, the same shape RAGQueryEngine builds
+from node metadata) as a GENERATED ALWAYS AS STORED JSONB column, so
+retrieval can return it as-is instead of walking the metadata of every
+retrieved node in Python. Being generated, it is filled for existing rows
+by this migration and kept in sync on every insert without changes to the
+ingestion path.
+
+The expression uses jsonb_set rather than jsonb_build_object because
+generated columns require immutable functions.
+
+DEPLOYMENT RISK — table lock:
+    Adding a stored generated column rewrites data_embeddings under an
+    ACCESS EXCLUSIVE lock.
+
+Revision ID: 16c7dde95cc6
+Revises: 5199ff0a4c63
+Create Date: 2026-10-15
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "16c7dde95cc6"
+down_revision: str | Sequence[str] | None = "5199ff0a4c63"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Source reference of each chunk: source_name, source_type, url (first non-empty of
+# source_url/url/path), title (title/file_name) and the remaining metadata as extras
+REFERENCE_JSON = (
+    "jsonb_set(jsonb_set(jsonb_set(jsonb_set(jsonb_set('{}'::jsonb, "
+    "'{source_name}', coalesce(metadata_->'source_name', 'null'::jsonb)), "
+    "'{source_type}', coalesce(metadata_->'source_type', 'null'::jsonb)), "
+    "'{url}', coalesce(nullif(nullif(metadata_->'source_url', 'null'::jsonb), '\"\"'::jsonb), "
+    "nullif(nullif(metadata_->'url', 'null'::jsonb), '\"\"'::jsonb), "
+    "nullif(nullif(metadata_->'path', 'null'::jsonb), '\"\"'::jsonb), 'null'::jsonb)), "
+    "'{title}', coalesce(nullif(nullif(metadata_->'title', 'null'::jsonb), '\"\"'::jsonb), "
+    "nullif(nullif(metadata_->'file_name', 'null'::jsonb), '\"\"'::jsonb), 'null'::jsonb)), "
+    "'{extras}', coalesce(metadata_, '{}'::jsonb) - ARRAY['source_name', 'source_type', 'source_url', 'title', "
+    "'file_name', '_node_content', '_node_type', 'document_id', 'doc_id', 'ref_doc_id'])"
+)
+
+
+def upgrade() -> None:
+    """Add the stored reference_json column."""
+    op.add_column(
+        "data_embeddings",
+        sa.Column(
+            "reference_json",
+            postgresql.JSONB(),
+            sa.Computed(REFERENCE_JSON, persisted=True),
+        ),
+        schema="public",
+    )
+
+
+def downgrade() -> None:
+    """Drop the reference_json column."""
+    op.drop_column("data_embeddings", "reference_json", schema="public")
@@ -0,0 +1,57 @@
+"""optionally replace the GIN index on text_search_tsv with a RUM index
+
+When vector_store.text_search_index is "rum", the GIN index is swapped for
+a RUM index. RUM stores lexeme positions, so the hybrid query can order
+full-text matches by the <=> rank distance straight from the index instead
+of fetching every matching heap row to compute ts_rank_cd.
+
+RUM is a separate extension (not shipped with the pgvector image); with the
+default "gin" setting this revision is a no-op.
+
+Revision ID: 234a5f679025
+Revises: d264c97588a0
+Create Date: 2026-10-15
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+from utils.config import settings
+
+revision: str = "234a5f679025"
+down_revision: str | Sequence[str] | None = "d264c97588a0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+text_search_index = settings.POSTGRES.get("text_search_index", "gin")
+
+
+def upgrade() -> None:
+    """Swap the GIN full-text index for a RUM index when configured."""
+    if text_search_index != "rum":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS rum")
+    op.drop_index(
+        "idx_data_embeddings_text_search_tsv",
+        table_name="data_embeddings",
+        schema="public",
+    )
+    op.create_index(
+        "idx_data_embeddings_text_search_tsv_rum",
+        "data_embeddings",
+        ["text_search_tsv"],
+        schema="public",
+        postgresql_using="rum",
+        postgresql_ops={"text_search_tsv": "rum_tsvector_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Restore the GIN full-text index (no-op if it was never replaced)."""
+    op.execute("DROP INDEX IF EXISTS public.idx_data_embeddings_text_search_tsv_rum")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_data_embeddings_text_search_tsv "
+        "ON public.data_embeddings USING gin (text_search_tsv)"
+    )
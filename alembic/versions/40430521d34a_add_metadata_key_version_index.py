@@ -0,0 +1,34 @@
+"""add a (key, version DESC) index on metadata
+
+Ingestion resolves the latest record of each item with
+SELECT DISTINCT ON (key) ... ORDER BY key, version DESC (see
+MetadataTracker.get_latest_records_bulk). A composite index in that order
+lets Postgres read the first entry per key instead of sorting every
+version of the matched keys.
+
+Revision ID: 40430521d34a
+Revises: a21661f38bd0
+Create Date: 2026-10-15
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "40430521d34a"
+down_revision: str | Sequence[str] | None = "a21661f38bd0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the (key, version DESC) index on metadata."""
+    op.create_index("ix_metadata_key_version", "metadata", ["key", sa.text("version DESC")], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the (key, version DESC) index on metadata."""
+    op.drop_index("ix_metadata_key_version", table_name="metadata")
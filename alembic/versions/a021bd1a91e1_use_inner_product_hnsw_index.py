@@ -0,0 +1,62 @@
+"""optionally rank embeddings by inner product
+
+When vector_store.hnsw.hnsw_dist_method is an inner-product opclass
+(vector_ip_ops or halfvec_ip_ops), the stored embeddings are normalized to
+unit length and the HNSW index is rebuilt with that opclass. New embeddings
+are normalized at ingestion and query embeddings before retrieval, so the
+<#> inner product ranks exactly like cosine distance without computing
+vector norms per comparison.
+
+Requires pgvector >= 0.7.0 (l2_normalize). With a cosine opclass (the
+default) this revision is a no-op.
+
+DEPLOYMENT RISK — table lock:
+    Normalizing rewrites every row of data_embeddings and the HNSW index is
+    rebuilt from scratch.
+
+Revision ID: a021bd1a91e1
+Revises: 16c7dde95cc6
+Create Date: 2026-10-15
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+from utils.config import settings
+
+revision: str = "a021bd1a91e1"
+down_revision: str | Sequence[str] | None = "16c7dde95cc6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# PGVectorStore names the HNSW index "<table>_embedding_idx"
+INDEX_NAME = "data_embeddings_embedding_idx"
+
+postgres = settings.POSTGRES
+dist_method = postgres["hnsw_dist_method"]
+column_type = "halfvec" if postgres.get("use_halfvec") else "vector"
+
+
+def _rebuild_index(ops: str) -> None:
+    op.execute(f"DROP INDEX IF EXISTS public.{INDEX_NAME}")
+    op.execute(
+        f"CREATE INDEX {INDEX_NAME} ON public.data_embeddings "
+        f"USING hnsw (embedding {ops}) "
+        f"WITH (m = {int(postgres['hnsw_m'])}, ef_construction = {int(postgres['hnsw_ef_construction'])})"
+    )
+
+
+def upgrade() -> None:
+    """Normalize stored embeddings and rebuild the HNSW index for inner product when configured."""
+    if not dist_method.endswith("_ip_ops"):
+        return
+    op.execute("UPDATE public.data_embeddings SET embedding = l2_normalize(embedding) WHERE embedding IS NOT NULL")
+    _rebuild_index(dist_method)
+
+
+def downgrade() -> None:
+    """Rebuild the HNSW index for cosine distance (normalized embeddings stay valid for cosine)."""
+    if not dist_method.endswith("_ip_ops"):
+        return
+    _rebuild_index(f"{column_type}_cosine_ops")
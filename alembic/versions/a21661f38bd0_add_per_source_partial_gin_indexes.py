@@ -0,0 +1,77 @@
+"""add partial GIN indexes on text_search_tsv per configured source
+
+Metadata-filtered retrieval usually scopes a query to one source
+(metadata_->>'source_name' = '<name>', the name given in config.yaml). The
+global GIN index on text_search_tsv still walks the postings of every
+source; a partial index per source only holds that source's rows, so the
+full-text lookup reads postings proportional to the source size.
+
+One index is created for each source in settings.SOURCES at upgrade time.
+Sources added to config.yaml later are not covered until this revision is
+re-applied (alembic downgrade a021bd1a91e1 && alembic upgrade head).
+
+The planner picks a partial index when the query repeats its predicate,
+which the source_name EQ metadata filter does. To check:
+
+    EXPLAIN SELECT id FROM data_embeddings
+    WHERE text_search_tsv @@ to_tsquery('english', 'captcha')
+      AND metadata_->>'source_name' = 'account1';
+
+should show a Bitmap Index Scan on idx_tsv_gin_src_account1.
+
+Revision ID: a21661f38bd0
+Revises: a021bd1a91e1
+Create Date: 2026-10-15
+
+"""
+
+import hashlib
+import re
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+from utils.config import settings
+
+revision: str = "a21661f38bd0"
+down_revision: str | Sequence[str] | None = "a021bd1a91e1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEX_PREFIX = "idx_tsv_gin_src_"
+# Postgres truncates identifiers to 63 bytes
+MAX_IDENTIFIER_LENGTH = 63
+
+
+def _index_name(source_name: str) -> str:
+    name = INDEX_PREFIX + re.sub(r"[^a-z0-9_]+", "_", source_name.lower())
+    if len(name) > MAX_IDENTIFIER_LENGTH or name == INDEX_PREFIX:
+        # Keep names of long or non-ASCII sources unique with a digest suffix
+        digest = hashlib.md5(source_name.encode()).hexdigest()[:8]
+        name = f"{name[: MAX_IDENTIFIER_LENGTH - 9]}_{digest}"
+    return name
+
+
+def upgrade() -> None:
+    """Create one partial GIN index per configured source."""
+    source_names = dict.fromkeys(source["name"] for source in settings.SOURCES)
+    for source_name in source_names:
+        literal = source_name.replace("'", "''")
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {_index_name(source_name)} ON public.data_embeddings "
+            f"USING gin (text_search_tsv) WHERE metadata_->>'source_name' = '{literal}'"
+        )
+
+
+def downgrade() -> None:
+    """Drop every per-source partial index, including those of sources since removed from config."""
+    index_names = op.get_bind().execute(
+        sa.text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE schemaname = 'public' AND tablename = 'data_embeddings' AND indexname LIKE :prefix"
+        ),
+        {"prefix": INDEX_PREFIX.replace("_", r"\_") + "%"},
+    )
+    for (index_name,) in index_names.all():
+        op.execute(f'DROP INDEX IF EXISTS public."{index_name}"')
@@ -0,0 +1,75 @@
+"""store metadata.metadata_content as JSONB and cover the latest-record lookup
+
+- metadata_content becomes JSONB (binary, no re-parse on read, indexable),
+  matching data_embeddings.metadata_.
+- ix_metadata_key_version includes checksum, so the latest-record lookups
+  (MetadataTracker.get_latest_record / get_latest_records_bulk) are
+  index-only scans. It also serves every key lookup, so the single-column
+  ix_metadata_key is dropped.
+- An expression index on metadata_content->>'source_name' serves the
+  per-source lookups of scripts/wipe_ingested.py.
+
+DEPLOYMENT RISK — table lock:
+    ALTER COLUMN ... TYPE rewrites the metadata table under an ACCESS
+    EXCLUSIVE lock.
+
+Revision ID: b6ab23d791ee
+Revises: 40430521d34a
+Create Date: 2026-10-15
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "b6ab23d791ee"
+down_revision: str | Sequence[str] | None = "40430521d34a"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Convert metadata_content to JSONB and replace the key indexes with a covering one."""
+    op.alter_column(
+        "metadata",
+        "metadata_content",
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=True,
+        postgresql_using="metadata_content::jsonb",
+    )
+    op.drop_index("ix_metadata_key_version", table_name="metadata")
+    op.create_index(
+        "ix_metadata_key_version",
+        "metadata",
+        ["key", sa.text("version DESC")],
+        unique=False,
+        postgresql_include=["checksum"],
+    )
+    op.drop_index(op.f("ix_metadata_key"), table_name="metadata")
+    op.create_index(
+        "ix_metadata_source_name",
+        "metadata",
+        [sa.text("(metadata_content->>'source_name')")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Restore the JSON column and the previous key indexes."""
+    op.drop_index("ix_metadata_source_name", table_name="metadata")
+    op.create_index(op.f("ix_metadata_key"), "metadata", ["key"], unique=False)
+    op.drop_index("ix_metadata_key_version", table_name="metadata")
+    op.create_index("ix_metadata_key_version", "metadata", ["key", sa.text("version DESC")], unique=False)
+    op.alter_column(
+        "metadata",
+        "metadata_content",
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using="metadata_content::json",
+    )
@@ -0,0 +1,73 @@
+"""drop text_search_tsv for vector-only deployments
+
+text_search_tsv is a stored generated column, so every inserted chunk pays
+to_tsvector() over its title and text, and the GIN (or RUM) index on it is
+updated, even when vector_store.hybrid_search is false and no query ever
+reads it. With hybrid_search false the column is dropped, which also drops
+its full-text indexes (including the per-source partial indexes of
+a21661f38bd0). Postgres before 18 has no virtual generated columns, so the
+column cannot be kept as computed-on-read instead.
+
+With the default (true) this revision is a no-op. To turn hybrid search
+back on, downgrade while hybrid_search is still false, then enable it and
+upgrade again:
+
+    alembic downgrade b6ab23d791ee   # hybrid_search: false
+    alembic upgrade head             # hybrid_search: true
+
+The downgrade restores the column and its GIN/RUM index; per-source partial
+indexes come back by re-applying a21661f38bd0 (see that revision).
+
+DEPLOYMENT RISK — table lock:
+    The downgrade rewrites data_embeddings under an ACCESS EXCLUSIVE lock to
+    fill the column. Dropping it (upgrade) only touches the catalog.
+
+Revision ID: c3e1f0a7d842
+Revises: b6ab23d791ee
+Create Date: 2026-10-15
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+from utils.config import settings
+
+revision: str = "c3e1f0a7d842"
+down_revision: str | Sequence[str] | None = "b6ab23d791ee"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+postgres = settings.POSTGRES
+
+WEIGHTED_TSV = (
+    "setweight(to_tsvector('english', coalesce(metadata_->>'title', '')), 'A') || "
+    "setweight(to_tsvector('english', text), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Drop text_search_tsv and its indexes when hybrid search is disabled."""
+    if postgres.get("hybrid_search", True):
+        return
+    op.execute("ALTER TABLE public.data_embeddings DROP COLUMN IF EXISTS text_search_tsv")
+
+
+def downgrade() -> None:
+    """Restore text_search_tsv and its full-text index (no-op if the column was never dropped)."""
+    if postgres.get("hybrid_search", True):
+        return
+    op.execute(
+        "ALTER TABLE public.data_embeddings ADD COLUMN IF NOT EXISTS text_search_tsv tsvector "
+        f"GENERATED ALWAYS AS ({WEIGHTED_TSV}) STORED"
+    )
+    if postgres.get("text_search_index", "gin") == "rum":
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_data_embeddings_text_search_tsv_rum "
+            "ON public.data_embeddings USING rum (text_search_tsv rum_tsvector_ops)"
+        )
+    else:
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_data_embeddings_text_search_tsv "
+            "ON public.data_embeddings USING gin (text_search_tsv)"
+        )
@@ -0,0 +1,67 @@
+"""weight the title in text_search_tsv
+
+Regenerates text_search_tsv as a weighted tsvector so that full-text
+ranking can tell title matches (weight A) from body matches (weight B).
+The title is read from metadata_->>'title', which the Jira, MediaWiki and
+Pipedrive connectors populate; rows without a title only get B lexemes.
+
+Dropping the generated column also drops its GIN index, so the index is
+recreated with the same name and definition.
+
+DEPLOYMENT RISK — table lock:
+    Like 416bd1e5f60a, this rewrites data_embeddings under an ACCESS
+    EXCLUSIVE lock. Run during a maintenance window on large tables.
+
+Revision ID: d264c97588a0
+Revises: 5feb1e3a07ce
+Create Date: 2026-10-15
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "d264c97588a0"
+down_revision: str | Sequence[str] | None = "5feb1e3a07ce"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+WEIGHTED_TSV = (
+    "setweight(to_tsvector('english', coalesce(metadata_->>'title', '')), 'A') || "
+    "setweight(to_tsvector('english', text), 'B')"
+)
+PLAIN_TSV = "to_tsvector('english', text)"
+
+
+def _replace_tsv_column(expression: str) -> None:
+    op.drop_column("data_embeddings", "text_search_tsv", schema="public")
+    op.add_column(
+        "data_embeddings",
+        sa.Column(
+            "text_search_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed(expression, persisted=True),
+        ),
+        schema="public",
+    )
+    op.create_index(
+        "idx_data_embeddings_text_search_tsv",
+        "data_embeddings",
+        ["text_search_tsv"],
+        schema="public",
+        postgresql_using="gin",
+    )
+
+
+def upgrade() -> None:
+    """Regenerate text_search_tsv with title (A) and text (B) weights."""
+    _replace_tsv_column(WEIGHTED_TSV)
+
+
+def downgrade() -> None:
+    """Revert text_search_tsv to the unweighted text-only expression."""
+    _replace_tsv_column(PLAIN_TSV)
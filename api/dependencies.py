@@ -1,12 +1,23 @@
 import secrets
+from collections.abc import Callable
+from typing import TYPE_CHECKING
 
-from fastapi import HTTPException, Security
+from fastapi import FastAPI, HTTPException, Request, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from slowapi import Limiter
+from slowapi.util import get_remote_address
 
 from utils.config import settings
 
+if TYPE_CHECKING:
+    # api.v1 imports its routers, which import this module
+    from api.v1.chunk_retrieval.modules import RAGQueryEngine
+
 _bearer = HTTPBearer(auto_error=False)
 
+# Shared rate limiter; main.py registers it on app.state for slowapi's exception handler
+limiter = Limiter(key_func=get_remote_address)
+
 
 def require_api_key(
     credentials: HTTPAuthorizationCredentials | None = Security(_bearer),
@@ -17,3 +28,26 @@ def require_api_key(
         return
     if credentials is None or not secrets.compare_digest(expected, credentials.credentials):
         raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+def limit(rate: str) -> Callable:
+    """Rate-limit a route per client address when ENABLE_RATE_LIMIT is set, else leave it as is."""
+    if not settings.env.ENABLE_RATE_LIMIT:
+        return lambda func: func
+    return limiter.limit(rate)
+
+
+def rag_engine_from_app(app: FastAPI) -> "RAGQueryEngine":
+    """Return the RAG engine created by the app lifespan; RuntimeError before startup has run."""
+    rag_engine = getattr(app.state, "rag_engine", None)
+    if rag_engine is None:
+        raise RuntimeError("RAG engine not initialized")
+    return rag_engine
+
+
+def get_rag_engine(request: Request) -> "RAGQueryEngine":
+    """Route dependency for the RAG engine; 503 until the app lifespan has created it."""
+    try:
+        return rag_engine_from_app(request.app)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
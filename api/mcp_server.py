@@ -5,13 +5,13 @@ from typing import Any
 from fastapi import FastAPI
 from fastmcp import FastMCP
 from fastmcp.server.auth import StaticTokenVerifier
-from llama_index.core.llms import ChatMessage, MessageRole
 
+from api.dependencies import rag_engine_from_app
 from api.v1.chunk_retrieval.modules import RAGQueryEngine
-from api.v1.chunk_retrieval.schema import MetadataFilterItem
+from api.v1.chunk_retrieval.schema import BatchQueryRequest, MetadataFilterItem
 from api.v1.chunk_retrieval.schema import QueryRequest as ChunkQueryRequest
 from api.v1.rephrase_retrieval.schema import QueryRequest as RephraseQueryRequest
-from utils.api import format_chunks
+from utils.api import build_rephrase_messages, run_in_rag_executor
 from utils.llm_embedding import llm
 
 logger = logging.getLogger(__name__)
@@ -24,17 +24,41 @@ async def retrieve_chunks_response(
     metadata_filters: list[MetadataFilterItem] | None = None,
 ) -> dict[str, Any]:
     logger.info("MCP retrieve_chunks: top_k=%d has_filters=%s", top_k, bool(metadata_filters))
-    nodes_with_score = await asyncio.to_thread(
+    nodes_with_score = await run_in_rag_executor(
         rag_engine.retrieve_top_k,
         query=query,
         top_k=top_k,
         metadata=metadata_filters or [],
     )
     logger.info("MCP retrieve_chunks: num_results=%d", len(nodes_with_score))
-    return {
-        "references": RAGQueryEngine.build_references(nodes_with_score),
-        "raw": format_chunks(nodes_with_score),
-    }
+    references, raw = RAGQueryEngine.build_references_and_raw(nodes_with_score)
+    return {"references": references, "raw": raw}
+
+
+async def retrieve_chunks_batch_response(
+    rag_engine: RAGQueryEngine,
+    queries: list[str],
+    top_k: int = 20,
+    metadata_filters: list[MetadataFilterItem] | None = None,
+) -> list[dict[str, Any]]:
+    logger.info(
+        "MCP retrieve_chunks_batch: num_queries=%d top_k=%d has_filters=%s",
+        len(queries),
+        top_k,
+        bool(metadata_filters),
+    )
+    results = await run_in_rag_executor(
+        rag_engine.retrieve_top_k_batch,
+        queries=queries,
+        top_k=top_k,
+        metadata=metadata_filters or [],
+    )
+    logger.info("MCP retrieve_chunks_batch: num_results=%s", [len(nodes) for nodes in results])
+    response = []
+    for query, nodes_with_score in zip(queries, results):
+        references, raw = RAGQueryEngine.build_references_and_raw(nodes_with_score)
+        response.append({"query": query, "references": references, "raw": raw})
+    return response
 
 
 async def rephrase_chunks_response(
@@ -46,7 +70,7 @@ async def rephrase_chunks_response(
         raise RuntimeError("LLM is not configured. Please configure the LLM provider, API key, and model name.")
 
     logger.info("MCP rephrase_chunks: top_k=%d", top_k)
-    nodes_with_score = await asyncio.to_thread(
+    nodes_with_score = await run_in_rag_executor(
         rag_engine.retrieve_top_k,
         query=query,
         top_k=top_k,
@@ -55,22 +79,16 @@ async def rephrase_chunks_response(
         logger.info("MCP rephrase_chunks: no results found")
         return {"answer": "No relevant content found.", "references": []}
 
-    chunks_text = "\n\n".join(node.node.get_text() for node in nodes_with_score)
-    messages = [
-        ChatMessage(
-            role=MessageRole.SYSTEM,
-            content="Rephrase the following content clearly and concisely.",
-        ),
-        ChatMessage(
-            role=MessageRole.USER,
-            content=f"Original Query: {query}\n\nContent:\n\n{chunks_text}",
-        ),
-    ]
-    llm_response = await llm.achat(messages)
+    messages = build_rephrase_messages(query, nodes_with_score)
+    # Build references while waiting on the LLM instead of after it
+    llm_response, references = await asyncio.gather(
+        llm.achat(messages),
+        run_in_rag_executor(RAGQueryEngine.build_references, nodes_with_score),
+    )
     logger.info("MCP rephrase_chunks: num_results=%d", len(nodes_with_score))
     return {
         "answer": llm_response.message.content,
-        "references": RAGQueryEngine.build_references(nodes_with_score),
+        "references": references,
     }
 
 
@@ -87,31 +105,40 @@ def create_mcp_server(app: FastAPI, api_key: str) -> FastMCP:
     )
     mcp = FastMCP("Rag-of-all-trades MCP", auth=auth)
 
-    def get_rag_engine() -> RAGQueryEngine:
-        rag_engine = getattr(app.state, "rag_engine", None)
-        if rag_engine is None:
-            raise RuntimeError("RAG engine not initialized")
-        return rag_engine
-
     @mcp.tool(
         name="retrieve_chunks",
         description="Retrieve top-k chunks from vector store with optional metadata filters.",
     )
     async def retrieve_chunks(payload: ChunkQueryRequest) -> dict[str, Any]:
         return await retrieve_chunks_response(
-            rag_engine=get_rag_engine(),
+            rag_engine=rag_engine_from_app(app),
             query=payload.query,
             top_k=payload.top_k,
             metadata_filters=payload.metadata_filters,
         )
 
+    @mcp.tool(
+        name="retrieve_chunks_batch",
+        description=(
+            "Retrieve top-k chunks for several queries in one call, with optional metadata filters "
+            "applied to every query. Results are returned in the order of the queries."
+        ),
+    )
+    async def retrieve_chunks_batch(payload: BatchQueryRequest) -> list[dict[str, Any]]:
+        return await retrieve_chunks_batch_response(
+            rag_engine=rag_engine_from_app(app),
+            queries=payload.queries,
+            top_k=payload.top_k,
+            metadata_filters=payload.metadata_filters,
+        )
+
     @mcp.tool(
         name="rephrase_chunks",
         description="Generate concise answer from top-k chunks using configured LLM.",
     )
     async def rephrase_chunks(payload: RephraseQueryRequest) -> dict[str, Any]:
         return await rephrase_chunks_response(
-            rag_engine=get_rag_engine(),
+            rag_engine=rag_engine_from_app(app),
             query=payload.query,
             top_k=payload.top_k,
         )
@@ -1,4 +1,12 @@
-from llama_index.core import Settings, VectorStoreIndex
+import logging
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+from llama_index.core import Settings
 from llama_index.core.schema import NodeWithScore
 from llama_index.core.vector_stores.types import (
     FilterCondition,
@@ -7,13 +15,33 @@ from llama_index.core.vector_stores.types import (
     MetadataFilters,
     VectorStore,
 )
+from llama_index.vector_stores.postgres.base import DBEmbeddingRow
+from sqlalchemy import (
+    ARRAY,
+    Float,
+    Integer,
+    String,
+    bindparam,
+    cast,
+    column,
+    func,
+    literal,
+    literal_column,
+    select,
+    table,
+    true,
+)
+from sqlalchemy.dialects.postgresql import JSONB, REGCONFIG, TSQUERY
+from sqlalchemy.exc import SQLAlchemyError
 
 from api.v1.chunk_retrieval.schema import MetadataFilterItem
-from utils.llm_embedding import embed_model, llm
+from utils.llm_embedding import embed_model, l2_normalize, llm
 
 Settings.llm = llm
 Settings.embed_model = embed_model
 
+logger = logging.getLogger(__name__)
+
 _OPERATOR_MAP: dict[str, FilterOperator] = {
     "EQ": FilterOperator.EQ,
     "NE": FilterOperator.NE,
@@ -28,11 +56,97 @@ _OPERATOR_MAP: dict[str, FilterOperator] = {
     "TEXT_MATCH": FilterOperator.TEXT_MATCH,
 }
 
+# Metadata keys promoted to top-level reference fields and therefore left out of "extras"
+_REFERENCE_PROMOTED_KEYS = frozenset({"source_name", "source_type", "source_url", "title", "file_name"})
+
+# Reciprocal Rank Fusion constant: score = sum(1 / (RRF_K + rank)) over the dense and lexical rankings
+_RRF_K = 60
+
+# Characters that carry meaning in tsquery syntax (everything except periods inside words)
+_TSQUERY_SPECIAL_RE = re.compile(r"(?!\b\.\b)\W+")
+
+
+# hnsw.ef_search picked by vector_store.hnsw.hnsw_ef_search "auto": (max row count, ef_search) buckets,
+# widening the HNSW candidate list as the table grows so recall holds past ~100K chunks
+_HNSW_EF_SEARCH_BUCKETS = ((100_000, 40), (1_000_000, 100))
+_HNSW_EF_SEARCH_MAX = 200
+
+_pg_class = table("pg_class", column("oid"), column("reltuples"))
+
+
+# Repeated queries (MCP tools, UI retries) skip the embedding API round-trip and tsquery normalization
+_QUERY_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
+def _embed_cached(query: str) -> tuple[float, ...]:
+    """Unit-length query embedding, cached as an immutable tuple so callers cannot mutate shared entries."""
+    return tuple(l2_normalize(embed_model.get_query_embedding(query)))
+
+
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
+def _embedding_literal_cached(query: str) -> str:
+    """
+    pgvector text literal ("[0.6,0.8,...]") of the query embedding, bound as-is and cast in SQL.
+
+    psycopg2 only sends parameters as text, so the vector is formatted once per query at float32
+    (pgvector's storage precision), which also keeps the literal about half as long as float64 reprs.
+    """
+    return "[" + ",".join(map(str, np.asarray(_embed_cached(query), dtype=np.float32))) + "]"
+
+
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
+def _tsquery_cached(query: str) -> str:
+    """Turn a free-text query into an OR-ed tsquery expression ("foo|bar") for higher recall."""
+    return _TSQUERY_SPECIAL_RE.sub(" ", query.lower()).strip().replace(" ", "|")
+
+
+class RetrievedNode(NodeWithScore):
+    """NodeWithScore carrying the chunk's precomputed source reference (data_embeddings.reference_json)."""
+
+    reference: dict[str, Any] | None = None
+
+
+def _reference(n: NodeWithScore, text: str) -> dict:
+    ref = getattr(n, "reference", None)
+    if ref is not None:
+        return {**ref, "score": n.score, "text": text}
+
+    md = n.node.metadata or {}
+    get = md.get
+    return {
+        "source_name": get("source_name"),
+        "source_type": get("source_type"),
+        "url": get("source_url") or get("url") or get("path"),
+        "score": n.score,
+        "title": get("title") or get("file_name"),
+        "text": text,
+        "extras": {k: v for k, v in md.items() if k not in _REFERENCE_PROMOTED_KEYS},
+    }
+
 
 class RAGQueryEngine:
-    def __init__(self, vector_store: VectorStore):
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        text_search_index: str = "gin",
+        hnsw_dist_method: str = "vector_cosine_ops",
+    ):
         self.vector_store = vector_store
-        self._index_cache = None  # Cache the index to avoid recreating it
+        # "rum" orders full-text matches with the RUM index's <=> operator instead of ts_rank_cd
+        self.text_search_index = text_search_index
+        # Kept here because PGVectorStore pops hnsw_dist_method from its hnsw_kwargs when it initializes
+        self.hnsw_dist_method = hnsw_dist_method
+        # Retrieval statements keyed by filter signature, bounded LRU shared by API worker threads.
+        # Statements take the query values as bind parameters, so one is built per filter shape and
+        # SQLAlchemy reuses its compiled form instead of rebuilding and recompiling per request.
+        self._statement_cache: OrderedDict[tuple, Any] = OrderedDict()
+        self._statement_cache_capacity = 256
+        self._statement_cache_lock = threading.Lock()
+        # Normalized tsquery text keyed by the _tsquery_cached expression it was parsed from, so repeated
+        # queries bind a ready tsquery instead of running to_tsquery's parser and dictionaries again
+        self._tsquery_cache: OrderedDict[str, str] = OrderedDict()
+        self._tsquery_cache_lock = threading.Lock()
 
     def _build_filter_object(self, metadata: list[MetadataFilterItem] | None) -> MetadataFilters | None:
         if not metadata:
@@ -44,35 +158,258 @@ class RAGQueryEngine:
 
         return MetadataFilters(filters=filters, condition=FilterCondition.AND)
 
+    @staticmethod
+    def _filter_signature(metadata: list[MetadataFilterItem]) -> tuple:
+        return tuple(
+            (item.name, item.operator, tuple(item.value) if isinstance(item.value, list) else item.value)
+            for item in metadata
+        )
+
+    def _filter_clause(self, metadata: list[MetadataFilterItem] | None) -> Any:
+        """Return the SQL WHERE clause for the metadata filters, or None without filters."""
+        if not metadata:
+            return None
+        return self.vector_store._recursively_apply_filters(self._build_filter_object(metadata))
+
+    def _statement_for(self, metadata: list[MetadataFilterItem] | None, batch: bool = False) -> Any:
+        """Return the retrieval statement for the metadata filters, reusing statements built for earlier queries."""
+        signature = self._filter_signature(metadata) if metadata else ()
+        if batch:
+            signature = ("batch", signature)
+        with self._statement_cache_lock:
+            stmt = self._statement_cache.get(signature)
+            if stmt is not None:
+                self._statement_cache.move_to_end(signature)
+                return stmt
+
+        build = self._build_batch_query if batch else self._build_query
+        stmt = build(self._filter_clause(metadata))
+        with self._statement_cache_lock:
+            self._statement_cache[signature] = stmt
+            if len(self._statement_cache) > self._statement_cache_capacity:
+                self._statement_cache.popitem(last=False)
+        return stmt
+
     # Create cleaned reference objects
     @staticmethod
     def build_references(nodes: list[NodeWithScore]):
+        return [_reference(n, n.node.get_content()) for n in nodes]
+
+    # References plus the "Score: ... | Text: ..." raw strings (see utils.api.format_chunks) in one pass
+    @staticmethod
+    def build_references_and_raw(nodes: list[NodeWithScore]) -> tuple[list[dict], list[str]]:
         refs = []
+        raw = []
         for n in nodes:
-            md = n.node.metadata or {}
-            refs.append(
-                {
-                    "source_name": md.get("source_name"),
-                    "source_type": md.get("source_type"),
-                    "url": md.get("source_url") or md.get("url") or md.get("path"),
-                    "score": n.score,
-                    "title": md.get("title") or md.get("file_name"),
-                    "text": n.node.get_content(),
-                    "extras": {
-                        k: v
-                        for k, v in md.items()
-                        if k
-                        not in {
-                            "source_name",
-                            "source_type",
-                            "source_url",
-                            "title",
-                            "file_name",
-                        }
-                    },
-                }
+            text = n.node.get_content()
+            score = n.score
+            refs.append(_reference(n, text))
+            raw.append(f"Score: {'n/a' if score is None else f'{score:.4f}'} | Text: {text}")
+        return refs, raw
+
+    def _build_query(self, where: Any = None, query_embedding: Any = None, tsquery: Any = None, correlate: Any = None):
+        """
+        Build a single statement returning the top_k rows with a ``score`` column.
+
+        The query values are bind parameters: ``query_embedding`` (text literal, see
+        _embedding_literal_cached), ``top_k`` and, for
+        hybrid search, the normalized ``tsquery`` text (see _parsed_tsqueries). query_embedding/tsquery can be
+        replaced by columns of ``correlate`` to run the statement as a LATERAL subquery of it.
+
+        With hybrid search enabled, the pgvector kNN ranking and the full-text ranking are
+        computed in two CTEs and fused with RRF inside Postgres, so the whole retrieval is
+        one round-trip. Otherwise the statement is a plain kNN query scored by cosine similarity.
+        """
+        table = self.vector_store._table_class
+        top_k = bindparam("top_k", type_=Integer)
+        # Generated column added by migration 16c7dde95cc6, not part of PGVectorStore's table model
+        reference_json = literal_column("reference_json", JSONB)
+
+        if query_embedding is None:
+            query_embedding = cast(bindparam("query_embedding", type_=String), table.embedding.type)
+        if tsquery is None:
+            tsquery = bindparam("tsquery", type_=String)
+
+        if self.hnsw_dist_method.endswith("_ip_ops"):
+            # Embeddings are unit length (see l2_normalize), so <#> (negative inner product) ranks like
+            # cosine distance without computing norms, and is what an *_ip_ops HNSW index serves
+            distance = table.embedding.max_inner_product(query_embedding)
+            similarity = -distance
+        else:
+            distance = table.embedding.cosine_distance(query_embedding)
+            similarity = 1 - distance
+
+        if not self.vector_store.hybrid_search:
+            stmt = select(
+                table.node_id,
+                table.text,
+                table.metadata_,
+                reference_json,
+                similarity.label("score"),
+            ).order_by(distance)
+            if where is not None:
+                stmt = stmt.where(where)
+            return stmt.limit(top_k)
+
+        ts_query = cast(tsquery, TSQUERY)
+
+        dense = select(table.id, func.row_number().over(order_by=distance).label("rank")).order_by(distance)
+        if self.text_search_index == "rum":
+            # RUM distance, smaller is better; served in index order without a heap re-rank
+            sparse_order = table.text_search_tsv.op("<=>", return_type=Float)(ts_query)
+        else:
+            sparse_order = func.ts_rank_cd(table.text_search_tsv, ts_query).desc()
+        sparse = (
+            select(table.id, func.row_number().over(order_by=sparse_order).label("rank"))
+            .where(table.text_search_tsv.op("@@")(ts_query))
+            .order_by(sparse_order)
+        )
+        if where is not None:
+            dense = dense.where(where)
+            sparse = sparse.where(where)
+        nested = correlate is not None
+        if nested:
+            dense = dense.correlate(correlate)
+            sparse = sparse.correlate(correlate)
+        dense = dense.limit(top_k).cte("dense", nesting=nested)
+        sparse = sparse.limit(top_k).cte("sparse", nesting=nested)
+
+        fused_score = func.coalesce(literal(1.0) / (_RRF_K + dense.c.rank), 0.0) + func.coalesce(
+            literal(1.0) / (_RRF_K + sparse.c.rank), 0.0
+        )
+        fused = (
+            select(func.coalesce(dense.c.id, sparse.c.id).label("id"), cast(fused_score, Float).label("score"))
+            .select_from(dense.outerjoin(sparse, dense.c.id == sparse.c.id, full=True))
+            .cte("fused", nesting=nested)
+        )
+
+        return (
+            select(table.node_id, table.text, table.metadata_, reference_json, fused.c.score)
+            .join(fused, table.id == fused.c.id)
+            .order_by(fused.c.score.desc())
+            .limit(top_k)
+        )
+
+    def _build_batch_query(self, where: Any = None):
+        """
+        Build one statement returning the top_k rows of several queries, tagged with a 1-based ``query_index``.
+
+        The queries are bound as the ``query_embeddings`` and ``tsqueries`` arrays, unnested WITH
+        ORDINALITY and joined LATERAL to the single-query statement, so N queries cost one round trip.
+        """
+        table = self.vector_store._table_class
+        queries = (
+            func.unnest(
+                cast(bindparam("query_embeddings", type_=ARRAY(String)), ARRAY(table.embedding.type)),
+                bindparam("tsqueries", type_=ARRAY(String)),
+            )
+            .table_valued(
+                column("query_embedding", table.embedding.type),
+                column("tsquery", String),
+                with_ordinality="query_index",
+            )
+            .render_derived(name="queries")
+        )
+        hits = self._build_query(where, queries.c.query_embedding, queries.c.tsquery, correlate=queries).lateral("hits")
+        return (
+            select(queries.c.query_index, hits)
+            .select_from(queries)
+            .join(hits, true())
+            .order_by(queries.c.query_index, hits.c.score.desc())
+        )
+
+    def resolve_hnsw_ef_search(self) -> int | None:
+        """
+        Replace an "auto" hnsw_ef_search with a value picked from the table's estimated row count.
+
+        Called once at startup; uses pg_class.reltuples, so it costs no table scan.
+        """
+        store = self.vector_store
+        hnsw_kwargs = store.hnsw_kwargs or {}
+        ef_search = hnsw_kwargs.get("hnsw_ef_search")
+        if ef_search != "auto":
+            return ef_search
+
+        table_name = f"{store.schema_name}.{store._table_class.__tablename__}"
+        try:
+            store._initialize()
+            with store._session() as session:
+                row_count = session.execute(
+                    select(_pg_class.c.reltuples).where(_pg_class.c.oid == func.to_regclass(table_name))
+                ).scalar()
+        except SQLAlchemyError:
+            logger.warning("Could not read the row count of %s, using the smallest hnsw_ef_search", table_name)
+            row_count = 0
+        # reltuples is -1 until the table is first analyzed
+        row_count = max(int(row_count or 0), 0)
+
+        ef_search = next((ef for max_rows, ef in _HNSW_EF_SEARCH_BUCKETS if row_count < max_rows), _HNSW_EF_SEARCH_MAX)
+        hnsw_kwargs["hnsw_ef_search"] = ef_search
+        logger.info("hnsw_ef_search=%d picked for ~%d rows", ef_search, row_count)
+        return ef_search
+
+    def _execute(self, stmt: Any, params: dict[str, Any]) -> list[Any]:
+        store = self.vector_store
+        store._initialize()
+        with store._session() as session, session.begin():
+            ef_search = (store.hnsw_kwargs or {}).get("hnsw_ef_search")
+            if ef_search:
+                session.execute(select(func.set_config("hnsw.ef_search", str(ef_search), True)))
+            return session.execute(stmt, params).all()
+
+    def _parsed_tsqueries(self, expressions: list[str]) -> list[str]:
+        """
+        Return to_tsquery(text_search_config, expression)::text for each expression.
+
+        Results are cached per expression, so Postgres only parses and stems expressions it has not
+        seen yet, all of them in one round trip, and the retrieval statement casts the text to tsquery.
+        """
+        with self._tsquery_cache_lock:
+            parsed = {e: self._tsquery_cache[e] for e in expressions if e in self._tsquery_cache}
+            for expression in parsed:
+                self._tsquery_cache.move_to_end(expression)
+
+        missing = [e for e in dict.fromkeys(expressions) if e not in parsed]
+        if missing:
+            unnested = (
+                func.unnest(bindparam("expressions", type_=ARRAY(String))).table_valued("expression").render_derived()
+            )
+            stmt = select(
+                unnested.c.expression,
+                cast(
+                    func.to_tsquery(cast(self.vector_store.text_search_config, REGCONFIG), unnested.c.expression),
+                    String,
+                ),
             )
-        return refs
+            store = self.vector_store
+            store._initialize()
+            with store._session() as session:
+                fetched = dict(session.execute(stmt, {"expressions": missing}).tuples().all())
+            parsed.update(fetched)
+            with self._tsquery_cache_lock:
+                self._tsquery_cache.update(fetched)
+                while len(self._tsquery_cache) > _QUERY_CACHE_SIZE:
+                    self._tsquery_cache.popitem(last=False)
+
+        return [parsed[e] for e in expressions]
+
+    def _rows_to_nodes(self, rows: list[Any]) -> list[NodeWithScore]:
+        result = self.vector_store._db_rows_to_query_result(
+            [
+                DBEmbeddingRow(
+                    node_id=row.node_id,
+                    text=row.text,
+                    metadata=row.metadata_,
+                    custom_fields={},
+                    similarity=row.score,
+                )
+                for row in rows
+            ]
+        )
+        return [
+            RetrievedNode(node=node, score=score, reference=row.reference_json)
+            for node, score, row in zip(result.nodes, result.similarities, rows)
+        ]
 
     # Retrieve top K with optional metadata filter
     def retrieve_top_k(
@@ -81,17 +418,37 @@ class RAGQueryEngine:
         top_k: int = 5,
         metadata: list[MetadataFilterItem] | None = None,
     ) -> list[NodeWithScore]:
-        # Use cached index to avoid recreating on every query
-        if self._index_cache is None:
-            self._index_cache = VectorStoreIndex.from_vector_store(self.vector_store)
+        stmt = self._statement_for(metadata)
+        params = {"query_embedding": _embedding_literal_cached(query), "top_k": top_k}
+        if self.vector_store.hybrid_search:
+            params["tsquery"] = self._parsed_tsqueries([_tsquery_cached(query)])[0]
 
-        # Convert metadata dict → MetadataFilters
-        metadata_filters = self._build_filter_object(metadata)
+        return self._rows_to_nodes(self._execute(stmt, params))
 
-        retriever = self._index_cache.as_retriever(
-            similarity_top_k=top_k,
-            filters=metadata_filters,
-        )
+    # Retrieve top K for each of several queries in one statement, results aligned with the queries
+    def retrieve_top_k_batch(
+        self,
+        queries: list[str],
+        top_k: int = 5,
+        metadata: list[MetadataFilterItem] | None = None,
+    ) -> list[list[NodeWithScore]]:
+        if not queries:
+            return []
+
+        stmt = self._statement_for(metadata, batch=True)
+        tsqueries = [_tsquery_cached(query) for query in queries]
+        if self.vector_store.hybrid_search:
+            tsqueries = self._parsed_tsqueries(tsqueries)
+        # Vectors travel as pgvector text literals and are cast to vector[] (or halfvec[]) in SQL
+        params = {
+            "query_embeddings": [_embedding_literal_cached(query) for query in queries],
+            "tsqueries": tsqueries,
+            "top_k": top_k,
+        }
+        rows = self._execute(stmt, params)
 
-        nodes = retriever.retrieve(query)
-        return nodes
+        results: list[list[NodeWithScore]] = [[] for _ in queries]
+        nodes = self._rows_to_nodes(rows)
+        for row, node in zip(rows, nodes):
+            results[row.query_index - 1].append(node)
+        return results
@@ -83,6 +83,28 @@ class QueryRequest(BaseModel):
         return value
 
 
+class BatchQueryRequest(BaseModel):
+    queries: list[str]
+    top_k: int = 20
+    metadata_filters: list[MetadataFilterItem] | None = None
+
+    @field_validator("queries")
+    @classmethod
+    def validate_queries(cls, value: list[str]) -> list[str]:
+        if not (1 <= len(value) <= 20):
+            raise ValueError("queries must contain between 1 and 20 items")
+        if any(not query or not query.strip() for query in value):
+            raise ValueError("Query cannot be empty")
+        return value
+
+    @field_validator("top_k")
+    @classmethod
+    def validate_top_k(cls, value: int) -> int:
+        if not (1 <= value <= 100):
+            raise ValueError("top_k must be between 1 and 100")
+        return value
+
+
 class SourceReference(BaseModel):
     source_name: str | None = None
     source_type: str | None = None
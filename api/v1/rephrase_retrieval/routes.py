@@ -1,12 +1,15 @@
 import asyncio
+import json
 import logging
-from functools import wraps
+from collections.abc import AsyncIterator
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from llama_index.core.llms import ChatMessage, MessageRole
+from fastapi.responses import StreamingResponse
+from llama_index.core.llms import ChatMessage
 
-from api.dependencies import require_api_key
+from api.dependencies import get_rag_engine, limit, require_api_key
 from api.v1.chunk_retrieval.modules import RAGQueryEngine
+from utils.api import build_rephrase_messages, run_in_rag_executor
 from utils.config import settings
 from utils.llm_embedding import llm
 
@@ -16,70 +19,90 @@ router = APIRouter(prefix="/rephrase", tags=["Applications APIs"])
 logger = logging.getLogger(__name__)
 
 
-# Dependency to get RAG engine
-def get_rag_engine(request: Request) -> RAGQueryEngine:
-    if not hasattr(request.app.state, "rag_engine"):
-        raise HTTPException(status_code=503, detail="RAG engine not initialized")
-
-    # Validate LLM BEFORE we build engine
+# RAG engine dependency that also requires a configured LLM
+def get_rephrase_engine(rag_engine: RAGQueryEngine = Depends(get_rag_engine)) -> RAGQueryEngine:
     if llm is None:
         raise HTTPException(
             status_code=503, detail="LLM is not configured. Please set OPENAI_API_KEY and LLM model name."
         )
 
-    return request.app.state.rag_engine
-
-
-# Conditional Decorator helper for api rate limiting
-def limit(func):
-    if not settings.env.ENABLE_RATE_LIMIT:
-        return func
+    return rag_engine
 
-    limited_func = None
 
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        nonlocal limited_func
-        request: Request = kwargs.get("request") or args[0]
-        if limited_func is None:
-            limited_func = request.app.state.limiter.limit(settings.env.REPHRASE_RATE_LIMIT)(func)
+def _wants_event_stream(request: Request) -> bool:
+    return "text/event-stream" in request.headers.get("accept", "")
 
-        return await limited_func(*args, **kwargs)
 
-    return wrapper
+def _sse_event(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
 
 
-@router.post("", response_model=QueryResponse)
-@limit
+async def _stream_answer(messages: list[ChatMessage], nodes_with_score: list) -> AsyncIterator[str]:
+    """Yield the LLM answer as SSE "delta" events, then a final "references" event."""
+    # Build references while tokens are streaming instead of after the answer is complete
+    refs_task = asyncio.ensure_future(run_in_rag_executor(RAGQueryEngine.build_references, nodes_with_score))
+    try:
+        async for chunk in await llm.astream_chat(messages):
+            if chunk.delta:
+                yield _sse_event({"delta": chunk.delta})
+        references = [SourceReference(**r).model_dump(mode="json") for r in await refs_task]
+        yield _sse_event({"references": references}, event="references")
+    except Exception as e:
+        logger.exception("Unexpected error while streaming rephrase answer")
+        yield _sse_event({"detail": f"Failed to process rephrase query: {str(e)}"}, event="error")
+    finally:
+        # Also reached on client disconnect (GeneratorExit / CancelledError)
+        if not refs_task.done():
+            refs_task.cancel()
+        elif not refs_task.cancelled():
+            # Mark a failure that was never awaited as retrieved
+            refs_task.exception()
+
+
+@router.post(
+    "",
+    response_model=QueryResponse,
+    responses={200: {"content": {"text/event-stream": {"schema": {"type": "string"}}}}},
+)
+@limit(settings.env.REPHRASE_RATE_LIMIT)
 async def query_endpoint(
     request: Request,
     payload: QueryRequest,
-    rag_engine: RAGQueryEngine = Depends(get_rag_engine),
+    rag_engine: RAGQueryEngine = Depends(get_rephrase_engine),
     _auth: None = Depends(require_api_key),
 ):
     """
     Rephrase top-k chunks using LLM.
+
+    Send ``Accept: text/event-stream`` to receive the answer as Server-Sent Events:
+    ``data: {"delta": ...}`` per token chunk, then ``event: references`` with the sources.
     """
     try:
-        nodes_with_score = await asyncio.to_thread(rag_engine.retrieve_top_k, query=payload.query, top_k=payload.top_k)
+        nodes_with_score = await run_in_rag_executor(
+            rag_engine.retrieve_top_k, query=payload.query, top_k=payload.top_k
+        )
+
+        stream = _wants_event_stream(request)
 
         if not nodes_with_score:
+            if stream:
+                events = [
+                    _sse_event({"delta": "No relevant content found."}),
+                    _sse_event({"references": []}, event="references"),
+                ]
+                return StreamingResponse(iter(events), media_type="text/event-stream")
             return QueryResponse(answer="No relevant content found.", references=[])
 
-        chunks_text = "\n\n".join([n.node.get_text() for n in nodes_with_score])
-        messages = [
-            ChatMessage(
-                role=MessageRole.SYSTEM,
-                content="Rephrase the following content clearly and concisely.",
-            ),
-            ChatMessage(
-                role=MessageRole.USER,
-                content=f"Original Query: {payload.query}\n\nContent:\n\n{chunks_text}",
-            ),
-        ]
-        llm_response = await llm.achat(messages)
-
-        source_refs = RAGQueryEngine.build_references(nodes_with_score)
+        messages = build_rephrase_messages(payload.query, nodes_with_score)
+        if stream:
+            return StreamingResponse(_stream_answer(messages, nodes_with_score), media_type="text/event-stream")
+
+        # Build references while waiting on the LLM instead of after it
+        llm_response, source_refs = await asyncio.gather(
+            llm.achat(messages),
+            run_in_rag_executor(RAGQueryEngine.build_references, nodes_with_score),
+        )
 
         return QueryResponse(
             answer=llm_response.message.content, references=[SourceReference(**r) for r in source_refs]
@@ -1,4 +1,6 @@
+import gc
 import logging
+from functools import cache
 
 from celery import Celery
 from celery.signals import worker_process_init, worker_process_shutdown
@@ -48,6 +50,20 @@ def shutdown_worker(**kwargs):
     engine.dispose()
 
 
+@cache
+def _freeze_loaded_objects(job_type: str):
+    """Exclude the objects loaded so far from garbage collection, once per job type and worker process.
+
+    Imported libraries and the embedding model are most of the tracked objects (~670k);
+    every full collection, including the one IngestionJob.run makes every GC_INTERVAL
+    items (~280 ms), would otherwise walk them again. Connector modules and their client
+    libraries are imported when the factory first creates a job of their type, so each
+    type freezes what it added.
+    """
+    gc.collect()
+    gc.freeze()
+
+
 def create_task_for_source(source_config):
     """Register a Celery task and Beat schedule for one source (S3, MediaWiki, etc.)."""
     source_name = source_config["name"]
@@ -67,7 +83,11 @@ def create_task_for_source(source_config):
         log_name = f"{pipeline_config['name']}_{override}" if override else pipeline_config["name"]
         logger.info(f"Starting ingestion for {log_name}")
 
-        job = IngestionJobFactory.create(pipeline_config["type"], pipeline_config)
+        job_class = IngestionJobFactory.get_job_class(pipeline_config["type"])
+        # Resolving the class has loaded the ingestion stack, the embedding model and the connector;
+        # freeze before creating the job so its own clients and sessions stay collectable
+        _freeze_loaded_objects(pipeline_config["type"])
+        job = job_class(pipeline_config)
         return job.run()
 
     # Register task in Beat schedule
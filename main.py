@@ -1,26 +1,27 @@
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from llama_index.vector_stores.postgres import PGVectorStore
-from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
 
+from api.dependencies import limiter
 from api.mcp_server import create_mcp_server
 from api.v1 import api_v1_router
 from api.v1.chunk_retrieval.modules import RAGQueryEngine
 from celery_app import celery_app
+from utils.api import RAG_WORKERS
 from utils.config import settings
+from utils.db import pool_kwargs
 from utils.logger import configure_logging
 
 configure_logging()
 logger = logging.getLogger(__name__)
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
 
 def validate_configuration():
     """Validate critical configuration on startup."""
@@ -47,6 +48,18 @@ def validate_configuration():
     for key in required_postgres:
         if not postgres.get(key):
             errors.append(f"PostgreSQL {key} not configured")
+    if postgres.get("text_search_index") not in ("gin", "rum"):
+        errors.append(
+            f"vector_store.text_search_index must be 'gin' or 'rum', got: {postgres.get('text_search_index')}"
+        )
+    # The HNSW opclass must match the embedding column type (vector or halfvec)
+    column_type = "halfvec" if postgres.get("use_halfvec") else "vector"
+    dist_method = postgres.get("hnsw_dist_method", "")
+    if not dist_method.startswith(f"{column_type}_"):
+        errors.append(f"vector_store.hnsw.hnsw_dist_method must be a {column_type} opclass, got: {dist_method}")
+    ef_search = postgres.get("hnsw_ef_search")
+    if ef_search != "auto" and not (isinstance(ef_search, int) and ef_search > 0):
+        errors.append(f"vector_store.hnsw.hnsw_ef_search must be 'auto' or a positive integer, got: {ef_search}")
 
     # Validate sources
     if not settings.SOURCES:
@@ -87,16 +100,24 @@ async def app_lifespan(app: FastAPI):
         table_name=postgres["table_name"],
         embed_dim=embedding["dim"],
         hybrid_search=postgres.get("hybrid_search", True),
+        use_halfvec=postgres.get("use_halfvec", False),
         hnsw_kwargs={
-            "hnsw_m": postgres.get("hnsw_m", 16),
-            "hnsw_ef_construction": postgres.get("hnsw_ef_construction", 64),
-            "hnsw_ef_search": postgres.get("hnsw_ef_search", 40),
+            "hnsw_m": postgres.get("hnsw_m", 24),
+            "hnsw_ef_construction": postgres.get("hnsw_ef_construction", 128),
+            "hnsw_ef_search": postgres.get("hnsw_ef_search", "auto"),
             "hnsw_dist_method": postgres.get("hnsw_dist_method", "vector_cosine_ops"),
         },
+        # One connection per RAG worker thread; retrieval never needs more
+        create_engine_kwargs=pool_kwargs(pool_size=RAG_WORKERS, max_overflow=0),
     )
 
     # Initialize RAG engine
-    app.state.rag_engine = RAGQueryEngine(app.state.vector_store)
+    app.state.rag_engine = RAGQueryEngine(
+        app.state.vector_store,
+        text_search_index=postgres.get("text_search_index", "gin"),
+        hnsw_dist_method=postgres.get("hnsw_dist_method", "vector_cosine_ops"),
+    )
+    app.state.rag_engine.resolve_hnsw_ef_search()
     logger.info("Vector store and RAG engine initialized")
 
     # Yield to FastAPI runtime
@@ -162,21 +183,37 @@ if mcp_http_app is not None:
     app.mount("/mcp", mcp_http_app)
 
 
-@app.get("/health")
-def health_check():
-    """Combined health check for FastAPI, vector store, and Celery."""
-    vector_store_loaded = hasattr(app.state, "vector_store")
-    celery_ok = False
+# Seconds a Celery ping result answers /health before the workers are pinged again
+CELERY_HEALTH_TTL = 5.0
+_celery_health_lock = asyncio.Lock()
+
+
+def _ping_celery() -> bool:
     try:
-        response = celery_app.control.ping(timeout=1.0)
-        celery_ok = bool(response)
+        return bool(celery_app.control.ping(timeout=1.0))
     except Exception:
-        celery_ok = False
+        return False
 
+
+async def _celery_healthy() -> bool:
+    """Cached Celery ping; load balancers poll /health far more often than workers change state."""
+    async with _celery_health_lock:
+        cached = getattr(app.state, "_celery_health", None)
+        now = time.monotonic()
+        if cached is None or now - cached[0] >= CELERY_HEALTH_TTL:
+            # The broadcast ping blocks for up to its timeout, keep it off the event loop
+            cached = (now, await asyncio.to_thread(_ping_celery))
+            app.state._celery_health = cached
+        return cached[1]
+
+
+@app.get("/health")
+async def health_check():
+    """Combined health check for FastAPI, vector store, and Celery."""
     return {
         "status": "ok",
-        "vector_store_loaded": vector_store_loaded,
-        "celery_healthy": celery_ok,
+        "vector_store_loaded": hasattr(app.state, "vector_store"),
+        "celery_healthy": await _celery_healthy(),
     }
 
 
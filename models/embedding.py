@@ -1,10 +1,56 @@
 import sqlalchemy as sa
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 from sqlalchemy import BigInteger, Column, String, Text
 from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 
+from utils.config import settings
 from utils.db import Base
 
+# vector_store.use_halfvec stores embeddings as half precision (see migration 5199ff0a4c63)
+_embedding_type = HALFVEC if settings.POSTGRES.get("use_halfvec") else Vector
+
+
+def _first_metadata_value(*keys: str) -> str:
+    """SQL for the first metadata value that is neither missing, null nor empty (Python's `a or b`)."""
+    values = ", ".join(f"nullif(nullif(metadata_->'{k}', 'null'::jsonb), '\"\"'::jsonb)" for k in keys)
+    return f"coalesce({values}, 'null'::jsonb)"
+
+
+# Keys promoted to top-level reference fields plus LlamaIndex's internal node keys are left out of extras
+_EXTRAS_EXCLUDED = (
+    "source_name",
+    "source_type",
+    "source_url",
+    "title",
+    "file_name",
+    "_node_content",
+    "_node_type",
+    "document_id",
+    "doc_id",
+    "ref_doc_id",
+)
+# Source reference returned by the API for a chunk, see RAGQueryEngine.build_references.
+# Built with jsonb_set because generated columns only allow immutable functions.
+_REFERENCE_FIELDS = {
+    "source_name": "coalesce(metadata_->'source_name', 'null'::jsonb)",
+    "source_type": "coalesce(metadata_->'source_type', 'null'::jsonb)",
+    "url": _first_metadata_value("source_url", "url", "path"),
+    "title": _first_metadata_value("title", "file_name"),
+    "extras": "coalesce(metadata_, '{}'::jsonb) - ARRAY[" + ", ".join(f"'{k}'" for k in _EXTRAS_EXCLUDED) + "]",
+}
+
+
+def _reference_json_sql() -> str:
+    """SQL nesting one jsonb_set per field of _REFERENCE_FIELDS."""
+    sql = "'{}'::jsonb"
+    for field, value in _REFERENCE_FIELDS.items():
+        sql = f"jsonb_set({sql}, '{{{field}}}', {value})"
+    return sql
+
+
+# Must match the expression migration 16c7dde95cc6 applied; changing it needs a new migration
+REFERENCE_JSON_SQL = _reference_json_sql()
+
 
 class DataEmbeddings(Base):
     __tablename__ = "data_embeddings"
@@ -14,8 +60,18 @@ class DataEmbeddings(Base):
     text = Column(String, nullable=False)
     metadata_ = Column(JSONB, nullable=True)
     node_id = Column(String, nullable=True)
-    embedding = Column(Vector, nullable=True)
-    text_search_tsv = Column(TSVECTOR, sa.Computed("to_tsvector('english', text)", persisted=True))
+    embedding = Column(_embedding_type(settings.EMBEDDING.get("dim")), nullable=True)
+    # Only maintained for hybrid search (see migration c3e1f0a7d842)
+    if settings.POSTGRES.get("hybrid_search", True):
+        text_search_tsv = Column(
+            TSVECTOR,
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(metadata_->>'title', '')), 'A') || "
+                "setweight(to_tsvector('english', text), 'B')",
+                persisted=True,
+            ),
+        )
 
     key_text = Column(Text, sa.Computed("metadata_ ->> 'key'", persisted=True))
     checksum_text = Column(Text, sa.Computed("metadata_ ->> 'checksum'", persisted=True))
+    reference_json = Column(JSONB, sa.Computed(REFERENCE_JSON_SQL, persisted=True))
@@ -1,4 +1,5 @@
-from sqlalchemy import JSON, Column, DateTime, Integer, String, func
+from sqlalchemy import Column, DateTime, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
 
 from utils.db import Base
 
@@ -6,9 +7,14 @@ from utils.db import Base
 class MetaData(Base):
     __tablename__ = "metadata"
     id = Column(Integer, primary_key=True, index=True)
-    key = Column(String, nullable=False, index=True)
+    key = Column(String, nullable=False)
     checksum = Column(String, nullable=False)
     version = Column(Integer, nullable=False, default=1)
-    metadata_content = Column(JSON, nullable=True)
+    metadata_content = Column(JSONB, nullable=True)
     last_modified = Column(DateTime, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_metadata_key_version", key, version.desc(), postgresql_include=["checksum"]),
+        Index("ix_metadata_source_name", metadata_content["source_name"].astext),
+    )
@@ -1,11 +1,15 @@
 import gc
 import hashlib
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
-from collections import OrderedDict
+from collections import deque
 from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from itertools import islice
 from typing import Any
 
 from llama_index.core import Document
@@ -17,6 +21,27 @@ from tasks.schemas import BaseMetadataSchema
 
 logger = logging.getLogger(__name__)
 
+# Ingested items between full garbage collections in run()
+GC_INTERVAL = 500
+# Items whose latest metadata records run() loads with one query
+LOOKUP_WINDOW = 256
+# Content fetches run() keeps in flight per io_workers thread; bounds the fetched content held in memory
+FETCH_AHEAD = 2
+# Metadata keys owned by BaseMetadataSchema that get_extra_metadata() cannot override
+RESERVED_METADATA_KEYS = frozenset(BaseMetadataSchema.model_fields)
+
+
+@dataclass
+class _PendingItem:
+    """A deduplicated item whose document is built but not yet embedded or recorded."""
+
+    item_name: str
+    document: Document
+    checksum: str
+    version: int
+    last_modified: datetime
+    replaces_previous: bool
+
 
 class IngestionJob(ABC):
     """Abstract base class for all ingestion jobs that process content from various sources.
@@ -26,6 +51,10 @@ class IngestionJob(ABC):
     duplicate detection, versioning, metadata tracking, and provides hooks for customization.
     """
 
+    # Threads fetching item content ahead of the main loop; only sources whose
+    # get_raw_content/get_item_checksum are thread-safe should raise this
+    default_io_workers = 1
+
     @property
     def content_format(self) -> str:
         """Content format reported in document metadata. Override in subclasses if needed."""
@@ -50,6 +79,11 @@ class IngestionJob(ABC):
             raise ValueError("request_delay must be a number") from exc
         if self.request_delay < 0:
             raise ValueError("request_delay must be >= 0")
+        # Earliest monotonic time of the next content fetch (see _throttle)
+        self._next_fetch_at = 0.0
+        self._throttle_lock = threading.Lock()
+        self.batch_size = self._positive_int(cfg, "batch_size", 64)
+        self.io_workers = self._positive_int(cfg, "io_workers", self.default_io_workers)
 
         self.source_name = config.get("name")
         self.metadata_tracker = MetadataTracker()
@@ -57,7 +91,22 @@ class IngestionJob(ABC):
 
         # Seen checksums - prevent reprocessing identical content
         self._seen_capacity = 10000
-        self._seen = OrderedDict()
+        self._seen: set[str] = set()
+        self._seen_order: deque[str] = deque()
+
+    @staticmethod
+    def _positive_int(cfg: dict, key: str, default: int) -> int:
+        """Read an optional integer option that must be >= 1."""
+        raw = cfg.get(key, default)
+        if isinstance(raw, bool):
+            raise ValueError(f"{key} must be an integer")
+        try:
+            value = int(raw)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"{key} must be an integer") from exc
+        if value < 1:
+            raise ValueError(f"{key} must be >= 1")
+        return value
 
     @property
     @abstractmethod
@@ -116,7 +165,7 @@ class IngestionJob(ABC):
             item: The ingestion item to return a checksum for
 
         Returns:
-            str | None: A revision string or identifier, or None to use content-based MD5
+            str | None: A revision string or identifier, or None to use content-based SHA-256
         """
         return None
 
@@ -143,9 +192,9 @@ class IngestionJob(ABC):
     def _seen_add(self, checksum: str) -> bool:
         """Track content checksums to prevent reprocessing of identical content.
 
-        Uses an LRU cache approach with OrderedDict to maintain a bounded set of
-        recently seen checksums. This prevents memory growth while avoiding
-        duplicate processing within a reasonable time window.
+        Keeps a bounded set of recently seen checksums, evicted oldest-first through
+        a deque ring. This prevents memory growth while avoiding duplicate processing
+        within a reasonable time window; a hit is a single set lookup.
 
         Args:
             checksum: Checksum or revision ID to track
@@ -154,137 +203,329 @@ class IngestionJob(ABC):
             bool: True if this is new content, False if already seen recently
         """
         if checksum in self._seen:
-            self._seen.move_to_end(checksum)
             return False
-        self._seen[checksum] = True
-        if len(self._seen) > self._seen_capacity:
-            self._seen.popitem(last=False)
+        self._seen.add(checksum)
+        self._seen_order.append(checksum)
+        if len(self._seen_order) > self._seen_capacity:
+            self._seen.discard(self._seen_order.popleft())
         return True
 
-    def process_item(self, item: IngestionItem):
-        """Process a single ingestion item through the complete pipeline.
-
-        This method orchestrates the entire ingestion workflow for one item:
-        1. Resolve checksum — either from get_item_checksum() or by fetching content and computing MD5
+    @staticmethod
+    def _is_legacy_checksum(checksum: str, raw_content: str) -> bool:
+        """Whether checksum is the MD5 of raw_content, as recorded before checksums moved to SHA-256."""
+        return (
+            len(checksum) == 32
+            and checksum == hashlib.md5(raw_content.encode("utf-8"), usedforsecurity=False).hexdigest()
+        )
+
+    @classmethod
+    def _is_content_checksum(cls, checksum: str, raw_content: str) -> bool:
+        """Whether checksum was computed from raw_content (SHA-256, or MD5 before that)."""
+        if checksum == hashlib.sha256(raw_content.encode("utf-8")).hexdigest():
+            return True
+        return cls._is_legacy_checksum(checksum, raw_content)
+
+    def _item_names(self, items: list[IngestionItem]) -> list[str]:
+        """Names of the given items; items whose name cannot be resolved are left to fail in _prepare_item."""
+        names = []
+        for item in items:
+            try:
+                names.append(self.get_item_name(item))
+            except Exception:
+                continue
+        return names
+
+    def _throttle(self):
+        """Space the starts of content fetches request_delay seconds apart.
+
+        Sleeps only for what is left of the delay since the previous fetch, so the work
+        done in between (parsing, dedup, storing) counts towards it and skipped items
+        cost no wait at all. Each io_workers thread reserves the next start time under a
+        lock, so fetches may overlap in flight while starting at most 1/request_delay per
+        second.
+        """
+        if self.request_delay <= 0:
+            return
+        with self._throttle_lock:
+            now = time.monotonic()
+            start = max(now, self._next_fetch_at)
+            self._next_fetch_at = start + self.request_delay
+        if start > now:
+            time.sleep(start - now)
+
+    def _fetch_content(self, item: IngestionItem) -> str:
+        self._throttle()
+        return self.get_raw_content(item)
+
+    def _resolve_checksum(
+        self, item: IngestionItem, latest_records: dict[str, Any] | None = None
+    ) -> tuple[str | None, str | None]:
+        """Return (pre_checksum, raw_content).
+
+        Content is fetched when there is no pre-computed checksum. With a pre-computed
+        checksum it is left for _prepare_item to fetch after the dedup checks, unless
+        latest_records (a snapshot of the stored records) already shows the item changed,
+        in which case it is fetched here too. Touches no shared job state, so run() can
+        call it from worker threads.
+        """
+        pre_checksum = self.get_item_checksum(item)
+        if not pre_checksum:
+            return None, self._fetch_content(item)
+        if latest_records is not None:
+            latest = latest_records.get(self.get_item_name(item))
+            if latest is None or latest.checksum != pre_checksum:
+                return pre_checksum, self._fetch_content(item)
+        return pre_checksum, None
+
+    def _prepare_item(
+        self,
+        item: IngestionItem,
+        latest_records: dict[str, Any] | None = None,
+        resolved: tuple[str | None, str | None] | None = None,
+    ) -> _PendingItem | None:
+        """Run the dedup checks for one item and build its document, without writing anything.
+
+        1. Resolve checksum — either from get_item_checksum() or by fetching content and computing SHA-256
         2. Skip if checksum matches the stored record (unchanged) or was already seen this run
-        3. Handle versioning and cleanup of old embeddings
-        4. Create document with metadata
-        5. Store in vector database and update metadata tracking
+        3. Resolve the next version and create the document with metadata
 
         Args:
-            item: The ingestion item to process
+            item: The ingestion item to prepare
+            latest_records: Latest records preloaded by item name (see MetadataTracker.get_latest_records_bulk);
+                looked up individually when None
+            resolved: Result of _resolve_checksum(item) when already computed
 
         Returns:
-            int: 1 if item was successfully ingested, 0 if skipped or failed
+            _PendingItem | None: The document and metadata record to store, or None if the item is skipped
         """
-        try:
-            pre_checksum = self.get_item_checksum(item)
-            raw_content = None
-
-            if pre_checksum:
-                # Fast path: resolve checksum without fetching content
-                new_checksum = pre_checksum
-            else:
-                # Standard path: fetch content and compute MD5
-                raw_content = self.get_raw_content(item)
-                if not raw_content.strip():
-                    logger.warning(f"Skipping empty content for item: {item.id}")
-                    return 0
-                new_checksum = hashlib.md5(raw_content.encode("utf-8"), usedforsecurity=False).hexdigest()
-
-            item_name = self.get_item_name(item)
-
-            # Unified dedup checks
+        pre_checksum, raw_content = resolved or self._resolve_checksum(item)
+
+        if pre_checksum:
+            # Fast path: resolve checksum without fetching content
+            new_checksum = pre_checksum
+        else:
+            # Standard path: content is fetched, compute SHA-256 (hardware-accelerated, unlike MD5)
+            if not raw_content.strip():
+                logger.warning(f"Skipping empty content for item: {item.id}")
+                return None
+            new_checksum = hashlib.sha256(raw_content.encode("utf-8")).hexdigest()
+
+        item_name = self.get_item_name(item)
+
+        # Unified dedup checks
+        if latest_records is None:
             latest = self.metadata_tracker.get_latest_record(item_name)
-            if latest and latest.checksum == new_checksum:
-                logger.info(f"Skipping unchanged item: {item_name}")
-                return 0
-            seen_key = f"{item.id}:{new_checksum}"
-            if not self._seen_add(seen_key):
-                logger.info(f"Skipping duplicate checksum for item: {item.id}")
+        else:
+            latest = latest_records.get(item_name)
+        if latest and latest.checksum == new_checksum:
+            logger.info(f"Skipping unchanged item: {item_name}")
+            return None
+        if latest and not pre_checksum and self._is_legacy_checksum(latest.checksum, raw_content):
+            # Unchanged since it was recorded with MD5; store the SHA-256 so later runs match directly
+            self.metadata_tracker.update_checksum(item_name, latest.version, new_checksum)
+            logger.info(f"Skipping unchanged item: {item_name}")
+            return None
+        seen_key = f"{item.id}:{new_checksum}"
+        if not self._seen_add(seen_key):
+            logger.info(f"Skipping duplicate checksum for item: {item.id}")
+            return None
+
+        # Fetch content for the fast path only after dedup checks pass —
+        # avoids the expensive API call when the item is unchanged or already seen.
+        if raw_content is None:
+            raw_content = self._fetch_content(item)
+        if not raw_content.strip():
+            logger.warning(f"Skipping empty content for item: {item.id}")
+            return None
+        if latest and pre_checksum and self._is_content_checksum(latest.checksum, raw_content):
+            # Unchanged since it was recorded with a checksum of its content, before the connector
+            # computed one (e.g. directory file hashes); store it so later runs skip the fetch too
+            self.metadata_tracker.update_checksum(item_name, latest.version, pre_checksum)
+            logger.info(f"Skipping unchanged item: {item_name}")
+            return None
+
+        version = (latest.version + 1) if latest else 1
+
+        last_modified_ts = item.last_modified
+        if last_modified_ts is None:
+            last_modified_ts = datetime.now(UTC)
+        elif not isinstance(last_modified_ts, datetime):
+            last_modified_ts = datetime.fromtimestamp(last_modified_ts)
+
+        # Standard metadata (reserved keys must not be overwritten by get_extra_metadata)
+        metadata = BaseMetadataSchema(
+            source=self.source_type,
+            key=item_name,
+            checksum=new_checksum,
+            version=version,
+            format=self.content_format,
+            source_name=self.source_name,
+            file_name=item_name,
+            last_modified=str(last_modified_ts),
+        ).model_dump()
+
+        extra = self.get_extra_metadata(item, raw_content, metadata)
+        if extra.keys().isdisjoint(RESERVED_METADATA_KEYS):
+            metadata.update(extra)
+        else:
+            # Keep the connector's key order: it is the order of the metadata text that gets embedded
+            metadata.update((k, v) for k, v in extra.items() if k not in RESERVED_METADATA_KEYS)
+
+        return _PendingItem(
+            item_name=item_name,
+            document=Document(text=raw_content, metadata=metadata),
+            checksum=new_checksum,
+            version=version,
+            last_modified=last_modified_ts,
+            replaces_previous=latest is not None,
+        )
+
+    def _store(self, batch: list[_PendingItem], retry: bool = False) -> None:
+        """Write prepared items with one embedding pass and one metadata commit for the whole batch.
+
+        With retry, the stored chunks of every item are replaced, not only those of updated
+        items: a failed batch may have committed its chunks before its metadata write failed.
+        """
+        replaced = [pending for pending in batch if pending.replaces_previous]
+        for pending in replaced:
+            logger.info(f"Updating item {pending.item_name} to version {pending.version}")
+
+        # Previous chunks are deleted in the transaction inserting the new ones
+        self.vector_manager.insert_documents(
+            [pending.document for pending in batch],
+            replace_keys=[pending.item_name for pending in (batch if retry else replaced)],
+        )
+
+        self.metadata_tracker.record_metadata_bulk(
+            [
+                {
+                    "key": pending.item_name,
+                    "checksum": pending.checksum,
+                    "version": pending.version,
+                    "chunks": 1,
+                    "last_modified": pending.last_modified,
+                    "extra_metadata": {"source_name": self.source_name},
+                }
+                for pending in batch
+            ]
+        )
+
+        for pending in batch:
+            logger.info(f"Successfully ingested: {pending.item_name} (version {pending.version})")
+
+    def _flush(self, batch: list[_PendingItem], retry: bool = False) -> int:
+        """Store a batch of prepared items and return how many were ingested.
+
+        If the batch write fails, the items are retried one by one so that a single
+        bad document does not discard the rest of the batch.
+        """
+        if not batch:
+            return 0
+        try:
+            self._store(batch, retry=retry)
+            return len(batch)
+        except Exception:
+            if len(batch) == 1:
+                logger.exception(f"Failed to store item {batch[0].item_name}")
                 return 0
+            logger.exception(f"Failed to store batch of {len(batch)} items, retrying one by one")
+            return sum(self._flush([pending], retry=True) for pending in batch)
 
-            # Fetch content for the fast path only after dedup checks pass —
-            # avoids the expensive API call when the item is unchanged or already seen.
-            if raw_content is None:
-                raw_content = self.get_raw_content(item)
-                if not raw_content.strip():
-                    logger.warning(f"Skipping empty content for item: {item.id}")
-                    return 0
-
-            if latest:
-                logger.info(f"Updating item {item_name} from version {latest.version}")
-                self.metadata_tracker.delete_previous_embeddings(item_name)
-
-            version = (latest.version + 1) if latest else 1
-
-            last_modified_ts = item.last_modified or datetime.now(UTC)
-
-            # Standard metadata (reserved keys must not be overwritten by get_extra_metadata)
-            metadata = BaseMetadataSchema(
-                source=self.source_type,
-                key=item_name,
-                checksum=new_checksum,
-                version=version,
-                format=self.content_format,
-                source_name=self.source_name,
-                file_name=item_name,
-                last_modified=str(last_modified_ts),
-            ).model_dump()
-
-            extra = self.get_extra_metadata(item, raw_content, metadata)
-            filtered_extra = {k: v for k, v in extra.items() if k not in BaseMetadataSchema.model_fields}
-            metadata.update(filtered_extra)
-
-            doc = Document(text=raw_content, metadata=metadata)
-
-            self.vector_manager.insert_documents([doc])
-
-            self.metadata_tracker.record_metadata(
-                item_name,
-                new_checksum,
-                version,
-                1,
-                last_modified_ts,
-                extra_metadata={"source_name": self.source_name},
-            )
-
-            logger.info(f"Successfully ingested: {item_name} (version {version})")
+    def process_item(self, item: IngestionItem):
+        """Process a single ingestion item through the complete pipeline.
 
-            gc.collect()
+        Prepares the item (see _prepare_item) and stores it right away: old embeddings
+        are replaced, the document is embedded into the vector database and its metadata
+        is recorded. run() batches the storing step across items instead.
 
-            return 1
+        Args:
+            item: The ingestion item to process
 
+        Returns:
+            int: 1 if item was successfully ingested, 0 if skipped or failed
+        """
+        try:
+            pending = self._prepare_item(item)
         except Exception:
             logger.exception(f"Failed to process item {item}")
             return 0
+        if pending is None:
+            return 0
+        return self._flush([pending])
 
     def run(self):
         """Execute the complete ingestion job for this data source.
 
-        Discovers all items using list_items(), processes each one through process_item(),
-        and provides comprehensive progress tracking and error reporting. Continues
-        processing even if individual items fail.
+        Discovers all items using list_items() and prepares each one through _prepare_item().
+        Prepared items are buffered and stored batch_size at a time, so embedding and
+        metadata writes are amortized across items. With io_workers > 1, item content is
+        fetched by a thread pool ahead of the main loop. Provides progress tracking and error
+        reporting, and continues processing even if individual items fail.
 
         Returns:
             str: Summary message indicating total items processed, skipped, and any errors
         """
         total = 0
         skipped = 0
+        batch: list[_PendingItem] = []
+
+        def flush() -> None:
+            nonlocal total, skipped
+            stored = self._flush(batch)
+            if (total + stored) // GC_INTERVAL > total // GC_INTERVAL:
+                # Refcounting frees item content; a full collection only catches cycles left by loaders
+                gc.collect()
+            total += stored
+            skipped += len(batch) - stored
+            batch.clear()
 
         logger.info(f"[{self.source_name}] Starting ingestion job")
 
-        try:
-            for item in self.list_items():
-                count = self.process_item(item)
-                if count == 0:
-                    skipped += 1
-                    continue
-
-                total += count
-                if self.request_delay > 0:
-                    time.sleep(self.request_delay)
+        executor = None
+        if self.io_workers > 1:
+            executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix=f"{self.source_name}-io")
 
+        try:
+            items = iter(self.list_items())
+            while window := list(islice(items, LOOKUP_WINDOW)):
+                latest_records = self.metadata_tracker.get_latest_records_bulk(self._item_names(window))
+                # Buffered items are not recorded yet, so they take precedence over the stored versions
+                latest_records.update({pending.item_name: pending for pending in batch})
+                # Fetch content of the window concurrently, a few items ahead of this thread;
+                # dedup, versioning and writes stay on this thread
+                fetches: deque[Future] = deque()
+                to_fetch = iter(window)
+                if executor:
+                    snapshot = dict(latest_records)
+                    for ahead in islice(to_fetch, self.io_workers * FETCH_AHEAD):
+                        fetches.append(executor.submit(self._resolve_checksum, ahead, snapshot))
+
+                for item in window:
+                    try:
+                        resolved = None
+                        if executor:
+                            # Popped so the fetched content is released once the item is prepared
+                            future = fetches.popleft()
+                            if (ahead := next(to_fetch, None)) is not None:
+                                fetches.append(executor.submit(self._resolve_checksum, ahead, snapshot))
+                            resolved = future.result()
+                        pending = self._prepare_item(item, latest_records, resolved)
+                    except Exception:
+                        logger.exception(f"Failed to process item {item}")
+                        pending = None
+                    if pending is None:
+                        skipped += 1
+                        continue
+
+                    if any(buffered.item_name == pending.item_name for buffered in batch):
+                        # Store the buffered version first so deleting its embeddings supersedes it
+                        flush()
+                    batch.append(pending)
+                    latest_records[pending.item_name] = pending
+                    if len(batch) >= self.batch_size:
+                        flush()
+
+            flush()
             result_msg = f"[{self.source_name}] Completed: {total} ingested, {skipped} skipped"
             logger.info(result_msg)
             return result_msg
@@ -292,4 +533,9 @@ class IngestionJob(ABC):
         except Exception as e:
             error_msg = f"[{self.source_name}] Job failed: {e}"
             logger.exception(error_msg)
+            flush()
             return f"{error_msg}. Partial results: {total} ingested, {skipped} skipped"
+
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
@@ -1,18 +1,26 @@
+import hashlib
 import logging
-from collections.abc import Iterable
-from datetime import datetime
+import multiprocessing
+import os
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
 
-from llama_index.core import SimpleDirectoryReader
 from pydantic import BaseModel, field_validator
 
 from tasks.base import IngestionJob
+from tasks.helper_classes.file_parser import has_file_reader, load_documents, read_text
 from tasks.helper_classes.ingestion_item import IngestionItem
 from utils.parse import parse_list
 from utils.text import sanitize_ascii_key
 
 logger = logging.getLogger(__name__)
 
+# Files of one directory stat'ed per stat_threads task
+STAT_BATCH = 256
+
 
 class DirectoryConnectorConfig(BaseModel):
     """Pydantic model validating the 'config' block of a directory connector."""
@@ -24,6 +32,8 @@ class DirectoryConnectorConfig(BaseModel):
     num_files_limit: int | None = None
     encoding: str = "utf-8"
     required_exts: list[str] | None = None
+    parse_workers: int = 0
+    stat_threads: int = 8
 
     model_config = {"extra": "ignore"}
 
@@ -47,6 +57,26 @@ class DirectoryConnectorConfig(BaseModel):
             raise ValueError("num_files_limit must be positive when provided")
         return parsed
 
+    @field_validator("parse_workers", mode="before")
+    @classmethod
+    def validate_parse_workers(cls, v):
+        if v is None or v == "":
+            return 0
+        parsed = int(v)
+        if parsed < 0:
+            raise ValueError("parse_workers must be >= 0")
+        return parsed
+
+    @field_validator("stat_threads", mode="before")
+    @classmethod
+    def validate_stat_threads(cls, v):
+        if v is None or v == "":
+            return 8
+        parsed = int(v)
+        if parsed <= 0:
+            raise ValueError("stat_threads must be positive")
+        return parsed
+
     @field_validator("required_exts", mode="before")
     @classmethod
     def normalize_required_exts(cls, v):
@@ -63,7 +93,10 @@ class DirectoryConnectorConfig(BaseModel):
 
 
 class DirectoryIngestionJob(IngestionJob):
-    """Ingest files from a local directory using LlamaIndex SimpleDirectoryReader."""
+    """Ingest files from a local directory, parsing each file with LlamaIndex SimpleDirectoryReader."""
+
+    # Reading and parsing files is independent per file
+    default_io_workers = 8
 
     @property
     def source_type(self) -> str:
@@ -73,80 +106,198 @@ class DirectoryIngestionJob(IngestionJob):
         super().__init__(config)
 
         self.connector_config = DirectoryConnectorConfig(**(config.get("config", {})))
-        self.reader = self._build_directory_reader()
+        # File readers instantiated by load_documents, reused across files
+        self._file_extractor = {}
+        # Processes parsing files when parse_workers > 0, started on first use
+        self._parser_pool: ProcessPoolExecutor | None = None
+        self._parser_pool_lock = threading.Lock()
 
-    def _build_directory_reader(self) -> SimpleDirectoryReader:
-        cfg = self.connector_config
-        # errors="ignore" drops invalid bytes during text decode; raise_on_error=True
-        # raises on reader-level failures (e.g. missing file). Binary parsers (PDF, images)
-        # do not use encoding/errors, so this combination is intentional.
-        return SimpleDirectoryReader(
-            input_dir=str(cfg.path),
-            recursive=cfg.recursive,
-            required_exts=cfg.required_exts,
-            exclude_hidden=cfg.exclude_hidden,
-            exclude_empty=cfg.exclude_empty,
-            num_files_limit=cfg.num_files_limit,
-            encoding=cfg.encoding,
-            errors="ignore",
-            raise_on_error=True,
-        )
+    def _get_parser_pool(self) -> ProcessPoolExecutor | None:
+        workers = self.connector_config.parse_workers
+        if not workers:
+            return None
+        with self._parser_pool_lock:
+            if self._parser_pool is None:
+                # spawn: forking a process that runs I/O threads and DB pools is unsafe
+                self._parser_pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._parser_pool
+
+    def _shutdown_parser_pool(self):
+        with self._parser_pool_lock:
+            if self._parser_pool is not None:
+                self._parser_pool.shutdown(cancel_futures=True)
+                self._parser_pool = None
+
+    def run(self):
+        try:
+            return super().run()
+        finally:
+            self._shutdown_parser_pool()
 
     def _sanitize_path(self, path: str) -> str:
         """Normalize a relative path into a filesystem-safe key."""
         return sanitize_ascii_key(path, max_len=255)
 
-    def _get_discovered_paths(self) -> Iterable[Path]:
-        """Yield resolved file paths under the configured directory.
+    def _scan_dir(self, directory: str) -> list[str | os.DirEntry]:
+        """List one directory level in name order, without stat calls.
 
-        Paths that resolve outside the configured base (e.g. symlinks to external
-        files) are skipped with a warning to avoid ingesting unintended content.
+        Subdirectories to descend into are returned as path strings and candidate files
+        (name and type filters passed) as DirEntry; os.scandir takes the file type from the
+        directory entry. Symlinked directories are not descended into.
         """
-        base = self.connector_config.path.resolve()
-        for resource in sorted(self.reader.list_resources()):
-            path = Path(resource).expanduser()
-            if not path.is_absolute():
-                path = base / path
-            path = path.resolve()
+        cfg = self.connector_config
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as exc:
+            logger.warning(f"Failed to list directory {directory}: {exc}")
+            return []
+
+        listing = []
+        for entry in entries:
+            if cfg.exclude_hidden and entry.name.startswith("."):
+                continue
             try:
-                path.relative_to(base)
-            except ValueError:
-                logger.warning("Skipping path outside configured directory: %s", path)
+                if entry.is_dir(follow_symlinks=False):
+                    if cfg.recursive:
+                        listing.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError as exc:
+                logger.warning(f"Failed to read file metadata for {entry.path}: {exc}")
                 continue
-            yield path
-
-    def list_items(self):
-        for file_path in self._get_discovered_paths():
-            if not file_path.is_file():
+            if cfg.required_exts is not None and os.path.splitext(entry.name)[1] not in cfg.required_exts:
                 continue
+            listing.append(entry)
+        return listing
+
+    def _stat_files(self, entries: list[os.DirEntry], base: Path) -> list[tuple[Path, os.stat_result] | None]:
+        """Stat candidate files, returning (path, stat) per entry or None for rejected ones.
 
+        Symlinked files that resolve outside the configured base (e.g. links to external
+        files) are rejected with a warning to avoid ingesting unintended content.
+        """
+        results = []
+        for entry in entries:
             try:
-                modified_at = datetime.fromtimestamp(file_path.stat().st_mtime)
+                stat = entry.stat()
             except OSError as exc:
-                logger.warning(f"Failed to read file metadata for {file_path}: {exc}")
+                logger.warning(f"Failed to read file metadata for {entry.path}: {exc}")
+                results.append(None)
                 continue
+            if self.connector_config.exclude_empty and stat.st_size == 0:
+                results.append(None)
+                continue
+
+            path = Path(entry.path)
+            if entry.is_symlink():
+                path = path.resolve()
+                try:
+                    path.relative_to(base)
+                except ValueError:
+                    logger.warning("Skipping path outside configured directory: %s", path)
+                    results.append(None)
+                    continue
+            results.append((path, stat))
+        return results
+
+    def _walk(
+        self,
+        listing: list[str | os.DirEntry],
+        base: Path,
+        executor: ThreadPoolExecutor | None = None,
+    ) -> Iterator[tuple[Path, os.stat_result]]:
+        """Yield (path, stat) of the accepted files under a _scan_dir listing, depth-first in name order.
 
-            yield IngestionItem(
-                id=f"file://{file_path}",
-                source_ref=file_path,
-                last_modified=modified_at,
-            )
+        With an executor, the subdirectories of a listing are scanned and its files stat'ed in
+        batches of STAT_BATCH concurrently as soon as it is reached, so stat latency (network
+        filesystems, cold caches) overlaps while files are still yielded in serial-walk order.
+        """
+        files = [entry for entry in listing if not isinstance(entry, str)]
+        batches = [files[i : i + STAT_BATCH] for i in range(0, len(files), STAT_BATCH)]
+        if executor is None:
+            stats = (self._stat_files(batch, base) for batch in batches)
+            subdirs = {}
+        else:
+            stats = (future.result() for future in [executor.submit(self._stat_files, b, base) for b in batches])
+            subdirs = {entry: executor.submit(self._scan_dir, entry) for entry in listing if isinstance(entry, str)}
+
+        stat_results = chain.from_iterable(stats)
+        for entry in listing:
+            if isinstance(entry, str):
+                sublisting = self._scan_dir(entry) if executor is None else subdirs.pop(entry).result()
+                yield from self._walk(sublisting, base, executor)
+            elif (result := next(stat_results)) is not None:
+                yield result
+
+    def list_items(self):
+        cfg = self.connector_config
+        base = cfg.path.resolve()
+        executor = None
+        if cfg.stat_threads > 1:
+            executor = ThreadPoolExecutor(max_workers=cfg.stat_threads, thread_name_prefix=f"{self.source_name}-scan")
+        try:
+            files = self._walk(self._scan_dir(str(base)), base, executor)
+            if cfg.num_files_limit is not None:
+                files = islice(files, cfg.num_files_limit)
+
+            for file_path, stat in files:
+                yield IngestionItem(
+                    id=f"file://{file_path}",
+                    source_ref=file_path,
+                    last_modified=stat.st_mtime,
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
 
     def _load_documents_for_path(self, file_path: Path):
-        """Load one file using the initialized directory reader context."""
-        return self.reader.load_resource(str(file_path))
+        """Load one file with the SimpleDirectoryReader file readers, in a parser process when configured.
+
+        PDF, DOCX and spreadsheet parsers are CPU-bound Python that holds the GIL, so
+        parse_workers processes let parsing scale with cores.
+        """
+        encoding = self.connector_config.encoding
+        pool = self._get_parser_pool()
+        if pool is None:
+            return load_documents(file_path, encoding, self._file_extractor)
+        return pool.submit(load_documents, file_path, encoding).result()
+
+    def get_item_checksum(self, item: IngestionItem) -> str | None:
+        """Return the SHA-256 of the file bytes, so unchanged files are skipped before they are parsed.
+
+        Hashing is far cheaper than parsing PDFs or office documents.
+        """
+        try:
+            with open(item.source_ref, "rb") as f:
+                return hashlib.file_digest(f, "sha256").hexdigest()
+        except OSError as exc:
+            logger.warning(f"Failed to hash file {item.source_ref}: {exc}")
+            return None
 
     def get_raw_content(self, item: IngestionItem):
         file_path = Path(item.source_ref)
 
+        if not has_file_reader(file_path):
+            # Plain text (.txt, .log, source code, ...): SimpleDirectoryReader would only read and
+            # decode it, so skip building Documents and the round trip to a parser process
+            try:
+                return read_text(file_path, self.connector_config.encoding).strip()
+            except (OSError, LookupError) as exc:
+                logger.warning("[%s] Failed to read file: %s", file_path, exc)
+                return ""
+
         try:
             docs = self._load_documents_for_path(file_path)
         except Exception as exc:
             logger.warning("[%s] SimpleDirectoryReader failed: %s", file_path, exc, exc_info=True)
             return ""
 
-        merged = "\n\n".join((doc.text or "").strip() for doc in docs if (doc.text or "").strip())
-        return merged if merged.strip() else ""
+        # Each piece is stripped and non-empty, so the joined text needs no further strip
+        return "\n\n".join([text for doc in docs if (text := (doc.text or "").strip())])
 
     def get_item_name(self, item: IngestionItem) -> str:
         """Return a filesystem-safe name for the item.
@@ -155,9 +306,16 @@ class DirectoryIngestionJob(IngestionJob):
         the base (e.g. symlink escape), falls back to the bare filename; callers
         should be aware this can collide if multiple such files share the same name.
         """
-        file_path = Path(item.source_ref).resolve()
+        base = self.connector_config.path
+        path = os.fspath(item.source_ref)
+        prefix = os.path.join(base, "")
+        if path.startswith(prefix) and ".." not in path:
+            # list_items yields normalized paths under the resolved base: no resolve() syscalls needed
+            return self._sanitize_path(path[len(prefix) :])
+
+        file_path = Path(path).resolve()
         try:
-            relative_path = file_path.relative_to(self.connector_config.path)
+            relative_path = file_path.relative_to(base)
         except ValueError:
             logger.warning("Path %s is outside configured directory, falling back to filename", file_path)
             relative_path = file_path.name
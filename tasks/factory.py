@@ -1,38 +1,49 @@
+import importlib
+
 from tasks.base import IngestionJob
-from tasks.directory_ingestion import DirectoryIngestionJob
-from tasks.imap_ingestion import IMAPIngestionJob
-from tasks.jira_ingestion import JiraIngestionJob
-from tasks.mediawiki_ingestion import MediaWikiIngestionJob
-from tasks.pipedrive_ingestion import PipedriveIngestionJob
-from tasks.s3_ingestion import S3IngestionJob
-from tasks.serpapi_ingestion import SerpAPIIngestionJob
-from tasks.slack_ingestion import SlackIngestionJob
-from tasks.web_ingestion import WebIngestionJob
 
 
 class IngestionJobFactory:
-    _registry = {}
+    # Job class per type, or its "module:ClassName" path until the type is first created,
+    # so a worker only imports the connectors (and their client libraries) it runs
+    _registry: dict[str, type[IngestionJob] | str] = {}
+
+    @classmethod
+    def register(cls, job_type: str, job_class: type[IngestionJob] | str):
+        if not isinstance(job_class, str) and not issubclass(job_class, IngestionJob):
+            raise ValueError(f"{job_class} must inherit from IngestionJob")
+        cls._registry[job_type] = job_class
 
     @classmethod
-    def register(cls, job_type: str, job_class):
+    def _resolve(cls, job_type: str, path: str) -> type[IngestionJob]:
+        module_name, _, class_name = path.partition(":")
+        job_class = getattr(importlib.import_module(module_name), class_name)
         if not issubclass(job_class, IngestionJob):
             raise ValueError(f"{job_class} must inherit from IngestionJob")
         cls._registry[job_type] = job_class
+        return job_class
 
     @classmethod
-    def create(cls, job_type: str, config: dict) -> IngestionJob:
+    def get_job_class(cls, job_type: str) -> type[IngestionJob]:
+        """Return the job class of job_type, importing its connector module on first use."""
         job_class = cls._registry.get(job_type)
         if not job_class:
             raise ValueError(f"No ingestion job registered for type: {job_type}")
-        return job_class(config)
-
-
-IngestionJobFactory.register("s3", S3IngestionJob)
-IngestionJobFactory.register("mediawiki", MediaWikiIngestionJob)
-IngestionJobFactory.register("jira", JiraIngestionJob)
-IngestionJobFactory.register("serpapi", SerpAPIIngestionJob)
-IngestionJobFactory.register("directory", DirectoryIngestionJob)
-IngestionJobFactory.register("web", WebIngestionJob)
-IngestionJobFactory.register("pipedrive", PipedriveIngestionJob)
-IngestionJobFactory.register("slack", SlackIngestionJob)
-IngestionJobFactory.register("imap", IMAPIngestionJob)
+        if isinstance(job_class, str):
+            job_class = cls._resolve(job_type, job_class)
+        return job_class
+
+    @classmethod
+    def create(cls, job_type: str, config: dict) -> IngestionJob:
+        return cls.get_job_class(job_type)(config)
+
+
+IngestionJobFactory.register("s3", "tasks.s3_ingestion:S3IngestionJob")
+IngestionJobFactory.register("mediawiki", "tasks.mediawiki_ingestion:MediaWikiIngestionJob")
+IngestionJobFactory.register("jira", "tasks.jira_ingestion:JiraIngestionJob")
+IngestionJobFactory.register("serpapi", "tasks.serpapi_ingestion:SerpAPIIngestionJob")
+IngestionJobFactory.register("directory", "tasks.directory_ingestion:DirectoryIngestionJob")
+IngestionJobFactory.register("web", "tasks.web_ingestion:WebIngestionJob")
+IngestionJobFactory.register("pipedrive", "tasks.pipedrive_ingestion:PipedriveIngestionJob")
+IngestionJobFactory.register("slack", "tasks.slack_ingestion:SlackIngestionJob")
+IngestionJobFactory.register("imap", "tasks.imap_ingestion:IMAPIngestionJob")
@@ -0,0 +1,46 @@
+from functools import cache
+from pathlib import Path
+
+from llama_index.core import Document, SimpleDirectoryReader
+
+# File readers instantiated by load_documents, reused across files of this process.
+# Kept free of settings/DB imports so parser worker processes start cheaply.
+_file_extractor: dict = {}
+
+
+def load_documents(file_path: Path, encoding: str = "utf-8", file_extractor: dict | None = None) -> list[Document]:
+    """Parse one file with the SimpleDirectoryReader file readers.
+
+    Module-level so it can run in a ProcessPoolExecutor worker. Dispatches on the suffix
+    like SimpleDirectoryReader.load_file, without re-importing the reader classes per file;
+    reader errors propagate to the caller. Files without a dedicated reader are decoded
+    with errors="ignore".
+    """
+    file_path = Path(file_path)
+    extractor = _file_extractor if file_extractor is None else file_extractor
+    suffix = file_path.suffix.lower()
+    reader = extractor.get(suffix)
+    if reader is None:
+        reader_cls = _reader_classes().get(suffix)
+        if reader_cls is None:
+            return [Document(text=read_text(file_path, encoding))]
+        reader = extractor.setdefault(suffix, reader_cls())
+    return reader.load_data(file_path, extra_info=None)
+
+
+@cache
+def _reader_classes() -> dict[str, type]:
+    # Reader class per suffix among the installed llama-index file readers; SimpleDirectoryReader
+    # re-imports them on every load_file call
+    return SimpleDirectoryReader.supported_suffix_fn()
+
+
+def has_file_reader(file_path: Path) -> bool:
+    """Whether load_documents parses the file with a dedicated reader rather than reading it as text."""
+    return Path(file_path).suffix.lower() in _reader_classes()
+
+
+def read_text(file_path: Path, encoding: str = "utf-8") -> str:
+    """Read a file without a dedicated reader, decoding it the way load_documents does."""
+    with open(file_path, "rb") as f:
+        return f.read().decode(encoding, errors="ignore")
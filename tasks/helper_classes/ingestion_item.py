@@ -3,11 +3,12 @@ from datetime import datetime
 from typing import Any
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IngestionItem:
     id: str
     source_ref: Any
-    last_modified: datetime | None = None
+    # A POSIX timestamp is converted to a (local) datetime only for items that get stored
+    last_modified: datetime | float | None = None
     # Mutable field for caching additional metadata during processing
     # Excluded from equality and hashing to keep the dataclass hashable
     _metadata_cache: dict[str, Any] = field(default_factory=dict, init=False, compare=False, hash=False)
@@ -1,6 +1,6 @@
-from sqlalchemy import delete
+from sqlalchemy import String, any_, bindparam, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 
-from models.embedding import DataEmbeddings
 from models.metadata import MetaData
 from utils.db import get_db_session
 
@@ -20,20 +20,62 @@ class MetadataTracker:
             )
             return row
 
+    def get_latest_records_bulk(self, keys: list[str]) -> dict:
+        """Latest (checksum, version) row of each key that has one, fetched with a single query."""
+        if not keys:
+            return {}
+        with get_db_session() as db:
+            rows = db.execute(
+                select(MetaData.key, MetaData.checksum, MetaData.version)
+                # One array parameter rather than an IN list: the statement text is the same for any
+                # number of keys, so the server sees a single query shape (pg_stat_statements, pgbouncer)
+                .where(MetaData.key == any_(bindparam("keys", list(set(keys)), type_=ARRAY(String))))
+                .distinct(MetaData.key)
+                .order_by(MetaData.key, MetaData.version.desc())
+            ).all()
+            return {row.key: row for row in rows}
+
     def record_metadata(self, key, checksum, version, chunks, last_modified, extra_metadata=None):
+        self.record_metadata_bulk(
+            [
+                {
+                    "key": key,
+                    "checksum": checksum,
+                    "version": version,
+                    "chunks": chunks,
+                    "last_modified": last_modified,
+                    "extra_metadata": extra_metadata,
+                }
+            ]
+        )
+
+    def record_metadata_bulk(self, records: list[dict]):
+        """Record several items with one multi-row INSERT, with the same fields as record_metadata."""
+        if not records:
+            return
         with get_db_session() as db:
-            meta_entry = MetaData(
-                key=key,
-                checksum=checksum,
-                version=version,
-                metadata_content={"chunks": chunks, "source": "generic", **(extra_metadata or {})},
-                last_modified=last_modified,
+            # Core-style insert: no ORM objects and no RETURNING of the generated ids
+            db.execute(
+                insert(MetaData),
+                [
+                    {
+                        "key": record["key"],
+                        "checksum": record["checksum"],
+                        "version": record["version"],
+                        "metadata_content": {
+                            "chunks": record["chunks"],
+                            "source": "generic",
+                            **(record.get("extra_metadata") or {}),
+                        },
+                        "last_modified": record["last_modified"],
+                    }
+                    for record in records
+                ],
             )
-            db.add(meta_entry)
             # Commit handled by context manager
 
-    def delete_previous_embeddings(self, key: str):
+    def update_checksum(self, key: str, version: int, checksum: str):
         with get_db_session() as db:
-            stmt = delete(DataEmbeddings).where(DataEmbeddings.key_text == key)
+            stmt = update(MetaData).where(MetaData.key == key, MetaData.version == version).values(checksum=checksum)
             db.execute(stmt)
             # Commit handled by context manager
@@ -1,69 +1,171 @@
-import gc
+import io
+import json
+import struct
+import threading
+
+import numpy as np
+from llama_index.core.ingestion import IngestionPipeline
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import MetadataMode
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
+from sqlalchemy import text
 
 from utils.config import settings
-from utils.llm_embedding import embed_model
+from utils.db import pool_kwargs
+from utils.llm_embedding import NormalizeEmbeddings, embed_model
+
+# COPY ... WITH (FORMAT BINARY) framing: signature, flags and header extension length
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_COPY_TRAILER = struct.pack(">h", -1)
+_COPY_COLUMNS = ("node_id", "text", "metadata_", "embedding")
+
+
+def _copy_field(value: bytes) -> bytes:
+    return struct.pack(">i", len(value)) + value
+
+
+_vector_store = None
+_vector_store_lock = threading.Lock()
+
+
+def get_vector_store():
+    """Return the PGVectorStore shared by all ingestion jobs of this process.
+
+    Jobs are created per task run; sharing the store keeps its connection pool
+    (and the per-connection handshakes) across runs instead of opening a new pool
+    for every run.
+    """
+    global _vector_store
+    with _vector_store_lock:
+        if _vector_store is None:
+            from llama_index.vector_stores.postgres import PGVectorStore
+
+            postgres = settings.POSTGRES
+            embedding = settings.EMBEDDING
+
+            _vector_store = PGVectorStore.from_params(
+                database=postgres["database"],
+                host=postgres["host"],
+                password=postgres["password"],
+                port=postgres["port"],
+                user=postgres["user"],
+                table_name=postgres["table_name"],
+                embed_dim=embedding["dim"],
+                hybrid_search=postgres.get("hybrid_search", True),
+                use_halfvec=postgres.get("use_halfvec", False),
+                hnsw_kwargs={
+                    "hnsw_m": postgres.get("hnsw_m", 24),
+                    "hnsw_ef_construction": postgres.get("hnsw_ef_construction", 128),
+                    "hnsw_ef_search": postgres.get("hnsw_ef_search", "auto"),
+                    "hnsw_dist_method": postgres.get("hnsw_dist_method", "vector_cosine_ops"),
+                },
+                # A job writes from one thread; the overflow covers schema setup on first use
+                create_engine_kwargs=pool_kwargs(pool_size=1, max_overflow=1),
+            )
+        return _vector_store
 
 
 class VectorStoreManager:
     def __init__(self):
         self._initialized = False
         self.vector_store = None
-        self.storage_context = None
+        self._pipeline = None
+        # Column types ("json"/"jsonb", "vector"/"halfvec") deciding the COPY binary encoding
+        self._metadata_type = None
+        self._embedding_type = None
 
     def _init_if_needed(self):
         if self._initialized:
             return
-        from llama_index.core import StorageContext
-        from llama_index.vector_stores.postgres import PGVectorStore
-
-        postgres = settings.POSTGRES
-        embedding = settings.EMBEDDING
-
-        self.vector_store = PGVectorStore.from_params(
-            database=postgres["database"],
-            host=postgres["host"],
-            password=postgres["password"],
-            port=postgres["port"],
-            user=postgres["user"],
-            table_name=postgres["table_name"],
-            embed_dim=embedding["dim"],
-            hybrid_search=postgres.get("hybrid_search", True),
-            hnsw_kwargs={
-                "hnsw_m": postgres.get("hnsw_m", 16),
-                "hnsw_ef_construction": postgres.get("hnsw_ef_construction", 64),
-                "hnsw_ef_search": postgres.get("hnsw_ef_search", 40),
-                "hnsw_dist_method": postgres.get("hnsw_dist_method", "vector_cosine_ops"),
-            },
-        )
-        self.storage_context = StorageContext.from_defaults(vector_store=self.vector_store)
-        self._initialized = True
-
-    def insert_documents(self, docs: list):
-        self._init_if_needed()
-        from llama_index.core import VectorStoreIndex
-        from llama_index.core.ingestion import IngestionPipeline
-        from llama_index.core.node_parser import SentenceSplitter
+        self.vector_store = get_vector_store()
 
         vector_store = settings.POSTGRES
-
         splitter = SentenceSplitter(
             chunk_size=vector_store["chunk_size"],
             chunk_overlap=vector_store["chunk_overlap"],
         )
-
-        pipeline = IngestionPipeline(
+        # Built once per manager; the cache is disabled because it would keep every
+        # batch's nodes and embeddings in memory (and hashes each transformation input)
+        self._pipeline = IngestionPipeline(
             transformations=[
                 splitter,
                 embed_model,
-            ]
+                NormalizeEmbeddings(),
+            ],
+            disable_cache=True,
         )
+        self._initialized = True
 
-        nodes = pipeline.run(documents=docs)
+    def _resolve_column_types(self, connection):
+        if self._metadata_type is not None:
+            return
+        table = self.vector_store._table_class.__table__
+        rows = connection.execute(
+            text(
+                "SELECT attname, atttypid::regtype::text FROM pg_attribute "
+                "WHERE attrelid = CAST(:table AS regclass) AND attname IN ('metadata_', 'embedding')"
+            ),
+            {"table": f'"{table.schema}"."{table.name}"'},
+        )
+        types = dict(rows.tuples().all())
+        self._metadata_type = types["metadata_"]
+        self._embedding_type = types["embedding"]
 
-        VectorStoreIndex(nodes=nodes, embed_model=embed_model, storage_context=self.storage_context)
+    def _encode_row(self, node) -> bytes:
+        metadata = json.dumps(
+            node_to_metadata_dict(node, remove_text=True, flat_metadata=self.vector_store.flat_metadata)
+        ).encode("utf-8")
+        if self._metadata_type == "jsonb":
+            # jsonb binary format: version byte followed by the JSON text
+            metadata = b"\x01" + metadata
+        embedding = node.get_embedding()
+        dtype = ">f2" if self._embedding_type == "halfvec" else ">f4"
+        # vector/halfvec binary format: int16 dimensions, int16 unused, big-endian floats
+        embedding = struct.pack(">hh", len(embedding), 0) + np.asarray(embedding, dtype=dtype).tobytes()
 
-        try:
-            del docs
-        except Exception:
-            pass
-        gc.collect()
+        return (
+            struct.pack(">h", len(_COPY_COLUMNS))
+            + _copy_field(node.node_id.encode("utf-8"))
+            + _copy_field(node.get_content(metadata_mode=MetadataMode.NONE).encode("utf-8"))
+            + _copy_field(metadata)
+            + _copy_field(embedding)
+        )
+
+    def _copy_nodes(self, nodes: list, replace_keys: list[str] | None = None):
+        """Insert embedded nodes with one binary COPY instead of per-row INSERTs.
+
+        Writes the same columns as PGVectorStore.add; generated columns (text_search_tsv,
+        key_text, reference_json, ...) are computed by Postgres as for an INSERT. The chunks
+        of replace_keys are deleted in the same transaction, so readers never see an updated
+        item with no chunks or with both versions.
+        """
+        if not nodes and not replace_keys:
+            return
+        self.vector_store._initialize()
+        table = self.vector_store._table_class.__table__
+        table_name = f'"{table.schema}"."{table.name}"'
+        with self.vector_store._engine.begin() as connection:
+            if replace_keys:
+                connection.execute(
+                    text(f"DELETE FROM {table_name} WHERE key_text = ANY(:keys)"), {"keys": list(set(replace_keys))}
+                )
+            if not nodes:
+                return
+            self._resolve_column_types(connection)
+            payload = io.BytesIO()
+            payload.write(_COPY_HEADER)
+            for node in nodes:
+                payload.write(self._encode_row(node))
+            payload.write(_COPY_TRAILER)
+            payload.seek(0)
+            with connection.connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {table_name} ({', '.join(_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT BINARY)",
+                    payload,
+                )
+
+    def insert_documents(self, docs: list, replace_keys: list[str] | None = None):
+        """Chunk, embed and store documents, replacing the stored chunks of replace_keys."""
+        self._init_if_needed()
+        nodes = self._pipeline.run(documents=docs)
+        self._copy_nodes(nodes, replace_keys)
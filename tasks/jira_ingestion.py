@@ -1,5 +1,8 @@
+import io
 import logging
-from collections.abc import Iterator
+import re
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from jira import JIRA
@@ -8,10 +11,34 @@ from markitdown import MarkItDown
 from tasks.base import IngestionJob
 from tasks.helper_classes.ingestion_item import IngestionItem
 from utils.parse import parse_bool, parse_timestamp
-from utils.text import slugify
+from utils.text import normalize_markitdown_text, slugify
 
 logger = logging.getLogger(__name__)
 
+_HTML_TAG_RE = re.compile(r"<[A-Za-z!/]")
+
+# Fields read from search results; "comment" is requested on top only when comments are loaded
+ISSUE_FIELDS = "summary,description,status,assignee,reporter,labels,project,priority,updated"
+
+
+def _is_convertible(text: str) -> bool:
+    """Whether MarkItDown may convert text: it has an HTML tag or starts like a CSV/TSV table.
+
+    Other text only gets MarkItDown's line normalization (see normalize_markitdown_text).
+
+    A table's first two lines hold the same number of delimiters; prose with commas rarely does.
+    """
+    if _HTML_TAG_RE.search(text):
+        return True
+    lines = text.lstrip().split("\n", 2)
+    if len(lines) < 2:
+        return False
+    for delimiter in (",", "\t"):
+        count = lines[0].count(delimiter)
+        if count and lines[1].count(delimiter) == count:
+            return True
+    return False
+
 
 class JiraIngestionJob(IngestionJob):
     """Ingestion connector for Jira Cloud and on-premise instances.
@@ -32,9 +59,14 @@ class JiraIngestionJob(IngestionJob):
         - config.max_results: Maximum number of issues to fetch (optional, default 50)
         - config.load_comments: Whether to load issue comments (optional, default False)
         - config.max_comments: Maximum comments to include per issue (optional, default 10)
+        - config.io_workers: Issues converted (and comments fetched) concurrently (optional, default 4)
         - config.schedules: Celery schedule in seconds (optional)
     """
 
+    # Description conversion and comment requests are independent per issue; the JIRA
+    # client's session pools connections and retries 429s after Retry-After
+    default_io_workers = 4
+
     @property
     def source_type(self) -> str:
         return "jira"
@@ -77,6 +109,7 @@ class JiraIngestionJob(IngestionJob):
         self.max_comments = int(cfg.get("max_comments", 10))
         if self.max_comments <= 0:
             raise ValueError("max_comments must be positive")
+        self._issue_fields = f"{ISSUE_FIELDS},comment" if self.load_comments else ISSUE_FIELDS
 
         # Build authenticated JIRA client
         self._jira = self._build_client()
@@ -120,29 +153,43 @@ class JiraIngestionJob(IngestionJob):
 
         logger.info(f"[{self.source_name}] Found {fetched} issue(s)")
 
-    def _list_items_cloud(self, fetched: int) -> Iterator[IngestionItem]:
-        """Paginate using nextPageToken (Jira Cloud)."""
-        next_page_token = None
-
-        while fetched < self.max_results:
-            batch_limit = min(100, self.max_results - fetched)
-            try:
-                issues = self._jira.enhanced_search_issues(
-                    self.jql,
-                    nextPageToken=next_page_token,
-                    maxResults=batch_limit,
-                    fields="summary,description,status,assignee,reporter,labels,project,priority,issuetype,updated,created,comment",
-                )
-            except Exception as e:
-                logger.error(f"[{self.source_name}] Failed to search issues: {e}")
-                break
+    def _prefetched_pages(
+        self,
+        search: Callable[..., list],
+        page_args: dict,
+        next_page_args: Callable[[list, dict, int], dict | None],
+    ) -> Iterator[list]:
+        """Yield pages of search(**page_args), at most max_results issues in total.
+
+        The next page is requested on a background thread as soon as the current one
+        arrives, so its round trip overlaps with the consumer processing the current
+        page. next_page_args(issues, args, fetched) returns the arguments of the page
+        following the one requested with args, or None when it is the last one.
+        """
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.source_name}-pages") as executor:
+            args = page_args
+            future = executor.submit(search, **args)
+            while future is not None:
+                try:
+                    issues = future.result()
+                except Exception as e:
+                    logger.error(f"[{self.source_name}] Failed to search issues: {e}")
+                    return
+
+                if not issues:
+                    return
 
-            if not issues:
-                break
+                page = issues[: self.max_results - fetched]
+                fetched += len(page)
+                future = None
+                if fetched < self.max_results and (args := next_page_args(issues, args, fetched)) is not None:
+                    future = executor.submit(search, **args)
+                yield page
 
+    def _yield_items(self, pages: Iterator[list], fetched: int) -> Iterator[IngestionItem]:
+        for issues in pages:
             for issue in issues:
-                if fetched >= self.max_results:
-                    break
                 updated_at = parse_timestamp(getattr(issue.fields, "updated", None))
                 yield IngestionItem(
                     id=f"jira:{issue.key}",
@@ -150,50 +197,40 @@ class JiraIngestionJob(IngestionJob):
                     last_modified=updated_at,
                 )
                 fetched += 1
+        return fetched
 
-            next_page_token = issues.nextPageToken
-            if not next_page_token:
-                break
+    def _list_items_cloud(self, fetched: int) -> Iterator[IngestionItem]:
+        """Paginate using nextPageToken (Jira Cloud)."""
 
-        return fetched
+        def search(next_page_token, max_results):
+            return self._jira.enhanced_search_issues(
+                self.jql, nextPageToken=next_page_token, maxResults=max_results, fields=self._issue_fields
+            )
 
-    def _list_items_server(self, fetched: int) -> Iterator[IngestionItem]:
-        """Paginate using startAt offset (Jira Server/Data Center)."""
-        start_at = 0
-
-        while fetched < self.max_results:
-            batch_limit = min(100, self.max_results - fetched)
-            try:
-                issues = self._jira.search_issues(
-                    self.jql,
-                    startAt=start_at,
-                    maxResults=batch_limit,
-                    fields="summary,description,status,assignee,reporter,labels,project,priority,issuetype,updated,created,comment",
-                )
-            except Exception as e:
-                logger.error(f"[{self.source_name}] Failed to search issues: {e}")
-                break
+        def next_page_args(issues, args, fetched):
+            if not issues.nextPageToken:
+                return None
+            return {"next_page_token": issues.nextPageToken, "max_results": min(100, self.max_results - fetched)}
 
-            if not issues:
-                break
+        first_page = {"next_page_token": None, "max_results": min(100, self.max_results - fetched)}
+        return (yield from self._yield_items(self._prefetched_pages(search, first_page, next_page_args), fetched))
 
-            for issue in issues:
-                if fetched >= self.max_results:
-                    break
-                updated_at = parse_timestamp(getattr(issue.fields, "updated", None))
-                yield IngestionItem(
-                    id=f"jira:{issue.key}",
-                    source_ref=issue,
-                    last_modified=updated_at,
-                )
-                fetched += 1
+    def _list_items_server(self, fetched: int) -> Iterator[IngestionItem]:
+        """Paginate using startAt offset (Jira Server/Data Center)."""
 
-            if len(issues) < batch_limit:
-                break
+        def search(start_at, max_results):
+            return self._jira.search_issues(
+                self.jql, startAt=start_at, maxResults=max_results, fields=self._issue_fields
+            )
 
-            start_at += len(issues)
+        def next_page_args(issues, args, fetched):
+            # A short page is the last one
+            if len(issues) < args["max_results"]:
+                return None
+            return {"start_at": args["start_at"] + len(issues), "max_results": min(100, self.max_results - fetched)}
 
-        return fetched
+        first_page = {"start_at": 0, "max_results": min(100, self.max_results - fetched)}
+        return (yield from self._yield_items(self._prefetched_pages(search, first_page, next_page_args), fetched))
 
     def get_raw_content(self, item: IngestionItem) -> str:
         """Build Markdown-formatted content from a Jira issue.
@@ -267,9 +304,13 @@ class JiraIngestionJob(IngestionJob):
         if not text or not text.strip():
             return ""
 
-        try:
-            import io
+        # MarkItDown only converts text it detects as HTML or CSV/TSV; anything else (prose,
+        # Jira wiki markup, JSON) comes back with just its line normalization applied, after
+        # ~10 ms of type detection, so apply that normalization directly
+        if not _is_convertible(text):
+            return normalize_markitdown_text(text).strip()
 
+        try:
             result = self._md.convert_stream(io.BytesIO(text.encode("utf-8")))
             converted = result.text_content or ""
             return converted.strip() if converted.strip() else text
@@ -277,37 +318,46 @@ class JiraIngestionJob(IngestionJob):
             return text
 
     def _extract_adf_text(self, adf: dict) -> str:
-        """Recursively extract plain text from an Atlassian Document Format (ADF) node."""
-        text_parts: list[str] = []
+        """Extract plain text from an Atlassian Document Format (ADF) node.
 
-        def walk(node: Any) -> None:
+        Walks the tree depth-first with an explicit stack, so deeply nested documents
+        cannot hit the recursion limit.
+        """
+        text_parts: list[str] = []
+        stack: list[Any] = [adf]
+        while stack:
+            node = stack.pop()
             if isinstance(node, dict):
                 node_type = node.get("type", "")
                 # Text leaf node
                 if node_type == "text":
                     text_parts.append(node.get("text", ""))
-                    return
                 # Heading — prepend Markdown '#' markers
-                if node_type == "heading":
-                    level = node.get("attrs", {}).get("level", 1)
-                    prefix = "#" * level + " "
-                    for child in node.get("content", []):
-                        if child.get("type") == "text":
-                            text_parts.append(prefix + child.get("text", ""))
-                    return
-                for child in node.get("content", []):
-                    walk(child)
+                elif node_type == "heading":
+                    prefix = "#" * node.get("attrs", {}).get("level", 1) + " "
+                    text_parts.extend(
+                        prefix + child.get("text", "")
+                        for child in node.get("content", [])
+                        if child.get("type") == "text"
+                    )
+                else:
+                    # Reversed so children are popped in document order
+                    stack.extend(reversed(node.get("content", [])))
             elif isinstance(node, list):
-                for item in node:
-                    walk(item)
-
-        walk(adf)
+                stack.extend(reversed(node))
         return "\n".join(text_parts)
 
     def _build_comments_section(self, issue: Any) -> str:
-        """Fetch and format the top N comments for an issue as Markdown."""
+        """Format the top N comments for an issue as Markdown.
+
+        Uses the comments embedded in the search response (the "comment" field); a comments
+        request, limited to max_comments, is only made when the embedded page holds fewer
+        than the comments needed.
+        """
         try:
-            comments = self._jira.comments(issue)
+            comments = self._embedded_comments(issue)
+            if comments is None:
+                comments = self._jira.comments(issue, max_results=self.max_comments)
         except Exception as e:
             logger.warning(f"[{self.source_name}] Failed to fetch comments for {issue.key}: {e}")
             return ""
@@ -327,6 +377,19 @@ class JiraIngestionJob(IngestionJob):
 
         return "\n\n".join(lines)
 
+    def _embedded_comments(self, issue: Any) -> list | None:
+        """Return the comments of the search response's comment field, or None if incomplete."""
+        embedded = getattr(issue.fields, "comment", None)
+        comments = getattr(embedded, "comments", None)
+        if not isinstance(comments, list):
+            return None
+        total = getattr(embedded, "total", None)
+        if not isinstance(total, int):
+            total = len(comments)
+        if len(comments) < min(total, self.max_comments):
+            return None
+        return comments
+
     @staticmethod
     def _safe_display_name(obj: Any) -> str:
         """Extract ``displayName`` from a Jira user object, or return empty string."""
@@ -7,7 +7,7 @@ import mwclient
 import requests
 from llama_index.readers.mediawiki import MediaWikiReader
 from mwclient.client import USER_AGENT
-from requests.adapters import HTTPAdapter
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
 from tasks.base import IngestionJob
 from tasks.helper_classes.ingestion_item import IngestionItem
@@ -47,6 +47,9 @@ class HostOverrideAdapter(HTTPAdapter):
 
 
 class MediaWikiIngestionJob(IngestionJob):
+    # Page parses are independent API round trips over the shared mwclient session
+    default_io_workers = 4
+
     @property
     def source_type(self) -> str:
         return "mediawiki"
@@ -69,6 +72,7 @@ class MediaWikiIngestionJob(IngestionJob):
                 - config.resolve_to_ip: IP address to resolve the API hostname to (optional)
                 - config.custom_headers: Dict of extra HTTP headers to send (optional)
                 - config.user_agent: Override HTTP User-Agent (optional, default mwclient UA)
+                - config.io_workers: Pages fetched concurrently (optional, default 4)
 
         Raises:
             ValueError: If host is not provided
@@ -129,11 +133,14 @@ class MediaWikiIngestionJob(IngestionJob):
         # When network overrides are set, pre-create Site with a custom session
         # and inject it so login/list/fetch all use the same HTTP configuration.
         #
+        # More io_workers than requests' default pool size also need a custom
+        # session, or connections beyond the pool are discarded after each request.
+        #
         # NOTE (tech debt): Prefer pushing verify_ssl / resolve_to_ip /
         # custom_headers / user_agent into MediaWikiReader itself (constructor
         # fields or a configure_http() that owns Site creation) so this job
         # only maps config and does not touch _site / mwclient.Site
-        if not self.verify_ssl or resolve_to_ip or custom_headers or user_agent:
+        if not self.verify_ssl or resolve_to_ip or custom_headers or user_agent or self.io_workers > DEFAULT_POOLSIZE:
             self._reader._site = self._build_mwclient_site(
                 host=host,
                 path=path,
@@ -164,7 +171,7 @@ class MediaWikiIngestionJob(IngestionJob):
         custom_headers: dict[str, str] | None,
         user_agent: str | None,
     ) -> mwclient.Site:
-        """Build an mwclient Site with SSL, DNS override, and header options.
+        """Build an mwclient Site with SSL, DNS override, header and connection pool options.
 
         Uses a custom requests Session (passed as pool) so HostOverrideAdapter
         and header/SSL settings apply to every API call.
@@ -189,13 +196,16 @@ class MediaWikiIngestionJob(IngestionJob):
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
             logger.warning("SSL certificate verification is disabled")
 
+        # Keep a pooled connection per io_workers thread
+        pool_size = max(self.io_workers, DEFAULT_POOLSIZE)
         # Works like curl --resolve: TCP connects to the given IP while TLS SNI
         # and certificate validation still use the original hostname.
         if resolve_to_ip:
-            prefix = f"{scheme}://{host}"
-            adapter = HostOverrideAdapter(dest_ip=resolve_to_ip, dest_hostname=host)
-            session.mount(prefix, adapter)
+            adapter = HostOverrideAdapter(dest_ip=resolve_to_ip, dest_hostname=host, pool_maxsize=pool_size)
             logger.info("DNS override: %s -> %s", host, resolve_to_ip)
+        else:
+            adapter = HTTPAdapter(pool_maxsize=pool_size)
+        session.mount(f"{scheme}://{host}", adapter)
 
         return mwclient.Site(
             host,
@@ -216,7 +226,7 @@ class MediaWikiIngestionJob(IngestionJob):
             IngestionItem objects containing page metadata for processing
         """
         base_url = f"{self._reader.scheme}://{self._reader.host}{self._reader.path}"
-        logger.info(f"Starting to list pages from {base_url}")
+        logger.info("Starting to list pages from %s", base_url)
 
         for page_record in self._reader._get_all_pages_generator():
             title = page_record.title
@@ -234,7 +244,7 @@ class MediaWikiIngestionJob(IngestionJob):
         every page edit. Using it avoids fetching full page content just to
         detect whether a page has changed.
 
-        Returns None when revision is 0 or absent, falling back to content-based MD5.
+        Returns None when revision is 0 or absent, falling back to content-based SHA-256.
         """
         revision = item.source_ref.revision
         if revision:
@@ -252,11 +262,11 @@ class MediaWikiIngestionJob(IngestionJob):
         """
         page_record = item.source_ref
 
-        logger.debug(f"Fetching content for page: {page_record.title}")
+        logger.debug("Fetching content for page: %s", page_record.title)
         doc = self._reader._page_to_document(page_record)
 
         if doc is None:
-            logger.warning(f"Failed to fetch content for page: {page_record.title}")
+            logger.warning("Failed to fetch content for page: %s", page_record.title)
             return ""
 
         return doc.text
@@ -296,5 +306,5 @@ class MediaWikiIngestionJob(IngestionJob):
         if page_record.url:
             extra["url"] = page_record.url
         else:
-            logger.warning(f"URL not found for page: {page_record.title}")
+            logger.warning("URL not found for page: %s", page_record.title)
         return extra
@@ -1,18 +1,29 @@
+import codecs
 import io
 import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
 
+from botocore.endpoint import MAX_POOL_CONNECTIONS
 from markitdown import MarkItDown
 
 from tasks.base import IngestionJob
 from tasks.helper_classes.ingestion_item import IngestionItem
 from utils.parse import parse_list
 from utils.s3_client import get_s3_client
-from utils.text import sanitize_ascii_key
+from utils.text import normalize_markitdown_text, sanitize_ascii_key
 
 logger = logging.getLogger(__name__)
 
+# Plain-text keys MarkItDown only line-normalizes; UTF-8 ones skip its type sniffing
+PLAIN_TEXT_EXTENSIONS = frozenset({".txt", ".md", ".markdown", ".log", ".json", ".yaml", ".yml"})
+
 
 class S3IngestionJob(IngestionJob):
+    # get_object round-trips dominate small objects and overlap with MarkItDown conversion
+    # of other items; boto3 clients are thread-safe
+    default_io_workers = 8
+
     @property
     def source_type(self) -> str:
         return "s3"
@@ -31,6 +42,8 @@ class S3IngestionJob(IngestionJob):
             "secret_key": cfg.get("secret_key"),
             "region": cfg.get("region"),
             "use_ssl": cfg.get("use_ssl", True),
+            # One pooled connection per fetch thread
+            "max_pool_connections": max(self.io_workers, MAX_POOL_CONNECTIONS),
         }
         self.s3_client, _ = get_s3_client(**client_params)
 
@@ -41,57 +54,73 @@ class S3IngestionJob(IngestionJob):
         """
         Generator that yields S3 items one at a time to avoid loading
         all items into memory at once (critical for large buckets).
+
+        The next page of a bucket is requested while the items of the current
+        one are consumed, so listing round trips overlap with ingestion.
         """
-        for bucket in self.buckets:
-            continuation_token = None
-            while True:
-                try:
-                    params = {"Bucket": bucket, "MaxKeys": 1000}
-                    if continuation_token:
-                        params["ContinuationToken"] = continuation_token
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.source_name}-list")
+        try:
+            for bucket in self.buckets:
+                next_page = executor.submit(self._list_page, bucket, None)
+                while next_page is not None:
+                    try:
+                        resp = next_page.result()
+                    except Exception as e:
+                        logger.error("[%s] Failed to list objects: %s", bucket, e)
+                        break
 
-                    resp = self.s3_client.list_objects_v2(**params)
-                    contents = resp.get("Contents", [])
+                    next_page = None
+                    if resp.get("IsTruncated"):
+                        next_page = executor.submit(self._list_page, bucket, resp.get("NextContinuationToken"))
 
-                    # Yield items one at a time
-                    for obj in contents:
+                    for obj in resp.get("Contents", []):
                         if not obj["Key"].endswith("/"):
                             yield IngestionItem(
                                 id=f"s3://{bucket}/{obj['Key']}",
                                 source_ref=(bucket, obj["Key"]),
                                 last_modified=obj["LastModified"],
                             )
+        finally:
+            executor.shutdown(cancel_futures=True)
 
-                    # Check if there are more objects
-                    if resp.get("IsTruncated"):
-                        continuation_token = resp.get("NextContinuationToken")
-                    else:
-                        break
-
-                except Exception as e:
-                    logger.error(f"[{bucket}] Failed to list objects: {e}")
-                    break
+    def _list_page(self, bucket: str, continuation_token: str | None) -> dict:
+        params = {"Bucket": bucket, "MaxKeys": 1000}
+        if continuation_token:
+            params["ContinuationToken"] = continuation_token
+        return self.s3_client.list_objects_v2(**params)
 
     def get_raw_content(self, item: IngestionItem):
         bucket, key = item.source_ref
         try:
             obj = self.s3_client.get_object(Bucket=bucket, Key=key)
             content_bytes = obj["Body"].read()
+            is_plain_text = posixpath.splitext(key)[1].lower() in PLAIN_TEXT_EXTENSIONS
+            # MarkItDown fails on a UTF-8 BOM and falls back to the raw text below
+            if is_plain_text and not content_bytes.startswith(codecs.BOM_UTF8):
+                try:
+                    raw_text = content_bytes.decode("utf-8")
+                except UnicodeDecodeError:
+                    # Let MarkItDown detect the charset
+                    pass
+                else:
+                    # What MarkItDown's plain-text conversion returns, including its empty-result fallback
+                    text = normalize_markitdown_text(raw_text)
+                    return text if text.strip() else raw_text
             stream = io.BytesIO(content_bytes)
             try:
                 result = self.md.convert_stream(stream)
                 text = result.text_content or ""
                 if text.strip():
-                    logger.debug(f"[{bucket}/{key}] Converted to markdown successfully")
+                    logger.debug("[%s/%s] Converted to markdown successfully", bucket, key)
                     return text
                 else:
-                    logger.debug(f"[{bucket}/{key}] Empty markdown result, falling back to raw text")
+                    logger.debug("[%s/%s] Empty markdown result, falling back to raw text", bucket, key)
                     return content_bytes.decode("utf-8", errors="ignore")
             except Exception as conversion_error:
-                logger.warning(f"[{bucket}/{key}] Markdown conversion failed: {conversion_error}. Using raw text.")
+                logger.warning("[%s/%s] Markdown conversion failed: %s. Using raw text.", bucket, key, conversion_error)
                 return content_bytes.decode("utf-8", errors="ignore")
         except Exception as e:
-            logger.error(f"[{bucket}/{key}] Failed to fetch content: {e}")
+            logger.error("[%s/%s] Failed to fetch content: %s", bucket, key, e)
             return ""
 
     def get_item_name(self, item: IngestionItem):
@@ -11,6 +11,10 @@ logger = logging.getLogger(__name__)
 
 
 class SerpAPIIngestionJob(IngestionJob):
+    # Queries are independent requests dominated by round-trip latency; the RetrySession
+    # pools connections and backs off on 429 after Retry-After
+    default_io_workers = 4
+
     @property
     def source_type(self) -> str:
         return "serpapi"
@@ -29,7 +33,8 @@ class SerpAPIIngestionJob(IngestionJob):
 
         self.search_queries = queries
         self.serpapi_endpoint = "https://serpapi.com/search"
-        self._session = RetrySession()
+        # One kept-alive connection per fetch thread
+        self._session = RetrySession(pool_maxsize=self.io_workers)
 
     def list_items(self):
         for query in self.search_queries:
@@ -55,14 +60,20 @@ class SerpAPIIngestionJob(IngestionJob):
 
             # SerpAPI returns a rich JSON response; we extract only titles and snippets
             # from organic_results as a lightweight plain-text representation
-            titles = [r.get("title") for r in data.get("organic_results", []) if r.get("title")]
-            snippets = [r.get("snippet") for r in data.get("organic_results", []) if r.get("snippet")]
-
+            titles = []
+            snippets = []
+            for result in data.get("organic_results", ()):
+                if title := result.get("title"):
+                    titles.append(title)
+                if snippet := result.get("snippet"):
+                    snippets.append(snippet)
+
+            # All titles before all snippets, so stored checksums stay valid
             text_content = "\n".join(titles + snippets).strip()
             return text_content
 
         except Exception as e:
-            logger.info(f"[SerpAPI] Failed to fetch query '{query}': {e}")
+            logger.info("[SerpAPI] Failed to fetch query '%s': %s", query, e)
             return ""
 
     def get_item_name(self, item: IngestionItem) -> str:
@@ -1,10 +1,12 @@
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from unittest.mock import Mock, patch
 
 import pytest
 
-from tasks.base import IngestionJob
+from tasks.base import FETCH_AHEAD, IngestionJob
 from tasks.helper_classes.ingestion_item import IngestionItem
 from tasks.schemas import BaseMetadataSchema
 
@@ -59,6 +61,21 @@ class TestIngestionJob:
         assert metadata["version"] == 1
         assert metadata["last_modified"] == "2024-01-01 00:00:00"
 
+    def test_posix_timestamp_last_modified_is_stored_as_datetime(self, base_config):
+        job = DummyIngestionJob(base_config)
+        item = IngestionItem(id="item-1", source_ref="src", last_modified=datetime(2024, 1, 1).timestamp())
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.get_raw_content = Mock(return_value="content")
+        job.metadata_tracker.get_latest_record.return_value = None
+
+        job.process_item(item)
+
+        metadata = job.vector_manager.insert_documents.call_args.args[0][0].metadata
+        assert metadata["last_modified"] == "2024-01-01 00:00:00"
+        records = job.metadata_tracker.record_metadata_bulk.call_args.args[0]
+        assert records[0]["last_modified"] == datetime(2024, 1, 1)
+
     def test_get_extra_metadata_merge(self, base_config):
         """Extra metadata from hook should be merged into final result."""
         job = DummyIngestionJob(base_config)
@@ -100,15 +117,16 @@ class TestIngestionJob:
         assert metadata["key"] == "item-1"
         assert metadata["version"] == 1
 
-    def test_seen_add_lru_eviction(self, base_config):
+    def test_seen_add_fifo_eviction(self, base_config):
         job = DummyIngestionJob(base_config)
         job._seen_capacity = 2
 
         assert job._seen_add("a") is True
         assert job._seen_add("b") is True
         assert job._seen_add("a") is False
-        assert job._seen_add("c") is True
-        assert job._seen_add("b") is True
+        assert job._seen_add("c") is True  # evicts "a", the oldest insert
+        assert job._seen_add("b") is False
+        assert job._seen_add("a") is True
 
     def test_process_item_skips_empty_content(self, base_config):
         item = IngestionItem(id="item-1", source_ref="src")
@@ -128,7 +146,7 @@ class TestIngestionJob:
 
     def test_process_item_skips_unchanged_content(self, base_config):
         content = "same content"
-        checksum = hashlib.md5(content.encode("utf-8"), usedforsecurity=False).hexdigest()
+        checksum = hashlib.sha256(content.encode("utf-8")).hexdigest()
         item = IngestionItem(id="item-1", source_ref="src")
         job = DummyIngestionJob(
             base_config,
@@ -147,14 +165,33 @@ class TestIngestionJob:
 
         assert result == 0
         job.metadata_tracker.get_latest_record.assert_called_once_with("item-1")
-        job.metadata_tracker.delete_previous_embeddings.assert_not_called()
-        job.metadata_tracker.record_metadata.assert_not_called()
+        job.metadata_tracker.record_metadata_bulk.assert_not_called()
+        job.vector_manager.insert_documents.assert_not_called()
+
+    def test_process_item_upgrades_unchanged_legacy_md5_checksum(self, base_config):
+        content = "same content"
+        item = IngestionItem(id="item-1", source_ref="src")
+        job = DummyIngestionJob(base_config, items=[item], content_by_id={"item-1": content})
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_record.return_value = Mock(
+            checksum=hashlib.md5(content.encode("utf-8"), usedforsecurity=False).hexdigest(),
+            version=4,
+        )
+
+        with patch.object(job, "_seen_add", return_value=True):
+            result = job.process_item(item)
+
+        assert result == 0
+        job.metadata_tracker.update_checksum.assert_called_once_with(
+            "item-1", 4, hashlib.sha256(content.encode("utf-8")).hexdigest()
+        )
         job.vector_manager.insert_documents.assert_not_called()
 
     @patch("tasks.base.Document")
     def test_process_item_updates_version_and_records_metadata(self, mock_document, base_config):
         content = "updated content"
-        checksum = hashlib.md5(content.encode("utf-8"), usedforsecurity=False).hexdigest()
+        checksum = hashlib.sha256(content.encode("utf-8")).hexdigest()
         last_modified = datetime(2024, 1, 2, 3, 4, 5)
         item = IngestionItem(
             id="item-1",
@@ -177,15 +214,20 @@ class TestIngestionJob:
             result = job.process_item(item)
 
         assert result == 1
-        job.metadata_tracker.delete_previous_embeddings.assert_called_once_with("item-1")
-        job.vector_manager.insert_documents.assert_called_once_with([mock_document.return_value])
-        job.metadata_tracker.record_metadata.assert_called_once_with(
-            "item-1",
-            checksum,
-            3,
-            1,
-            last_modified,
-            extra_metadata={"source_name": "test-source"},
+        job.vector_manager.insert_documents.assert_called_once_with(
+            [mock_document.return_value], replace_keys=["item-1"]
+        )
+        job.metadata_tracker.record_metadata_bulk.assert_called_once_with(
+            [
+                {
+                    "key": "item-1",
+                    "checksum": checksum,
+                    "version": 3,
+                    "chunks": 1,
+                    "last_modified": last_modified,
+                    "extra_metadata": {"source_name": "test-source"},
+                }
+            ]
         )
 
         assert mock_document.call_count == 1
@@ -237,17 +279,44 @@ class TestIngestionJob:
 
         assert result == 1
         job.vector_manager.insert_documents.assert_called_once()
-        job.metadata_tracker.record_metadata.assert_called_once_with(
-            "item-1",
-            "rev-42",  # stored checksum is the pre-computed one, not MD5
-            2,
-            1,
-            last_modified,
-            extra_metadata={"source_name": "test-source"},
-        )
+        (records,), _ = job.metadata_tracker.record_metadata_bulk.call_args
+        assert records == [
+            {
+                "key": "item-1",
+                "checksum": "rev-42",  # stored checksum is the pre-computed one, not SHA-256
+                "version": 2,
+                "chunks": 1,
+                "last_modified": last_modified,
+                "extra_metadata": {"source_name": "test-source"},
+            }
+        ]
         _, kwargs = mock_document.call_args
         assert kwargs["metadata"]["checksum"] == "rev-42"
 
+    @pytest.mark.parametrize("hash_name", ["sha256", "md5"])
+    def test_process_item_adopts_pre_checksum_when_content_checksum_matches(self, hash_name, base_config):
+        """Stored checksum is the content hash from before pre-checksums → checksum swapped, nothing re-embedded."""
+        content = "same content"
+        item = IngestionItem(id="item-1", source_ref="src")
+        job = DummyIngestionJob(base_config, items=[item], content_by_id={"item-1": content})
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_record.return_value = Mock(
+            checksum=hashlib.new(hash_name, content.encode("utf-8"), usedforsecurity=False).hexdigest(),
+            version=3,
+        )
+
+        with (
+            patch.object(job, "get_item_checksum", return_value="file-hash"),
+            patch.object(job, "_seen_add", return_value=True),
+        ):
+            result = job.process_item(item)
+
+        assert result == 0
+        job.metadata_tracker.update_checksum.assert_called_once_with("item-1", 3, "file-hash")
+        job.metadata_tracker.record_metadata_bulk.assert_not_called()
+        job.vector_manager.insert_documents.assert_not_called()
+
     def test_process_item_skips_when_seen_add_returns_false(self, base_config):
         """_seen_add returns False (duplicate checksum this run) → item skipped, content never fetched."""
         item = IngestionItem(id="item-1", source_ref="src")
@@ -270,10 +339,300 @@ class TestIngestionJob:
     def test_run_reports_totals(self, base_config):
         item1 = IngestionItem(id="item-1", source_ref="src")
         item2 = IngestionItem(id="item-2", source_ref="src")
-        job = DummyIngestionJob(base_config, items=[item1, item2])
-        job.process_item = Mock(side_effect=[1, 0])
+        job = DummyIngestionJob(base_config, items=[item1, item2], content_by_id={"item-1": "content"})
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {}
 
         result = job.run()
 
         assert result == "[test-source] Completed: 1 ingested, 1 skipped"
-        assert job.process_item.call_count == 2
+        job.vector_manager.insert_documents.assert_called_once()
+
+    def test_run_batches_inserts(self, base_config):
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(5)]
+        job = DummyIngestionJob(
+            {**base_config, "config": {"batch_size": 2}},
+            items=items,
+            content_by_id={item.id: f"content {item.id}" for item in items},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {}
+
+        result = job.run()
+
+        assert result == "[test-source] Completed: 5 ingested, 0 skipped"
+        batch_sizes = [len(c.args[0]) for c in job.vector_manager.insert_documents.call_args_list]
+        assert batch_sizes == [2, 2, 1]
+        assert [len(c.args[0]) for c in job.metadata_tracker.record_metadata_bulk.call_args_list] == [2, 2, 1]
+
+    def test_run_retries_failed_batch_item_by_item(self, base_config):
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(3)]
+        job = DummyIngestionJob(
+            base_config,
+            items=items,
+            content_by_id={item.id: f"content {item.id}" for item in items},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {}
+
+        def insert(docs, replace_keys):
+            if any(doc.text == "content item-1" for doc in docs):
+                raise RuntimeError("embedding failed")
+
+        job.vector_manager.insert_documents.side_effect = insert
+
+        result = job.run()
+
+        assert result == "[test-source] Completed: 2 ingested, 1 skipped"
+        recorded = [c.args[0][0]["key"] for c in job.metadata_tracker.record_metadata_bulk.call_args_list]
+        assert recorded == ["item-0", "item-2"]
+
+    def test_run_retry_replaces_chunks_copied_by_failed_batch(self, base_config):
+        """Metadata write fails after the batch's chunks were copied → retries replace them instead of duplicating."""
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(2)]
+        job = DummyIngestionJob(
+            base_config,
+            items=items,
+            content_by_id={item.id: f"content {item.id}" for item in items},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {}
+        job.metadata_tracker.record_metadata_bulk.side_effect = [RuntimeError("metadata failed"), None, None]
+
+        result = job.run()
+
+        assert result == "[test-source] Completed: 2 ingested, 0 skipped"
+        replace_keys = [c.kwargs["replace_keys"] for c in job.vector_manager.insert_documents.call_args_list]
+        assert replace_keys == [[], ["item-0"], ["item-1"]]
+
+    def test_run_flushes_before_buffering_same_item_again(self, base_config):
+        items = [IngestionItem(id="a", source_ref="src"), IngestionItem(id="b", source_ref="src")]
+        job = DummyIngestionJob(
+            base_config,
+            items=items,
+            content_by_id={"a": "first", "b": "second"},
+            name_by_id={"a": "page", "b": "page"},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {}
+
+        job.run()
+
+        versions = [c.args[0][0]["version"] for c in job.metadata_tracker.record_metadata_bulk.call_args_list]
+        assert versions == [1, 2]
+        replaced = [c.kwargs["replace_keys"] for c in job.vector_manager.insert_documents.call_args_list]
+        assert replaced == [[], ["page"]]
+
+    @patch("tasks.base.gc.collect")
+    @patch("tasks.base.GC_INTERVAL", 4)
+    def test_run_collects_garbage_every_interval(self, mock_collect, base_config):
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(10)]
+        job = DummyIngestionJob(
+            {**base_config, "config": {"batch_size": 3}},
+            items=items,
+            content_by_id={item.id: f"content {item.id}" for item in items},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {}
+
+        job.run()
+
+        # Totals after each flush: 3, 6, 9, 10 -> crosses 4 and 8
+        assert mock_collect.call_count == 2
+
+    def test_run_looks_up_latest_records_per_window(self, base_config):
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(3)]
+        job = DummyIngestionJob(
+            base_config,
+            items=items,
+            content_by_id={item.id: f"content {item.id}" for item in items},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {
+            "item-1": Mock(checksum=hashlib.sha256(b"content item-1").hexdigest(), version=1),
+            "item-2": Mock(checksum="old", version=4),
+        }
+
+        with patch("tasks.base.LOOKUP_WINDOW", 2):
+            result = job.run()
+
+        assert result == "[test-source] Completed: 2 ingested, 1 skipped"
+        lookups = [c.args[0] for c in job.metadata_tracker.get_latest_records_bulk.call_args_list]
+        assert lookups == [["item-0", "item-1"], ["item-2"]]
+        job.metadata_tracker.get_latest_record.assert_not_called()
+        (records,), _ = job.metadata_tracker.record_metadata_bulk.call_args
+        assert [(r["key"], r["version"]) for r in records] == [("item-0", 1), ("item-2", 5)]
+        assert job.vector_manager.insert_documents.call_args.kwargs["replace_keys"] == ["item-2"]
+
+    def test_run_fetches_content_in_worker_threads(self, base_config):
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(6)]
+        job = DummyIngestionJob(
+            {**base_config, "config": {"io_workers": 3}},
+            items=items,
+            content_by_id={item.id: f"content {item.id}" for item in items},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {}
+        fetch_threads = set()
+        fetch = job.get_raw_content
+
+        def get_raw_content(item):
+            fetch_threads.add(threading.current_thread().name)
+            return fetch(item)
+
+        job.get_raw_content = get_raw_content
+
+        result = job.run()
+
+        assert result == "[test-source] Completed: 6 ingested, 0 skipped"
+        assert fetch_threads and all(name.startswith("test-source-io") for name in fetch_threads)
+        (records,), _ = job.metadata_tracker.record_metadata_bulk.call_args
+        assert [r["key"] for r in records] == [item.id for item in items]
+
+    def test_run_fetches_changed_pre_checksum_items_in_worker_threads(self, base_config):
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(4)]
+        job = DummyIngestionJob(
+            {**base_config, "config": {"io_workers": 2}},
+            items=items,
+            content_by_id={item.id: f"content {item.id}" for item in items},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        # item-0 and item-1 are unchanged, item-2 changed and item-3 is new
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {
+            "item-0": Mock(checksum="rev-item-0", version=1),
+            "item-1": Mock(checksum="rev-item-1", version=1),
+            "item-2": Mock(checksum="old", version=1),
+        }
+        fetches = []
+        fetch = job.get_raw_content
+
+        def get_raw_content(item):
+            fetches.append((item.id, threading.current_thread().name))
+            return fetch(item)
+
+        job.get_raw_content = get_raw_content
+
+        with patch.object(job, "get_item_checksum", side_effect=lambda item: f"rev-{item.id}"):
+            result = job.run()
+
+        assert result == "[test-source] Completed: 2 ingested, 2 skipped"
+        assert sorted(item_id for item_id, _ in fetches) == ["item-2", "item-3"]
+        assert all(name.startswith("test-source-io") for _, name in fetches)
+
+    def test_run_bounds_fetches_in_flight(self, base_config):
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(20)]
+        job = DummyIngestionJob(
+            {**base_config, "config": {"io_workers": 2}},
+            items=items,
+            content_by_id={item.id: f"content {item.id}" for item in items},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {}
+        submitted = []
+        in_flight = []
+        submit = ThreadPoolExecutor.submit
+
+        def counting_submit(executor, fn, item, *args):
+            submitted.append(item.id)
+            return submit(executor, fn, item, *args)
+
+        prepare = job._prepare_item
+
+        def prepare_item(item, *args):
+            in_flight.append(len(submitted) - int(item.id.split("-")[1]))
+            return prepare(item, *args)
+
+        with (
+            patch.object(ThreadPoolExecutor, "submit", counting_submit),
+            patch.object(job, "_prepare_item", side_effect=prepare_item),
+        ):
+            result = job.run()
+
+        assert result == "[test-source] Completed: 20 ingested, 0 skipped"
+        assert submitted == [item.id for item in items]
+        # io_workers * FETCH_AHEAD fetches ahead of the item being prepared, plus that item's own
+        assert max(in_flight) == 2 * FETCH_AHEAD + 1
+
+    def test_run_fetches_concurrently_when_request_delay_is_set(self, base_config):
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(3)]
+        job = DummyIngestionJob(
+            {**base_config, "config": {"io_workers": 3, "request_delay": 0.001}},
+            items=items,
+            content_by_id={item.id: f"content {item.id}" for item in items},
+        )
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {}
+        fetch_threads = []
+        fetch = job.get_raw_content
+
+        def recording_fetch(item):
+            fetch_threads.append(threading.current_thread().name)
+            return fetch(item)
+
+        with patch.object(job, "get_raw_content", side_effect=recording_fetch):
+            result = job.run()
+
+        assert result == "[test-source] Completed: 3 ingested, 0 skipped"
+        assert all(name.startswith("test-source-io") for name in fetch_threads)
+
+    @patch("tasks.base.time.sleep")
+    @patch("tasks.base.time.monotonic", return_value=100.0)
+    def test_throttle_reserves_distinct_start_times_across_threads(self, mock_monotonic, mock_sleep, base_config):
+        job = DummyIngestionJob({**base_config, "config": {"request_delay": 1.0}})
+
+        threads = [threading.Thread(target=job._throttle) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(c.args[0] for c in mock_sleep.call_args_list) == [1.0, 2.0]
+
+    @patch("tasks.base.time.sleep")
+    @patch("tasks.base.time.monotonic")
+    def test_throttle_sleeps_only_for_remaining_delay(self, mock_monotonic, mock_sleep, base_config):
+        job = DummyIngestionJob({**base_config, "config": {"request_delay": 1.0}})
+
+        mock_monotonic.return_value = 100.0
+        job._throttle()  # first fetch goes straight through
+        mock_monotonic.return_value = 100.25
+        job._throttle()  # 0.25s of work since the last fetch
+        mock_monotonic.return_value = 105.0
+        job._throttle()  # idle for longer than the delay
+
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.75]
+
+    @patch("tasks.base.time.sleep")
+    def test_run_does_not_wait_for_unchanged_pre_checksum_items(self, mock_sleep, base_config):
+        items = [IngestionItem(id=f"item-{i}", source_ref="src") for i in range(3)]
+        job = DummyIngestionJob({**base_config, "config": {"request_delay": 5}}, items=items)
+        job.metadata_tracker = Mock()
+        job.vector_manager = Mock()
+        job.metadata_tracker.get_latest_records_bulk.side_effect = lambda keys: {
+            key: Mock(checksum="rev", version=1) for key in keys
+        }
+
+        with patch.object(job, "get_item_checksum", return_value="rev"):
+            result = job.run()
+
+        assert result == "[test-source] Completed: 0 ingested, 3 skipped"
+        mock_sleep.assert_not_called()
+
+    def test_invalid_batch_size_raises(self, base_config):
+        with pytest.raises(ValueError, match="batch_size"):
+            DummyIngestionJob({**base_config, "config": {"batch_size": 0}})
+
+    def test_invalid_io_workers_raises(self, base_config):
+        with pytest.raises(ValueError, match="io_workers"):
+            DummyIngestionJob({**base_config, "config": {"io_workers": "many"}})
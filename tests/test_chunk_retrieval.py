@@ -1,12 +1,26 @@
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+from fastapi import HTTPException
+from llama_index.core.schema import TextNode
 from llama_index.core.vector_stores.types import FilterCondition
+from llama_index.vector_stores.postgres import PGVectorStore
 from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.dialects import postgresql
 
+from api.dependencies import get_rag_engine
 from api.v1.chunk_retrieval import routes
-from api.v1.chunk_retrieval.modules import _OPERATOR_MAP, RAGQueryEngine
-from api.v1.chunk_retrieval.schema import MetadataFilterItem, QueryRequest
+from api.v1.chunk_retrieval.modules import (
+    _OPERATOR_MAP,
+    RAGQueryEngine,
+    RetrievedNode,
+    _embed_cached,
+    _embedding_literal_cached,
+    _tsquery_cached,
+)
+from api.v1.chunk_retrieval.schema import BatchQueryRequest, MetadataFilterItem, QueryRequest
+from utils.api import format_chunks
 
 _filter_adapter = TypeAdapter(MetadataFilterItem)
 
@@ -109,6 +123,17 @@ class TestQueryRequestSchema:
             QueryRequest(query="test", metadata_filters={"project": "MAIT"})
 
 
+class TestBatchQueryRequestSchema:
+    def test_accepts_queries(self):
+        req = BatchQueryRequest(queries=["one", "two"], top_k=3)
+        assert req.queries == ["one", "two"]
+
+    @pytest.mark.parametrize("queries", [[], ["ok", " "], ["q"] * 21])
+    def test_rejects_invalid_queries(self, queries):
+        with pytest.raises(ValidationError):
+            BatchQueryRequest(queries=queries)
+
+
 class TestBuildFilterObject:
     def test_returns_none_for_none_input(self):
         engine = _make_engine()
@@ -154,6 +179,268 @@ class TestBuildFilterObject:
         assert len(result.filters) == 3
 
 
+def _make_pg_store(hybrid_search: bool = True, use_halfvec: bool = False) -> PGVectorStore:
+    # from_params does not connect until the first query, so SQL can be compiled offline
+    return PGVectorStore.from_params(
+        host="localhost",
+        port="5432",
+        database="rag",
+        user="postgres",
+        password="postgres",
+        table_name="embeddings",
+        embed_dim=3,
+        hybrid_search=hybrid_search,
+        use_halfvec=use_halfvec,
+        hnsw_kwargs={"hnsw_m": 16, "hnsw_ef_construction": 64, "hnsw_ef_search": 40},
+    )
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestHybridQuery:
+    def test_tsquery_text_or_joins_terms_and_strips_punctuation(self):
+        assert _tsquery_cached("What's AWS WAF?") == "what|s|aws|waf"
+        assert _tsquery_cached("version  1.2 notes") == "version|1.2|notes"
+
+    def test_hybrid_fuses_dense_and_sparse_in_one_statement(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store())
+        sql = _compile(engine._build_query())
+
+        assert "WITH dense AS" in sql
+        assert "sparse AS" in sql
+        assert "fused AS" in sql
+        assert "FULL OUTER JOIN" in sql
+        assert "ts_rank_cd" in sql
+        assert "<=>" in sql
+        assert "ORDER BY fused.score DESC" in sql
+
+    def test_hybrid_applies_metadata_filters_to_both_rankings(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store())
+        where = engine._filter_clause(
+            [_filter_adapter.validate_python({"name": "source_type", "operator": "EQ", "value": "s3"})]
+        )
+        sql = _compile(engine._build_query(where))
+
+        assert sql.count("metadata_->>'source_type' = 's3'") == 2
+
+    def test_query_values_are_bind_parameters(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store())
+        compiled = engine._build_query().compile(dialect=postgresql.dialect())
+
+        assert {"query_embedding", "tsquery", "top_k"} <= set(compiled.binds)
+
+    def test_statement_is_reused_for_identical_filters(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store())
+        items = [_filter_adapter.validate_python({"name": "tags", "operator": "IN", "value": ["a", "b"]})]
+        same_items = [_filter_adapter.validate_python({"name": "tags", "operator": "IN", "value": ["a", "b"]})]
+
+        assert engine._filter_clause(None) is None
+        assert engine._statement_for(None) is engine._statement_for([])
+        assert engine._statement_for(items) is engine._statement_for(same_items)
+        assert engine._statement_for(items) is not engine._statement_for(None)
+
+    def test_statement_cache_is_bounded(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store())
+        engine._statement_cache_capacity = 2
+        for value in ("a", "b", "c"):
+            engine._statement_for([_filter_adapter.validate_python({"name": "k", "operator": "EQ", "value": value})])
+
+        assert len(engine._statement_cache) == 2
+        assert (("k", "EQ", "a"),) not in engine._statement_cache
+
+    def test_rum_index_orders_full_text_by_rum_distance(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store(), text_search_index="rum")
+        sql = _compile(engine._build_query())
+
+        assert "ts_rank_cd" not in sql
+        assert "text_search_tsv <=> CAST(" in sql
+
+    def test_halfvec_store_casts_query_embedding_to_halfvec(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store(use_halfvec=True))
+        sql = _compile(engine._build_query())
+
+        assert "CAST(%(query_embedding)s AS HALFVEC(3))" in sql
+
+    def test_dense_only_when_hybrid_disabled(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store(hybrid_search=False))
+        sql = _compile(engine._build_query())
+
+        assert "WITH" not in sql
+        assert "to_tsquery" not in sql
+        assert "<=>" in sql
+
+    def test_inner_product_index_ranks_by_negative_inner_product(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store(hybrid_search=False), hnsw_dist_method="vector_ip_ops")
+        sql = _compile(engine._build_query())
+
+        assert "<#>" in sql
+        assert "<=>" not in sql
+
+    @pytest.mark.parametrize(
+        ("reltuples", "expected"), [(-1, 40), (0, 40), (99_999, 40), (250_000, 100), (5_000_000, 200)]
+    )
+    def test_auto_ef_search_follows_table_size(self, reltuples, expected):
+        store = _make_pg_store()
+        store.hnsw_kwargs["hnsw_ef_search"] = "auto"
+        store._initialize = Mock()
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.execute.return_value.scalar.return_value = reltuples
+        store._session = Mock(return_value=session)
+
+        assert RAGQueryEngine(vector_store=store).resolve_hnsw_ef_search() == expected
+        assert store.hnsw_kwargs["hnsw_ef_search"] == expected
+
+    def test_configured_ef_search_is_kept(self):
+        store = _make_pg_store()
+        store._session = Mock()
+
+        assert RAGQueryEngine(vector_store=store).resolve_hnsw_ef_search() == 40
+        store._session.assert_not_called()
+
+    def test_retrieve_top_k_materializes_nodes_from_rows(self):
+        store = _make_pg_store()
+        store._initialize = Mock()
+        session = MagicMock()
+        session.execute.return_value.all.return_value = [
+            SimpleNamespace(
+                node_id="n1",
+                text="first",
+                metadata_={"source_name": "a"},
+                reference_json={"source_name": "a", "extras": {}},
+                score=0.03,
+            ),
+            SimpleNamespace(
+                node_id="n2",
+                text="second",
+                metadata_={"source_name": "b"},
+                reference_json=None,
+                score=0.01,
+            ),
+        ]
+        store._session = Mock(return_value=session)
+        session.__enter__.return_value = session
+        engine = RAGQueryEngine(vector_store=store)
+        engine._tsquery_cache["aws"] = "'aw'"
+        _embed_cached.cache_clear()
+        _embedding_literal_cached.cache_clear()
+
+        with patch("api.v1.chunk_retrieval.modules.embed_model") as embed_model:
+            embed_model.get_query_embedding.return_value = [3.0, 4.0, 0.0]
+            nodes = engine.retrieve_top_k("aws", top_k=2)
+            engine.retrieve_top_k("aws", top_k=2)
+
+        # The second call for the same query reuses the cached embedding
+        embed_model.get_query_embedding.assert_called_once_with("aws")
+        assert [n.node.get_content() for n in nodes] == ["first", "second"]
+        assert [n.score for n in nodes] == [0.03, 0.01]
+        assert nodes[0].node.metadata["source_name"] == "a"
+        assert nodes[0].reference == {"source_name": "a", "extras": {}}
+        assert nodes[1].reference is None
+        _, params = session.execute.call_args.args
+        # Query embeddings are normalized to unit length and bound as float32 pgvector literals
+        assert params == {"query_embedding": "[0.6,0.8,0.0]", "top_k": 2, "tsquery": "'aw'"}
+        _embed_cached.cache_clear()
+        _embedding_literal_cached.cache_clear()
+
+    def test_tsqueries_are_parsed_once_and_cached(self):
+        store = _make_pg_store()
+        store._initialize = Mock()
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.execute.return_value.tuples.return_value.all.return_value = [("new|query", "'new' | 'queri'")]
+        store._session = Mock(return_value=session)
+        engine = RAGQueryEngine(vector_store=store)
+        engine._tsquery_cache["cached"] = "'cach'"
+
+        assert engine._parsed_tsqueries(["cached", "new|query", "new|query"]) == [
+            "'cach'",
+            "'new' | 'queri'",
+            "'new' | 'queri'",
+        ]
+        # Only the expression missing from the cache went to Postgres, once
+        _, params = session.execute.call_args.args
+        assert params == {"expressions": ["new|query"]}
+        assert engine._parsed_tsqueries(["new|query"]) == ["'new' | 'queri'"]
+        assert session.execute.call_count == 1
+
+    def test_batch_query_runs_single_query_statement_laterally(self):
+        engine = RAGQueryEngine(vector_store=_make_pg_store())
+        stmt = engine._statement_for(None, batch=True)
+        sql = _compile(stmt)
+
+        assert "WITH ORDINALITY AS queries(query_embedding, tsquery, query_index)" in sql
+        assert "JOIN LATERAL" in sql
+        # The dense and sparse rankings read the query from the outer row instead of re-scanning unnest
+        assert sql.count("unnest(") == 1
+        assert "embedding <=> queries.query_embedding" in sql
+        assert {"query_embeddings", "tsqueries", "top_k"} <= set(stmt.compile(dialect=postgresql.dialect()).binds)
+        assert stmt is not engine._statement_for(None)
+
+    def test_retrieve_top_k_batch_groups_rows_by_query(self):
+        store = _make_pg_store()
+        store._initialize = Mock()
+        session = MagicMock()
+        session.execute.return_value.all.return_value = [
+            SimpleNamespace(query_index=1, node_id="n1", text="a", metadata_={}, reference_json=None, score=0.03),
+            SimpleNamespace(query_index=3, node_id="n2", text="b", metadata_={}, reference_json=None, score=0.02),
+        ]
+        store._session = Mock(return_value=session)
+        session.__enter__.return_value = session
+        engine = RAGQueryEngine(vector_store=store)
+        engine._tsquery_cache.update({"aws|waf": "'aw' | 'waf'", "none": "", "b": "'b'"})
+        _embed_cached.cache_clear()
+        _embedding_literal_cached.cache_clear()
+
+        with patch("api.v1.chunk_retrieval.modules.embed_model") as embed_model:
+            embed_model.get_query_embedding.return_value = [0.6, 0.8, 0.0]
+            results = engine.retrieve_top_k_batch(["aws waf", "none", "b"], top_k=2)
+
+        assert [[n.node.get_content() for n in nodes] for nodes in results] == [["a"], [], ["b"]]
+        _, params = session.execute.call_args.args
+        assert params["query_embeddings"] == ["[0.6,0.8,0.0]"] * 3
+        assert params["tsqueries"] == ["'aw' | 'waf'", "", "'b'"]
+        assert engine.retrieve_top_k_batch([]) == []
+        _embed_cached.cache_clear()
+        _embedding_literal_cached.cache_clear()
+
+
+class TestBuildReferencesAndRaw:
+    def test_matches_build_references_and_format_chunks(self):
+        nodes = [_DummyNodeWithScore("first", 0.5), _DummyNodeWithScore("second", None)]
+        nodes[0].node.metadata = {"source_name": "docs", "file_name": "a.md", "key": "a"}
+
+        refs, raw = RAGQueryEngine.build_references_and_raw(nodes)
+
+        assert refs == RAGQueryEngine.build_references(nodes)
+        assert raw == format_chunks(nodes)
+        assert refs[0]["title"] == "a.md"
+        assert refs[0]["extras"] == {"key": "a"}
+
+    def test_empty_input(self):
+        assert RAGQueryEngine.build_references_and_raw([]) == ([], [])
+
+    def test_precomputed_reference_is_used_instead_of_metadata(self):
+        node = RetrievedNode(
+            node=TextNode(text="chunk", metadata={"source_name": "from-metadata"}),
+            score=0.25,
+            reference={"source_name": "docs", "url": "https://x", "extras": {"key": "a"}},
+        )
+
+        (ref,), (raw,) = RAGQueryEngine.build_references_and_raw([node])
+
+        assert ref == {
+            "source_name": "docs",
+            "url": "https://x",
+            "extras": {"key": "a"},
+            "score": 0.25,
+            "text": "chunk",
+        }
+        assert raw == "Score: 0.2500 | Text: chunk"
+
+
 def _make_request(rag_engine):
     limiter_mock = Mock()
     limiter_mock.limit.return_value = lambda f: f
@@ -174,12 +461,11 @@ async def test_query_endpoint_passes_metadata_filters_to_engine():
     payload.top_k = 5
     payload.metadata_filters = [_filter_adapter.validate_python({"name": "project", "operator": "EQ", "value": "MAIT"})]
 
-    with patch("api.v1.chunk_retrieval.routes.format_chunks", return_value=[]):
-        await routes.query_endpoint(
-            request=_make_request(rag_engine),
-            payload=payload,
-            rag_engine=rag_engine,
-        )
+    await routes.query_endpoint(
+        request=_make_request(rag_engine),
+        payload=payload,
+        rag_engine=rag_engine,
+    )
 
     rag_engine.retrieve_top_k.assert_called_once_with(query="test", top_k=5, metadata=payload.metadata_filters)
 
@@ -195,11 +481,23 @@ async def test_query_endpoint_passes_empty_list_when_no_filters():
     payload.top_k = 5
     payload.metadata_filters = None
 
-    with patch("api.v1.chunk_retrieval.routes.format_chunks", return_value=[]):
-        await routes.query_endpoint(
-            request=_make_request(rag_engine),
-            payload=payload,
-            rag_engine=rag_engine,
-        )
+    await routes.query_endpoint(
+        request=_make_request(rag_engine),
+        payload=payload,
+        rag_engine=rag_engine,
+    )
 
     rag_engine.retrieve_top_k.assert_called_once_with(query="test", top_k=5, metadata=[])
+
+
+def test_get_rag_engine_returns_engine_from_app_state():
+    engine = Mock()
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(rag_engine=engine)))
+    assert get_rag_engine(request) is engine
+
+
+def test_get_rag_engine_unavailable_before_startup():
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+    with pytest.raises(HTTPException) as exc_info:
+        get_rag_engine(request)
+    assert exc_info.value.status_code == 503
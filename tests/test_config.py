@@ -3,7 +3,7 @@ from unittest.mock import patch
 
 import pytest
 
-from utils.config import EnvSettings
+from utils.config import EnvSettings, Settings
 
 
 def _make_env(**overrides):
@@ -34,3 +34,39 @@ def test_mcp_api_key_stripped(raw, expected):
     with patch.dict(os.environ, _make_env(MCP_API_KEY=raw), clear=True):
         settings = EnvSettings()
         assert settings.MCP_API_KEY == expected
+
+
+def test_settings_sections_are_cached_until_reload():
+    yaml_configs = [
+        {"embedding": {"provider": "local", "embedding_dim": 384}},
+        {"embedding": {"provider": "local", "embedding_dim": 768}},
+    ]
+    with (
+        patch.dict(os.environ, _make_env(), clear=True),
+        patch("utils.config.load_yaml_with_env", side_effect=yaml_configs),
+    ):
+        settings = Settings()
+        embedding = settings.EMBEDDING
+        assert settings.EMBEDDING is embedding
+        assert embedding["dim"] == 384
+
+        settings.reload()
+
+        assert settings.EMBEDDING["dim"] == 768
+
+
+def test_embed_batch_size_defaults_to_64():
+    yaml_configs = [
+        {"embedding": {"provider": "local", "embedding_dim": 384}},
+        {"embedding": {"provider": "local", "embedding_dim": 384, "embed_batch_size": 16}},
+    ]
+    with (
+        patch.dict(os.environ, _make_env(), clear=True),
+        patch("utils.config.load_yaml_with_env", side_effect=yaml_configs),
+    ):
+        settings = Settings()
+        assert settings.EMBEDDING["embed_batch_size"] == 64
+
+        settings.reload()
+
+        assert settings.EMBEDDING["embed_batch_size"] == 16
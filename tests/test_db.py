@@ -0,0 +1,22 @@
+from unittest.mock import patch
+
+from sqlalchemy.pool import NullPool
+
+from utils.config import settings
+from utils.db import pool_kwargs
+
+
+def test_pool_kwargs_sizes_pool():
+    with patch.object(settings.env, "DATABASE_NULL_POOL", False):
+        kwargs = pool_kwargs(pool_size=3, max_overflow=1)
+
+    assert kwargs["pool_size"] == 3
+    assert kwargs["max_overflow"] == 1
+    assert kwargs["pool_pre_ping"] is True
+    # Shared with PGVectorStore's async engine, which rejects a sync poolclass
+    assert "poolclass" not in kwargs
+
+
+def test_pool_kwargs_null_pool_for_external_pooler():
+    with patch.object(settings.env, "DATABASE_NULL_POOL", True):
+        assert pool_kwargs(pool_size=3, max_overflow=1) == {"poolclass": NullPool}
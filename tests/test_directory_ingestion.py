@@ -1,3 +1,5 @@
+import builtins
+import hashlib
 import tempfile
 import unittest
 from pathlib import Path
@@ -11,13 +13,19 @@ from tasks.helper_classes.ingestion_item import IngestionItem
 
 class TestDirectoryIngestionJob(unittest.TestCase):
     def setUp(self):
-        self.reader_patcher = patch("tasks.directory_ingestion.SimpleDirectoryReader")
-        self.mock_reader_class = self.reader_patcher.start()
-        self.mock_directory_reader = Mock()
-        self.mock_directory_reader.list_resources.return_value = []
-        self.mock_reader_class.return_value = self.mock_directory_reader
+        # Route every file through a mocked SimpleDirectoryReader file reader
+        self.mock_reader = Mock()
+        self.mock_reader_class = Mock(return_value=self.mock_reader)
+        self.reader_patcher = patch(
+            "tasks.helper_classes.file_parser._reader_classes",
+            return_value={".txt": self.mock_reader_class},
+        )
+        self.reader_patcher.start()
+        self.has_reader_patcher = patch("tasks.directory_ingestion.has_file_reader", return_value=True)
+        self.has_reader_patcher.start()
 
     def tearDown(self):
+        self.has_reader_patcher.stop()
         self.reader_patcher.stop()
 
     def test_source_type(self):
@@ -46,32 +54,17 @@ class TestDirectoryIngestionJob(unittest.TestCase):
 
     def test_list_items_recursive(self):
         with tempfile.TemporaryDirectory() as temp_dir:
-            base = Path(temp_dir)
+            base = Path(temp_dir).resolve()
             (base / "root.txt").write_text("root", encoding="utf-8")
             nested_dir = base / "nested"
             nested_dir.mkdir()
             (nested_dir / "child.md").write_text("child", encoding="utf-8")
-            self.mock_directory_reader.list_resources.return_value = [
-                str(base / "root.txt"),
-                str(nested_dir / "child.md"),
-            ]
 
             job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
 
             items = list(job.list_items())
 
-            self.assertEqual(len(items), 2)
-            self.mock_reader_class.assert_called_with(
-                input_dir=str(Path(temp_dir).resolve()),
-                recursive=True,
-                required_exts=None,
-                exclude_hidden=True,
-                exclude_empty=False,
-                num_files_limit=None,
-                encoding="utf-8",
-                errors="ignore",
-                raise_on_error=True,
-            )
+            self.assertEqual([item.source_ref for item in items], [nested_dir / "child.md", base / "root.txt"])
             self.assertTrue(items[0].id.startswith("file://"))
             self.assertIsInstance(items[0].source_ref, Path)
             self.assertIsNotNone(items[0].last_modified)
@@ -83,7 +76,6 @@ class TestDirectoryIngestionJob(unittest.TestCase):
             nested_dir = base / "nested"
             nested_dir.mkdir()
             (nested_dir / "child.md").write_text("child", encoding="utf-8")
-            self.mock_directory_reader.list_resources.return_value = [str(base / "root.txt")]
 
             job = DirectoryIngestionJob(
                 {
@@ -98,18 +90,86 @@ class TestDirectoryIngestionJob(unittest.TestCase):
             self.assertEqual(Path(items[0].source_ref).name, "root.txt")
             self.assertEqual(job.connector_config.recursive, False)
 
-    def test_list_items_resolves_relative_resources_from_base_directory(self):
+    def test_list_items_applies_filters(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir)
+            (base / "doc.md").write_text("doc", encoding="utf-8")
+            (base / "notes.txt").write_text("notes", encoding="utf-8")
+            (base / "image.png").write_bytes(b"png")
+            (base / "empty.md").write_text("", encoding="utf-8")
+            (base / ".hidden.md").write_text("hidden", encoding="utf-8")
+            hidden_dir = base / ".git"
+            hidden_dir.mkdir()
+            (hidden_dir / "inside.md").write_text("inside", encoding="utf-8")
+
+            job = DirectoryIngestionJob(
+                {
+                    "name": "local",
+                    "config": {"path": temp_dir, "required_exts": "md,txt", "exclude_empty": True},
+                }
+            )
+
+            names = [item.source_ref.name for item in job.list_items()]
+
+            self.assertEqual(names, ["doc.md", "notes.txt"])
+
+    def test_list_items_respects_num_files_limit(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir)
+            for name in ("a.txt", "b.txt", "c.txt"):
+                (base / name).write_text(name, encoding="utf-8")
+
+            job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir, "num_files_limit": 2}})
+
+            names = [item.source_ref.name for item in job.list_items()]
+
+            self.assertEqual(names, ["a.txt", "b.txt"])
+
+    def test_list_items_scan_threads_keep_serial_order(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             base = Path(temp_dir)
+            for directory in ("a", "a/x", "a/y", "b", "c/z"):
+                (base / directory).mkdir(parents=True, exist_ok=True)
+                for name in ("2.txt", "1.txt"):
+                    (base / directory / name).write_text(directory, encoding="utf-8")
+            (base / "top.txt").write_text("top", encoding="utf-8")
+
+            def listed(stat_threads):
+                job = DirectoryIngestionJob(
+                    {"name": "local", "config": {"path": temp_dir, "stat_threads": stat_threads}}
+                )
+                return [item.source_ref for item in job.list_items()]
+
+            serial = listed(1)
+
+            self.assertEqual(len(serial), 11)
+            self.assertEqual(listed(4), serial)
+            # Files of one directory spread over several stat batches
+            with patch("tasks.directory_ingestion.STAT_BATCH", 1):
+                self.assertEqual(listed(4), serial)
+
+    def test_init_rejects_non_positive_stat_threads(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(ValidationError):
+                DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir, "stat_threads": 0}})
+
+    def test_list_items_skips_symlinks_outside_base_directory(self):
+        with tempfile.TemporaryDirectory() as temp_dir, tempfile.TemporaryDirectory() as outside_dir:
+            base = Path(temp_dir).resolve()
             (base / "root.txt").write_text("root", encoding="utf-8")
-            self.mock_directory_reader.list_resources.return_value = ["root.txt"]
+            (base / "inside_link.txt").symlink_to(base / "root.txt")
+            outside_file = Path(outside_dir) / "secret.txt"
+            outside_file.write_text("secret", encoding="utf-8")
+            (base / "outside_link.txt").symlink_to(outside_file)
+            (base / "outside_dir").symlink_to(outside_dir, target_is_directory=True)
 
             job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
 
-            items = list(job.list_items())
+            with patch("tasks.directory_ingestion.logger.warning") as mock_warning:
+                refs = [item.source_ref for item in job.list_items()]
 
-            self.assertEqual(len(items), 1)
-            self.assertEqual(items[0].source_ref, (base / "root.txt").resolve())
+            self.assertEqual(refs, [base / "root.txt", base / "root.txt"])
+            mock_warning.assert_called_once()
 
     def test_required_exts_normalizes_extensions(self):
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -159,7 +219,7 @@ class TestDirectoryIngestionJob(unittest.TestCase):
             file_path = Path(temp_dir) / "doc.txt"
             file_path.write_text("raw text", encoding="utf-8")
 
-            self.mock_directory_reader.load_resource.return_value = [Mock(text="Converted text")]
+            self.mock_reader.load_data.return_value = [Mock(text="Converted text")]
 
             job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
 
@@ -167,15 +227,18 @@ class TestDirectoryIngestionJob(unittest.TestCase):
             result = job.get_raw_content(item)
 
             self.assertEqual(result, "Converted text")
-            self.mock_directory_reader.load_resource.assert_called_once_with(str(file_path))
+            self.mock_reader.load_data.assert_called_once()
+            self.assertEqual(self.mock_reader.load_data.call_args.args[0], file_path)
 
     def test_get_raw_content_joins_multiple_documents(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             file_path = Path(temp_dir) / "doc.txt"
             file_path.write_text("ignored", encoding="utf-8")
 
-            self.mock_directory_reader.load_resource.return_value = [
-                Mock(text="Part 1"),
+            self.mock_reader.load_data.return_value = [
+                Mock(text=" Part 1\n"),
+                Mock(text="  \n"),
+                Mock(text=None),
                 Mock(text="Part 2"),
             ]
 
@@ -186,12 +249,25 @@ class TestDirectoryIngestionJob(unittest.TestCase):
 
             self.assertEqual(result, "Part 1\n\nPart 2")
 
+    def test_get_raw_content_instantiates_each_reader_once(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.mock_reader.load_data.return_value = [Mock(text="text")]
+            job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
+
+            for name in ("a.txt", "b.TXT"):
+                file_path = Path(temp_dir) / name
+                file_path.write_text("ignored", encoding="utf-8")
+                job.get_raw_content(IngestionItem(id=f"file://{file_path}", source_ref=file_path))
+
+            self.mock_reader_class.assert_called_once_with()
+            self.assertEqual(self.mock_reader.load_data.call_count, 2)
+
     def test_get_raw_content_returns_empty_on_loader_error(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             file_path = Path(temp_dir) / "doc.txt"
             file_path.write_text("fallback text", encoding="utf-8")
 
-            self.mock_directory_reader.load_resource.side_effect = ValueError("bad loader")
+            self.mock_reader.load_data.side_effect = ValueError("bad loader")
 
             job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
 
@@ -210,7 +286,7 @@ class TestDirectoryIngestionJob(unittest.TestCase):
         with tempfile.TemporaryDirectory() as temp_dir:
             file_path = Path(temp_dir) / "doc.txt"
             file_path.write_text("fallback text", encoding="utf-8")
-            self.mock_directory_reader.load_resource.return_value = []
+            self.mock_reader.load_data.return_value = []
 
             job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
 
@@ -222,7 +298,7 @@ class TestDirectoryIngestionJob(unittest.TestCase):
     def test_get_raw_content_returns_empty_on_loader_error_for_missing_file(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             missing_path = Path(temp_dir) / "missing.txt"
-            self.mock_directory_reader.load_resource.side_effect = ValueError("missing file")
+            self.mock_reader.load_data.side_effect = ValueError("missing file")
             job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
 
             item = IngestionItem(id=f"file://{missing_path}", source_ref=missing_path)
@@ -257,36 +333,72 @@ class TestDirectoryIngestionJob(unittest.TestCase):
             self.assertEqual(cfg.exclude_hidden, False)
             self.assertEqual(cfg.exclude_empty, True)
             self.assertEqual(cfg.num_files_limit, 7)
-            # raise_on_error / errors are hardcoded in _build_directory_reader,
-            # verified via the SimpleDirectoryReader constructor call
-            self.mock_reader_class.assert_called_with(
-                input_dir=str(Path(temp_dir).resolve()),
-                recursive=False,
-                required_exts=None,
-                exclude_hidden=False,
-                exclude_empty=True,
-                num_files_limit=7,
-                encoding="utf-8",
-                errors="ignore",
-                raise_on_error=True,
-            )
 
-    def test_config_forces_errors_ignore(self):
+    def test_config_drops_errors_and_raise_on_error(self):
         with tempfile.TemporaryDirectory() as temp_dir:
-            DirectoryIngestionJob(
+            file_path = Path(temp_dir) / "doc.txt"
+            file_path.write_text("raw text", encoding="utf-8")
+            self.mock_reader.load_data.return_value = []
+            job = DirectoryIngestionJob(
                 {
                     "name": "local",
                     "config": {
                         "path": temp_dir,
                         "errors": "replace",
+                        "raise_on_error": False,
                     },
                 }
             )
 
-            # errors="replace" from config is dropped (extra="ignore"),
-            # _build_directory_reader always passes errors="ignore"
-            call_kwargs = self.mock_reader_class.call_args.kwargs
-            self.assertEqual(call_kwargs["errors"], "ignore")
+            job.get_raw_content(IngestionItem(id=f"file://{file_path}", source_ref=file_path))
+
+            # errors / raise_on_error from config are dropped (extra="ignore")
+            # and never reach the file reader
+            self.mock_reader.load_data.assert_called_once_with(file_path, extra_info=None)
+
+    def test_get_item_checksum_hashes_file_bytes_without_parsing(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir) / "doc.pdf"
+            file_path.write_bytes(b"%PDF-1.4 bytes")
+            job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
+            item = IngestionItem(id=f"file://{file_path}", source_ref=file_path)
+
+            checksum = job.get_item_checksum(item)
+
+            self.assertEqual(checksum, hashlib.sha256(b"%PDF-1.4 bytes").hexdigest())
+            self.mock_reader.load_data.assert_not_called()
+
+    def test_process_item_adopts_file_hash_for_file_recorded_with_text_checksum(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir) / "notes.txt"
+            file_path.write_bytes(b"  parsed text \n")
+            job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
+            job.metadata_tracker = Mock()
+            job.vector_manager = Mock()
+            # Recorded before file hashes: the checksum is the SHA-256 of the parsed text
+            job.metadata_tracker.get_latest_record.return_value = Mock(
+                checksum=hashlib.sha256(b"parsed text").hexdigest(), version=2
+            )
+            item = next(iter(job.list_items()))
+
+            with patch("tasks.directory_ingestion.has_file_reader", return_value=False):
+                result = job.process_item(item)
+
+            self.assertEqual(result, 0)
+            job.metadata_tracker.update_checksum.assert_called_once_with(
+                "notes.txt", 2, hashlib.sha256(b"  parsed text \n").hexdigest()
+            )
+            job.vector_manager.insert_documents.assert_not_called()
+
+    def test_get_item_checksum_returns_none_for_unreadable_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            missing_path = Path(temp_dir) / "missing.txt"
+            job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
+            item = IngestionItem(id=f"file://{missing_path}", source_ref=missing_path)
+
+            with patch("tasks.directory_ingestion.logger.warning") as mock_warning:
+                self.assertIsNone(job.get_item_checksum(item))
+            mock_warning.assert_called_once()
 
     def test_get_item_name_uses_relative_sanitized_path(self):
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -311,5 +423,56 @@ class TestDirectoryIngestionJob(unittest.TestCase):
             self.assertEqual(job.get_item_name(item), "file.txt")
 
 
+class TestDirectoryIngestionFileReads(unittest.TestCase):
+    """Runs the real SimpleDirectoryReader file readers."""
+
+    def test_get_raw_content_opens_each_file_once(self):
+        real_open = builtins.open
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, text in (("a.txt", "plain"), ("b.md", "# Title\n\nbody"), ("c.csv", "x,y\n1,2")):
+                (Path(temp_dir) / name).write_text(text, encoding="utf-8")
+            job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir}})
+
+            for item in job.list_items():
+                opened = []
+
+                def counting_open(file, *args, _opened=opened, **kwargs):
+                    _opened.append(str(file))
+                    return real_open(file, *args, **kwargs)
+
+                with self.subTest(file=item.source_ref.name), patch("builtins.open", counting_open):
+                    self.assertTrue(job.get_raw_content(item))
+                    self.assertEqual(opened.count(str(item.source_ref)), 1)
+
+    def test_get_raw_content_reads_plain_text_without_parser_process(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "notes.log").write_bytes(b"  line one\xff\nline two\n")
+            job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir, "parse_workers": 1}})
+
+            with (
+                patch("tasks.directory_ingestion.has_file_reader", return_value=False),
+                patch("tasks.directory_ingestion.load_documents") as load_documents,
+            ):
+                contents = [job.get_raw_content(item) for item in job.list_items()]
+
+            self.assertEqual(contents, ["line one\nline two"])
+            load_documents.assert_not_called()
+            self.assertIsNone(job._parser_pool)
+
+    def test_get_raw_content_parses_in_worker_processes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "a.md").write_text("# Title\n\nbody", encoding="utf-8")
+            job = DirectoryIngestionJob({"name": "local", "config": {"path": temp_dir, "parse_workers": 1}})
+            try:
+                with patch("tasks.directory_ingestion.has_file_reader", return_value=True):
+                    contents = [job.get_raw_content(item) for item in job.list_items()]
+                self.assertIsNotNone(job._parser_pool)
+            finally:
+                job._shutdown_parser_pool()
+
+            self.assertEqual(contents, ["# Title\n\nbody"])
+            self.assertIsNone(job._parser_pool)
+
+
 if __name__ == "__main__":
     unittest.main()
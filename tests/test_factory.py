@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+
+from tasks.base import IngestionJob
+from tasks.factory import IngestionJobFactory
+
+
+class _DummyJob(IngestionJob):
+    def __init__(self, config):
+        self.config = config
+
+    @property
+    def source_type(self):
+        return "dummy"
+
+    def list_items(self):
+        return []
+
+    def get_raw_content(self, item):
+        return ""
+
+    def get_item_name(self, item):
+        return ""
+
+
+class TestIngestionJobFactory(unittest.TestCase):
+    def test_registered_paths_resolve_to_ingestion_jobs(self):
+        with patch.dict(IngestionJobFactory._registry):
+            for job_type, job_class in list(IngestionJobFactory._registry.items()):
+                with self.subTest(job_type=job_type):
+                    self.assertTrue(issubclass(IngestionJobFactory.get_job_class(job_type), IngestionJob))
+
+    def test_create_imports_job_class_on_first_use_and_caches_it(self):
+        with patch.dict(IngestionJobFactory._registry):
+            IngestionJobFactory.register("dummy", f"{__name__}:_DummyJob")
+
+            job = IngestionJobFactory.create("dummy", {"name": "d"})
+
+            self.assertIsInstance(job, _DummyJob)
+            self.assertEqual(job.config, {"name": "d"})
+            self.assertIs(IngestionJobFactory._registry["dummy"], _DummyJob)
+
+    def test_get_job_class_resolves_without_instantiating(self):
+        with patch.dict(IngestionJobFactory._registry):
+            IngestionJobFactory.register("dummy", f"{__name__}:_DummyJob")
+
+            with patch.object(_DummyJob, "__init__") as mock_init:
+                self.assertIs(IngestionJobFactory.get_job_class("dummy"), _DummyJob)
+            mock_init.assert_not_called()
+
+    def test_create_rejects_path_to_non_job_class(self):
+        with patch.dict(IngestionJobFactory._registry):
+            IngestionJobFactory.register("bad", f"{__name__}:TestIngestionJobFactory")
+
+            with self.assertRaises(ValueError):
+                IngestionJobFactory.create("bad", {})
+
+    def test_create_rejects_unknown_type(self):
+        with self.assertRaises(ValueError):
+            IngestionJobFactory.create("unknown", {})
+
+
+if __name__ == "__main__":
+    unittest.main()
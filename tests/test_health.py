@@ -0,0 +1,38 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+class HealthCheckTests(unittest.TestCase):
+    def setUp(self):
+        main.app.state._celery_health = None
+        # No context manager: the lifespan (vector store setup) is not run
+        self.client = TestClient(main.app)
+
+    def test_reports_celery_ping_result(self):
+        with patch.object(main.celery_app.control, "ping", return_value=[{"worker": {"ok": "pong"}}]):
+            body = self.client.get("/health").json()
+
+        self.assertEqual(body["status"], "ok")
+        self.assertTrue(body["celery_healthy"])
+
+    def test_ping_failure_is_unhealthy(self):
+        with patch.object(main.celery_app.control, "ping", side_effect=OSError("broker down")):
+            self.assertFalse(self.client.get("/health").json()["celery_healthy"])
+
+    def test_ping_result_is_cached_within_ttl(self):
+        with patch.object(main.celery_app.control, "ping", return_value=[]) as ping:
+            self.client.get("/health")
+            self.client.get("/health")
+        self.assertEqual(ping.call_count, 1)
+
+    def test_stale_result_pings_again(self):
+        main.app.state._celery_health = (main.time.monotonic() - main.CELERY_HEALTH_TTL, True)
+        with patch.object(main.celery_app.control, "ping", return_value=[]) as ping:
+            body = self.client.get("/health").json()
+
+        ping.assert_called_once()
+        self.assertFalse(body["celery_healthy"])
@@ -121,6 +121,20 @@ class TestRetrySession(unittest.TestCase):
 
         session.close.assert_called_once()
 
+    @patch("utils.http.requests.Session")
+    def test_default_pool_size_keeps_session_adapters(self, MockSession):
+        RetrySession()
+
+        MockSession.return_value.mount.assert_not_called()
+
+    @patch("utils.http.requests.Session")
+    def test_larger_pool_size_mounts_adapter(self, MockSession):
+        RetrySession(pool_maxsize=32)
+
+        session = MockSession.return_value
+        self.assertEqual([c.args[0] for c in session.mount.call_args_list], ["https://", "http://"])
+        self.assertEqual(session.mount.call_args.args[1]._pool_maxsize, 32)
+
 
 if __name__ == "__main__":
     unittest.main()
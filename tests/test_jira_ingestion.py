@@ -1,3 +1,5 @@
+import io
+import threading
 import unittest
 from datetime import datetime
 from unittest.mock import Mock, patch
@@ -229,6 +231,10 @@ class TestJiraIngestionJob(unittest.TestCase):
         job = self._make_job(load_comments="false")
         self.assertFalse(job.load_comments)
 
+    def test_io_workers_default(self):
+        job = self._make_job()
+        self.assertEqual(job.io_workers, 4)
+
     # ------------------------------------------------------------------
     # list_items
     # ------------------------------------------------------------------
@@ -281,6 +287,39 @@ class TestJiraIngestionJob(unittest.TestCase):
         second_call_kwargs = self.mock_jira.enhanced_search_issues.call_args_list[1].kwargs
         self.assertEqual(second_call_kwargs["nextPageToken"], "token1")
 
+    def test_list_items_prefetches_next_page(self):
+        batch1 = _make_result_list([_make_issue(key=f"TEST-{i}") for i in range(100)], next_page_token="token1")
+        batch2 = _make_result_list([_make_issue(key="TEST-100")], next_page_token=None)
+        second_page_requested = threading.Event()
+
+        def search(*args, **kwargs):
+            if kwargs["nextPageToken"] is None:
+                return batch1
+            second_page_requested.set()
+            return batch2
+
+        self.mock_jira.enhanced_search_issues.side_effect = search
+
+        items = self._make_job(max_results=3000).list_items()
+        first = next(items)
+
+        # Requested while the first page is still being consumed
+        self.assertTrue(second_page_requested.wait(timeout=5))
+        self.assertEqual(first.id, "jira:TEST-0")
+        self.assertEqual(len(list(items)), 100)
+
+    def test_list_items_requests_comment_field_only_when_loading_comments(self):
+        self.mock_jira.enhanced_search_issues.return_value = _make_result_list([_make_issue()])
+
+        list(self._make_job().list_items())
+        fields = self.mock_jira.enhanced_search_issues.call_args.kwargs["fields"].split(",")
+        self.assertIn("summary", fields)
+        self.assertNotIn("comment", fields)
+
+        list(self._make_job(load_comments=True).list_items())
+        fields = self.mock_jira.enhanced_search_issues.call_args.kwargs["fields"].split(",")
+        self.assertIn("comment", fields)
+
     def test_list_items_empty_result(self):
         self.mock_jira.enhanced_search_issues.return_value = _make_result_list([])
 
@@ -419,6 +458,34 @@ class TestJiraIngestionJob(unittest.TestCase):
         self.assertIn("Charlie", content)
         self.assertIn("Great issue!", content)
 
+    def test_get_raw_content_uses_comments_embedded_in_search_result(self):
+        issue = _make_issue(description="desc")
+        comment = Mock(author=Mock(displayName="Dana"), created="2024-06-01", body="Embedded")
+        issue.fields.comment = Mock(comments=[comment], total=1)
+        self.mock_md.convert_stream.return_value = Mock(text_content="desc")
+
+        job = self._make_job(load_comments=True, max_comments=5)
+        content = job.get_raw_content(IngestionItem(id="jira:TEST-1", source_ref=issue))
+
+        self.assertIn("Embedded", content)
+        self.mock_jira.comments.assert_not_called()
+
+    def test_get_raw_content_fetches_comments_when_embedded_page_is_incomplete(self):
+        issue = _make_issue(description="desc")
+        embedded = Mock(author=Mock(displayName="Dana"), created="2024-06-01", body="Embedded")
+        issue.fields.comment = Mock(comments=[embedded], total=3)
+        fetched = [
+            Mock(author=Mock(displayName="Eve"), created=f"2024-06-0{i + 1}", body=f"Fetched {i}") for i in range(3)
+        ]
+        self.mock_jira.comments.return_value = fetched
+        self.mock_md.convert_stream.return_value = Mock(text_content="desc")
+
+        job = self._make_job(load_comments=True, max_comments=5)
+        content = job.get_raw_content(IngestionItem(id="jira:TEST-1", source_ref=issue))
+
+        self.assertIn("Fetched 2", content)
+        self.mock_jira.comments.assert_called_once_with(issue, max_results=5)
+
     def test_get_raw_content_no_comments_when_disabled(self):
         issue = _make_issue(summary="Issue", description="desc")
         item = IngestionItem(id="jira:TEST-1", source_ref=issue)
@@ -549,17 +616,73 @@ class TestJiraIngestionJob(unittest.TestCase):
         self.mock_md.convert_stream.return_value = md_result
 
         job = self._make_job()
-        result = job._to_markdown("original text")
+        result = job._to_markdown("<p>original text</p>")
 
-        self.assertEqual(result, "original text")
+        self.assertEqual(result, "<p>original text</p>")
 
     def test_to_markdown_falls_back_on_conversion_error(self):
         self.mock_md.convert_stream.side_effect = ValueError("bad")
 
         job = self._make_job()
-        result = job._to_markdown("original text")
+        result = job._to_markdown("<p>original text</p>")
+
+        self.assertEqual(result, "<p>original text</p>")
 
-        self.assertEqual(result, "original text")
+    def test_to_markdown_converts_html(self):
+        self.mock_md.convert_stream.return_value = Mock(text_content="**bold**")
+
+        job = self._make_job()
+
+        self.assertEqual(job._to_markdown("<b>bold</b>"), "**bold**")
+        self.mock_md.convert_stream.assert_called_once()
+
+    def test_to_markdown_skips_conversion_for_text_markitdown_keeps_as_is(self):
+        job = self._make_job()
+
+        self.assertEqual(job._to_markdown("h1. Title\n*bold* {code}x{code}\n"), "h1. Title\n*bold* {code}x{code}")
+        self.mock_md.convert_stream.assert_not_called()
+
+    def test_to_markdown_skips_conversion_for_prose_with_commas(self):
+        job = self._make_job()
+        text = "Steps: open page, click save, observe error.\nExpected: saved, no error."
+
+        self.assertEqual(job._to_markdown(text), text)
+        self.mock_md.convert_stream.assert_not_called()
+
+    def test_to_markdown_normalizes_lines_of_unconverted_text(self):
+        job = self._make_job()
+
+        self.assertEqual(
+            job._to_markdown("Line one   \r\nline two\r\n\r\n\r\n\r\nline three\r\n"),
+            "Line one\nline two\n\nline three",
+        )
+        self.mock_md.convert_stream.assert_not_called()
+
+    def test_to_markdown_skipped_conversion_matches_markitdown(self):
+        from markitdown import MarkItDown
+
+        md = MarkItDown()
+        job = self._make_job()
+        texts = (
+            "Line one   \nline two\n\n\n\nline three",
+            "Plain text\r\nwith CRLF\r\n",
+            "h1. Title  \r\n\r\n\r\n* item one\t\r\n* item two\r\n{code}x = 1{code}\r\n",
+            "Steps: open page, click save.\n\n\n\nExpected: saved.   ",
+        )
+        for text in texts:
+            with self.subTest(text=text):
+                expected = md.convert_stream(io.BytesIO(text.encode("utf-8"))).text_content.strip()
+                self.assertEqual(job._to_markdown(text), expected)
+        self.mock_md.convert_stream.assert_not_called()
+
+    def test_to_markdown_converts_delimited_tables(self):
+        self.mock_md.convert_stream.return_value = Mock(text_content="| a | b |")
+        job = self._make_job()
+
+        for text in ("a,b\n1,2\n", "a\tb\n1\t2\n"):
+            with self.subTest(text=text):
+                self.assertEqual(job._to_markdown(text), "| a | b |")
+        self.assertEqual(self.mock_md.convert_stream.call_count, 2)
 
     def test_to_markdown_returns_empty_for_blank_input(self):
         job = self._make_job()
@@ -613,6 +736,16 @@ class TestJiraIngestionJob(unittest.TestCase):
         result = job._extract_adf_text(adf)
         self.assertIn("## Section Title", result)
 
+    def test_extract_adf_text_keeps_document_order_beyond_recursion_limit(self):
+        node = {"type": "text", "text": "deepest"}
+        for _ in range(5000):
+            node = {"type": "paragraph", "content": [node]}
+        adf = {"type": "doc", "content": [{"type": "text", "text": "first"}, node, {"type": "text", "text": "last"}]}
+
+        job = self._make_job()
+
+        self.assertEqual(job._extract_adf_text(adf), "first\ndeepest\nlast")
+
     def test_extract_adf_text_nested(self):
         adf = {
             "type": "doc",
@@ -658,8 +791,7 @@ class TestJiraIngestionJob(unittest.TestCase):
 
         with (
             patch.object(job.metadata_tracker, "get_latest_record", return_value=None),
-            patch.object(job.metadata_tracker, "record_metadata") as mock_record,
-            patch.object(job.metadata_tracker, "delete_previous_embeddings"),
+            patch.object(job.metadata_tracker, "record_metadata_bulk") as mock_record,
         ):
             result = job.process_item(item)
 
@@ -679,7 +811,7 @@ class TestJiraIngestionJob(unittest.TestCase):
         job._seen_add = Mock(return_value=False)  # simulate already seen
 
         with patch.object(job.metadata_tracker, "get_latest_record", return_value=None):
-            with patch.object(job.metadata_tracker, "record_metadata"):
+            with patch.object(job.metadata_tracker, "record_metadata_bulk"):
                 job.vector_manager.insert_documents = Mock()
                 result = job.process_item(item)
 
@@ -0,0 +1,21 @@
+import pytest
+from llama_index.core.schema import TextNode
+
+from utils.llm_embedding import NormalizeEmbeddings, l2_normalize
+
+
+def test_l2_normalize_scales_to_unit_length():
+    assert l2_normalize([3.0, 4.0]) == pytest.approx([0.6, 0.8])
+
+
+def test_l2_normalize_keeps_zero_vector():
+    assert l2_normalize([0.0, 0.0]) == [0.0, 0.0]
+
+
+def test_normalize_embeddings_transform_skips_nodes_without_embedding():
+    nodes = [TextNode(text="a", embedding=[0.0, 2.0]), TextNode(text="b")]
+
+    result = NormalizeEmbeddings()(nodes)
+
+    assert result[0].embedding == [0.0, 1.0]
+    assert result[1].embedding is None
@@ -61,6 +61,22 @@ async def test_retrieve_chunks_response_calls_engine():
     assert result == {"references": [], "raw": []}
 
 
+@pytest.mark.asyncio
+async def test_retrieve_chunks_batch_response_aligned_with_queries():
+    rag_engine = Mock()
+    rag_engine.retrieve_top_k_batch.return_value = [
+        [_DummyNodeWithScore(text="First", score=0.9)],
+        [],
+    ]
+
+    result = await mcp_server.retrieve_chunks_batch_response(rag_engine=rag_engine, queries=["one", "two"], top_k=3)
+
+    rag_engine.retrieve_top_k_batch.assert_called_once_with(queries=["one", "two"], top_k=3, metadata=[])
+    assert [item["query"] for item in result] == ["one", "two"]
+    assert result[0]["raw"] == ["Score: 0.9000 | Text: First"]
+    assert result[1] == {"query": "two", "references": [], "raw": []}
+
+
 @pytest.mark.asyncio
 async def test_rephrase_chunks_response_without_results():
     rag_engine = Mock()
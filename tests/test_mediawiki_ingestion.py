@@ -175,6 +175,13 @@ class TestInitialization:
         job, _ = base_wiki_job
         assert job.source_type == "mediawiki"
 
+    def test_fetches_pages_concurrently_by_default(self, base_wiki_job):
+        job, _ = base_wiki_job
+        assert job.io_workers == 4
+
+        job, _ = _make_job(_default_config(host="example.com", io_workers=1))
+        assert job.io_workers == 1
+
     def test_verify_ssl_default_true(self):
         """SSL verification is enabled by default; no custom Site is injected."""
         cfg = _default_config(host="example.com")
@@ -349,6 +356,25 @@ class TestInitialization:
             assert mock_session.headers["User-Agent"] == ua
             assert mock_session.headers["X-Custom"] == "ok"
 
+    def test_io_workers_beyond_default_pool_size_size_the_session_pool(self):
+        cfg = _default_config(host="wiki.example.com", io_workers=16)
+        with (
+            patch("tasks.mediawiki_ingestion.MediaWikiReader") as MockReader,
+            patch("tasks.mediawiki_ingestion.mwclient.Site") as MockSite,
+            patch("tasks.mediawiki_ingestion.requests.Session") as MockSession,
+        ):
+            MockReader.return_value = Mock(host="wiki.example.com", path="/w/", scheme="https")
+            mock_session = Mock()
+            mock_session.headers = {}
+            MockSession.return_value = mock_session
+
+            MediaWikiIngestionJob(cfg)
+
+            prefix, adapter = mock_session.mount.call_args[0]
+            assert prefix == "https://wiki.example.com"
+            assert adapter._pool_maxsize == 16
+            MockSite.assert_called_once()
+
     def test_no_custom_site_when_defaults(self):
         """Default network options leave MediaWikiReader's Site creation alone."""
         cfg = _default_config(host="example.com")
@@ -555,22 +581,21 @@ class TestProcessItem:
         reader._page_to_document.return_value = doc
 
         with patch.object(job.metadata_tracker, "get_latest_record", return_value=None):
-            with patch.object(job.metadata_tracker, "record_metadata"):
-                with patch.object(job.metadata_tracker, "delete_previous_embeddings"):
-                    job.vector_manager.insert_documents = Mock()
-
-                    item = _make_item(
-                        "P",
-                        last_modified=datetime(2024, 1, 1),
-                        url="https://example.com/wiki/P",
-                        pageid=1,
-                        namespace=0,
-                    )
-                    result = job.process_item(item)
-
-                    assert result == 1
-                    job.metadata_tracker.record_metadata.assert_called_once()
-                    job.vector_manager.insert_documents.assert_called_once()
+            with patch.object(job.metadata_tracker, "record_metadata_bulk"):
+                job.vector_manager.insert_documents = Mock()
+
+                item = _make_item(
+                    "P",
+                    last_modified=datetime(2024, 1, 1),
+                    url="https://example.com/wiki/P",
+                    pageid=1,
+                    namespace=0,
+                )
+                result = job.process_item(item)
+
+                assert result == 1
+                job.metadata_tracker.record_metadata_bulk.assert_called_once()
+                job.vector_manager.insert_documents.assert_called_once()
 
     def test_duplicate_content(self, base_wiki_job):
         job, reader = base_wiki_job
@@ -582,17 +607,16 @@ class TestProcessItem:
         reader._page_to_document.return_value = doc
 
         with patch.object(job.metadata_tracker, "get_latest_record", return_value=None):
-            with patch.object(job.metadata_tracker, "record_metadata"):
-                with patch.object(job.metadata_tracker, "delete_previous_embeddings"):
-                    job.vector_manager.insert_documents = Mock()
-                    job._seen_add = Mock(return_value=False)  # duplicate
+            with patch.object(job.metadata_tracker, "record_metadata_bulk"):
+                job.vector_manager.insert_documents = Mock()
+                job._seen_add = Mock(return_value=False)  # duplicate
 
-                    item = _make_item("P", last_modified=datetime(2024, 1, 1))
-                    result = job.process_item(item)
+                item = _make_item("P", last_modified=datetime(2024, 1, 1))
+                result = job.process_item(item)
 
-                    assert result == 0
-                    job.metadata_tracker.record_metadata.assert_not_called()
-                    job.vector_manager.insert_documents.assert_not_called()
+                assert result == 0
+                job.metadata_tracker.record_metadata_bulk.assert_not_called()
+                job.vector_manager.insert_documents.assert_not_called()
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,40 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+
+from api.dependencies import limit, limiter
+
+
+def _make_app(rate: str) -> FastAPI:
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.get("/limited")
+    @limit(rate)
+    async def limited(request: Request):
+        return {"ok": True}
+
+    return app
+
+
+class RateLimitTests(unittest.TestCase):
+    def setUp(self):
+        limiter.reset()
+
+    def test_disabled_rate_limit_leaves_route_untouched(self):
+        async def route(request: Request):
+            return None
+
+        with patch("api.dependencies.settings.env.ENABLE_RATE_LIMIT", False):
+            self.assertIs(limit("1/minute")(route), route)
+
+    def test_enabled_rate_limit_rejects_requests_over_the_limit(self):
+        with patch("api.dependencies.settings.env.ENABLE_RATE_LIMIT", True):
+            client = TestClient(_make_app("2/minute"))
+            statuses = [client.get("/limited").status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
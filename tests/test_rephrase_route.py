@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -24,16 +25,16 @@ class _DummyNodeWithScore:
 
 
 @pytest.mark.asyncio
-async def test_rephrase_uses_to_thread_for_retrieval_and_achat_for_llm():
-    """retrieve_top_k must be called via asyncio.to_thread; llm.achat called directly."""
+async def test_rephrase_uses_rag_executor_for_retrieval_and_achat_for_llm():
+    """retrieve_top_k must run on the bounded RAG executor; llm.achat called directly."""
     nodes = [_DummyNodeWithScore("content")]
     llm_mock = Mock()
     llm_mock.achat = AsyncMock(return_value=Mock(message=Mock(content="answer")))
 
-    to_thread_calls = []
+    executor_calls = []
 
-    async def fake_to_thread(func, *args, **kwargs):
-        to_thread_calls.append(func)
+    async def fake_run_in_rag_executor(func, *args, **kwargs):
+        executor_calls.append(func)
         return func(*args, **kwargs)
 
     rag_engine = Mock()
@@ -41,12 +42,13 @@ async def test_rephrase_uses_to_thread_for_retrieval_and_achat_for_llm():
 
     with (
         patch.object(routes, "llm", llm_mock),
-        patch("api.v1.rephrase_retrieval.routes.asyncio.to_thread", side_effect=fake_to_thread),
+        patch.object(routes, "run_in_rag_executor", side_effect=fake_run_in_rag_executor),
     ):
         limiter_mock = Mock()
         limiter_mock.limit.return_value = lambda f: f
 
         request = Mock()
+        request.headers = {}
         request.app.state.rag_engine = rag_engine
         request.app.state.limiter = limiter_mock
 
@@ -56,7 +58,7 @@ async def test_rephrase_uses_to_thread_for_retrieval_and_achat_for_llm():
 
         await routes.query_endpoint(request=request, payload=payload, rag_engine=rag_engine)
 
-    assert rag_engine.retrieve_top_k in to_thread_calls
+    assert rag_engine.retrieve_top_k in executor_calls
     llm_mock.achat.assert_awaited_once()
 
 
@@ -72,7 +74,7 @@ async def test_rephrase_passes_top_k_from_payload():
 
     with (
         patch.object(routes, "llm", llm_mock),
-        patch("api.v1.rephrase_retrieval.routes.asyncio.to_thread", side_effect=lambda f, *a, **kw: f(*a, **kw)),
+        patch.object(routes, "run_in_rag_executor", side_effect=lambda f, *a, **kw: f(*a, **kw)),
     ):
         payload = Mock()
         payload.query = "test"
@@ -81,6 +83,7 @@ async def test_rephrase_passes_top_k_from_payload():
         limiter_mock = Mock()
         limiter_mock.limit.return_value = lambda f: f
         request = Mock()
+        request.headers = {}
         request.app.state.limiter = limiter_mock
 
         await routes.query_endpoint(
@@ -90,3 +93,164 @@ async def test_rephrase_passes_top_k_from_payload():
         )
 
     rag_engine.retrieve_top_k.assert_called_once_with(query="test", top_k=42)
+
+
+@pytest.mark.asyncio
+async def test_rephrase_builds_references_off_loop_alongside_llm_call():
+    nodes = [_DummyNodeWithScore("content")]
+    llm_mock = Mock()
+    llm_mock.achat = AsyncMock(return_value=Mock(message=Mock(content="answer")))
+
+    executor_calls = []
+
+    async def fake_run_in_rag_executor(func, *args, **kwargs):
+        executor_calls.append(func)
+        return func(*args, **kwargs)
+
+    rag_engine = Mock()
+    rag_engine.retrieve_top_k.return_value = nodes
+
+    with (
+        patch.object(routes, "llm", llm_mock),
+        patch.object(routes, "run_in_rag_executor", side_effect=fake_run_in_rag_executor),
+    ):
+        request = Mock()
+        request.headers = {}
+        request.app.state.rag_engine = rag_engine
+
+        payload = Mock()
+        payload.query = "test query"
+        payload.top_k = 5
+
+        response = await routes.query_endpoint(request=request, payload=payload, rag_engine=rag_engine)
+
+    assert routes.RAGQueryEngine.build_references in executor_calls
+    assert response.answer == "answer"
+    assert [r.text for r in response.references] == ["content"]
+
+
+async def _collect(response) -> str:
+    parts = []
+    async for part in response.body_iterator:
+        parts.append(part)
+    return "".join(parts)
+
+
+@pytest.mark.asyncio
+async def test_rephrase_streams_sse_when_requested():
+    nodes = [_DummyNodeWithScore("content")]
+
+    async def token_stream():
+        for delta in ("Hello", " world"):
+            yield Mock(delta=delta)
+
+    llm_mock = Mock()
+    llm_mock.astream_chat = AsyncMock(return_value=token_stream())
+    llm_mock.achat = AsyncMock()
+
+    rag_engine = Mock()
+    rag_engine.retrieve_top_k.return_value = nodes
+
+    with (
+        patch.object(routes, "llm", llm_mock),
+        patch.object(routes, "run_in_rag_executor", side_effect=lambda f, *a, **kw: f(*a, **kw)),
+    ):
+        request = Mock()
+        request.headers = {"accept": "text/event-stream"}
+
+        payload = Mock()
+        payload.query = "test query"
+        payload.top_k = 5
+
+        response = await routes.query_endpoint(request=request, payload=payload, rag_engine=rag_engine)
+        body = await _collect(response)
+
+    assert response.media_type == "text/event-stream"
+    llm_mock.achat.assert_not_awaited()
+    assert body.startswith('data: {"delta": "Hello"}\n\ndata: {"delta": " world"}\n\n')
+    assert "event: references\ndata: " in body
+    assert '"text": "content"' in body
+
+
+@pytest.mark.asyncio
+async def test_rephrase_stream_validates_references():
+    """References sent over SSE are coerced to the SourceReference field types, like the JSON response."""
+
+    async def token_stream():
+        yield Mock(delta="Hi")
+
+    llm_mock = Mock()
+    llm_mock.astream_chat = AsyncMock(return_value=token_stream())
+
+    rag_engine = Mock()
+    rag_engine.retrieve_top_k.return_value = [_DummyNodeWithScore("content")]
+
+    with (
+        patch.object(routes, "llm", llm_mock),
+        patch.object(routes, "run_in_rag_executor", side_effect=lambda f, *a, **kw: f(*a, **kw)),
+        patch.object(routes.RAGQueryEngine, "build_references", return_value=[{"text": "content", "score": "0.5"}]),
+    ):
+        request = Mock()
+        request.headers = {"accept": "text/event-stream"}
+
+        payload = Mock()
+        payload.query = "test query"
+        payload.top_k = 5
+
+        response = await routes.query_endpoint(request=request, payload=payload, rag_engine=rag_engine)
+        body = await _collect(response)
+
+    assert '"score": 0.5' in body
+
+
+@pytest.mark.asyncio
+async def test_rephrase_stream_cancels_references_on_disconnect():
+    async def token_stream():
+        yield Mock(delta="Hi")
+        yield Mock(delta=" there")
+
+    llm_mock = Mock()
+    llm_mock.astream_chat = AsyncMock(return_value=token_stream())
+    refs_started = asyncio.Event()
+
+    async def never_built(*args, **kwargs):
+        refs_started.set()
+        await asyncio.Event().wait()
+
+    with (
+        patch.object(routes, "llm", llm_mock),
+        patch.object(routes, "run_in_rag_executor", side_effect=never_built),
+    ):
+        stream = routes._stream_answer([], [_DummyNodeWithScore("content")])
+        assert await anext(stream) == 'data: {"delta": "Hi"}\n\n'
+        await refs_started.wait()
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+
+        # Client disconnect closes the generator mid-stream
+        await stream.aclose()
+        await asyncio.sleep(0)
+
+    assert len(tasks) == 1
+    assert all(task.cancelled() for task in tasks)
+
+
+@pytest.mark.asyncio
+async def test_rephrase_stream_without_results_sends_fallback_answer():
+    rag_engine = Mock()
+    rag_engine.retrieve_top_k.return_value = []
+
+    with (
+        patch.object(routes, "llm", Mock()),
+        patch.object(routes, "run_in_rag_executor", side_effect=lambda f, *a, **kw: f(*a, **kw)),
+    ):
+        request = Mock()
+        request.headers = {"accept": "text/event-stream"}
+
+        payload = Mock()
+        payload.query = "test query"
+        payload.top_k = 5
+
+        response = await routes.query_endpoint(request=request, payload=payload, rag_engine=rag_engine)
+        body = await _collect(response)
+
+    assert body == ('data: {"delta": "No relevant content found."}\n\nevent: references\ndata: {"references": []}\n\n')
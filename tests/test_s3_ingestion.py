@@ -1,6 +1,7 @@
 """Tests for S3IngestionJob (Pytest version)."""
 
 import io
+import threading
 from datetime import datetime
 from unittest.mock import Mock, patch
 
@@ -20,7 +21,7 @@ class TestS3IngestionJob:
         self.mock_md = Mock()
 
         with (
-            patch("tasks.s3_ingestion.get_s3_client", return_value=(self.mock_s3, None)),
+            patch("tasks.s3_ingestion.get_s3_client", return_value=(self.mock_s3, None)) as self.mock_get_client,
             patch("tasks.s3_ingestion.MarkItDown", return_value=self.mock_md),
         ):
             self.config = {"name": "test", "config": {"buckets": ["bucket-a"]}}
@@ -30,6 +31,15 @@ class TestS3IngestionJob:
         job = S3IngestionJob(self.config)
         assert job.source_type == "s3"
 
+    def test_io_workers_default_and_pool_size(self):
+        job = S3IngestionJob(self.config)
+        assert job.io_workers == 8
+        assert self.mock_get_client.call_args.kwargs["max_pool_connections"] == 10
+
+    def test_pool_size_follows_io_workers(self):
+        S3IngestionJob({"name": "test", "config": {"buckets": "a", "io_workers": 32}})
+        assert self.mock_get_client.call_args.kwargs["max_pool_connections"] == 32
+
     def test_init_buckets_from_string(self):
         job = S3IngestionJob({"name": "test", "config": {"buckets": " a, b, ,c "}})
         assert job.buckets == ["a", "b", "c"]
@@ -81,6 +91,45 @@ class TestS3IngestionJob:
         assert "ContinuationToken" not in first_call
         assert second_call["ContinuationToken"] == "token1"
 
+    def test_list_items_requests_next_page_before_current_page_is_consumed(self):
+        second_page_requested = threading.Event()
+
+        def list_objects_v2(**params):
+            if "ContinuationToken" not in params:
+                return {
+                    "Contents": [{"Key": "file1.txt", "LastModified": datetime(2024, 1, 1)}],
+                    "IsTruncated": True,
+                    "NextContinuationToken": "token1",
+                }
+            second_page_requested.set()
+            return {"Contents": [{"Key": "file2.txt", "LastModified": datetime(2024, 1, 2)}]}
+
+        self.mock_s3.list_objects_v2.side_effect = list_objects_v2
+        job = S3IngestionJob(self.config)
+        items = job.list_items()
+
+        first = next(items)
+
+        assert first.source_ref == ("bucket-a", "file1.txt")
+        assert second_page_requested.wait(timeout=5)
+        assert [i.source_ref for i in items] == [("bucket-a", "file2.txt")]
+
+    def test_list_items_stops_bucket_on_listing_error(self):
+        self.mock_s3.list_objects_v2.side_effect = [
+            {
+                "Contents": [{"Key": "file1.txt", "LastModified": datetime(2024, 1, 1)}],
+                "IsTruncated": True,
+                "NextContinuationToken": "token1",
+            },
+            Exception("boom"),
+            {"Contents": [{"Key": "file2.txt", "LastModified": datetime(2024, 1, 2)}]},
+        ]
+        job = S3IngestionJob({"name": "test", "config": {"buckets": ["bucket-a", "bucket-b"]}})
+
+        items = list(job.list_items())
+
+        assert [i.source_ref for i in items] == [("bucket-a", "file1.txt"), ("bucket-b", "file2.txt")]
+
     def test_get_raw_content_uses_markdown_conversion(self):
         self.mock_s3.get_object.return_value = {"Body": io.BytesIO(b"raw bytes")}
         conversion_result = Mock(text_content="Converted text")
@@ -88,8 +137,8 @@ class TestS3IngestionJob:
 
         job = S3IngestionJob(self.config)
         item = IngestionItem(
-            id="s3://bucket-a/file1.txt",
-            source_ref=("bucket-a", "file1.txt"),
+            id="s3://bucket-a/file1.pdf",
+            source_ref=("bucket-a", "file1.pdf"),
         )
         result = job.get_raw_content(item)
 
@@ -103,8 +152,8 @@ class TestS3IngestionJob:
 
         job = S3IngestionJob(self.config)
         item = IngestionItem(
-            id="s3://bucket-a/file1.txt",
-            source_ref=("bucket-a", "file1.txt"),
+            id="s3://bucket-a/file1.pdf",
+            source_ref=("bucket-a", "file1.pdf"),
         )
         result = job.get_raw_content(item)
 
@@ -116,13 +165,59 @@ class TestS3IngestionJob:
 
         job = S3IngestionJob(self.config)
         item = IngestionItem(
-            id="s3://bucket-a/file1.txt",
-            source_ref=("bucket-a", "file1.txt"),
+            id="s3://bucket-a/file1.pdf",
+            source_ref=("bucket-a", "file1.pdf"),
         )
         result = job.get_raw_content(item)
 
         assert result == "raw text"
 
+    def test_get_raw_content_decodes_plain_text_keys_without_conversion(self):
+        self.mock_s3.get_object.return_value = {"Body": io.BytesIO("# Notes\ncafé\n".encode())}
+
+        job = S3IngestionJob(self.config)
+        item = IngestionItem(id="s3://bucket-a/notes.MD", source_ref=("bucket-a", "notes.MD"))
+        result = job.get_raw_content(item)
+
+        assert result == "# Notes\ncafé\n"
+        self.mock_md.convert_stream.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            b"# Title  \r\nbody line\r\n\r\n\r\n\r\nend\r\n",
+            b'{"a": [1,\n 2]}  \n',
+            b"key: value  \r\nother: 2\r\n",
+            b"\xef\xbb\xbfhello  \r\nworld\r\n",
+            b"  \r\n",
+            b"",
+        ],
+    )
+    def test_get_raw_content_plain_text_fast_path_matches_markitdown(self, content):
+        from markitdown import MarkItDown
+
+        job = S3IngestionJob(self.config)
+        job.md = MarkItDown()
+
+        self.mock_s3.get_object.return_value = {"Body": io.BytesIO(content)}
+        fast = job.get_raw_content(IngestionItem(id="s3://bucket-a/a.md", source_ref=("bucket-a", "a.md")))
+        # MarkItDown sniffs the stream and never sees the key, so another extension takes the conversion path
+        self.mock_s3.get_object.return_value = {"Body": io.BytesIO(content)}
+        converted = job.get_raw_content(IngestionItem(id="s3://bucket-a/a.bin", source_ref=("bucket-a", "a.bin")))
+
+        assert fast == converted
+
+    def test_get_raw_content_converts_non_utf8_plain_text_keys(self):
+        self.mock_s3.get_object.return_value = {"Body": io.BytesIO("café".encode("latin-1"))}
+        self.mock_md.convert_stream.return_value = Mock(text_content="café")
+
+        job = S3IngestionJob(self.config)
+        item = IngestionItem(id="s3://bucket-a/file1.txt", source_ref=("bucket-a", "file1.txt"))
+        result = job.get_raw_content(item)
+
+        assert result == "café"
+        self.mock_md.convert_stream.assert_called_once()
+
     def test_get_raw_content_returns_empty_on_s3_error(self):
         self.mock_s3.get_object.side_effect = Exception("boom")
 
@@ -54,6 +54,16 @@ class TestSerpAPIIngestionJob(unittest.TestCase):
         job = SerpAPIIngestionJob(config)
         self.assertEqual(job.search_queries, ["q1", "q2"])
 
+    def test_io_workers_default(self):
+        job = SerpAPIIngestionJob(self.config)
+        self.assertEqual(job.io_workers, 4)
+
+    @patch("tasks.serpapi_ingestion.RetrySession")
+    def test_session_pool_size_follows_io_workers(self, MockSession):
+        config = {"name": "serp1", "config": {"api_key": "k", "queries": "q", "io_workers": 16}}
+        SerpAPIIngestionJob(config)
+        MockSession.assert_called_once_with(pool_maxsize=16)
+
     # --- list_items ---
 
     def test_list_items_returns_ingestion_items(self):
@@ -164,7 +174,8 @@ class TestSerpAPIIngestionJob(unittest.TestCase):
             item = next(job.list_items())
             job.get_raw_content(item)
             mock_logger.info.assert_called_once()
-            self.assertIn("Python news", mock_logger.info.call_args[0][0])
+            msg, *args = mock_logger.info.call_args[0]
+            self.assertIn("Python news", msg % tuple(args))
 
 
 if __name__ == "__main__":
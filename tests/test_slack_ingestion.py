@@ -632,8 +632,7 @@ class TestSlackIngestionJob(unittest.TestCase):
 
         with (
             patch.object(job.metadata_tracker, "get_latest_record", return_value=None),
-            patch.object(job.metadata_tracker, "record_metadata") as mock_record,
-            patch.object(job.metadata_tracker, "delete_previous_embeddings"),
+            patch.object(job.metadata_tracker, "record_metadata_bulk") as mock_record,
         ):
             result = job.process_item(item)
 
@@ -655,7 +654,7 @@ class TestSlackIngestionJob(unittest.TestCase):
         job.vector_manager.insert_documents = Mock()
 
         with patch.object(job.metadata_tracker, "get_latest_record", return_value=None):
-            with patch.object(job.metadata_tracker, "record_metadata"):
+            with patch.object(job.metadata_tracker, "record_metadata_bulk"):
                 result = job.process_item(item)
 
         self.assertEqual(result, 0)
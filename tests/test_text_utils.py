@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from utils.text import html_to_markdown, sanitize_ascii_key, slugify
+from utils.text import html_to_markdown, normalize_markitdown_text, sanitize_ascii_key, slugify
 
 
 class TestSlugify(unittest.TestCase):
@@ -62,6 +63,24 @@ class TestHtmlToMarkdown(unittest.TestCase):
         self.assertEqual(html_to_markdown(""), "")
 
 
+class TestNormalizeMarkitdownText(unittest.TestCase):
+    def test_crlf_becomes_lf(self):
+        self.assertEqual(normalize_markitdown_text("a\r\nb\r\n"), "a\nb\n")
+
+    def test_trailing_whitespace_stripped_per_line(self):
+        self.assertEqual(normalize_markitdown_text("a   \n\tb\t\n"), "a\n\tb\n")
+
+    def test_blank_line_runs_collapsed(self):
+        self.assertEqual(normalize_markitdown_text("a\n\n\n\nb\n\nc"), "a\n\nb\n\nc")
+
+    def test_matches_markitdown(self):
+        from markitdown import MarkItDown
+
+        text = "# Title  \r\nbody line\r\n\r\n\r\n\r\nend\r\n"
+        converted = MarkItDown().convert_stream(io.BytesIO(text.encode("utf-8"))).text_content
+        self.assertEqual(normalize_markitdown_text(text), converted)
+
+
 class TestSanitizeAsciiKey(unittest.TestCase):
     def test_replaces_slashes_and_spaces(self):
         self.assertEqual(sanitize_ascii_key("a/b c"), "a_b_c")
@@ -72,6 +91,14 @@ class TestSanitizeAsciiKey(unittest.TestCase):
     def test_drops_non_ascii(self):
         self.assertEqual(sanitize_ascii_key("héllo"), "hello")
 
+    def test_removes_punctuation_and_control_characters(self):
+        self.assertEqual(sanitize_ascii_key("a\\\\b//c?*:<>|\t\x00-d_e.f"), "a_b_c-d_e.f")
+
+    def test_clean_paths_only_replace_separators(self):
+        self.assertEqual(sanitize_ascii_key("docs/v1.2/read-me_now.md"), "docs_v1.2_read-me_now.md")
+        self.assertEqual(sanitize_ascii_key("docs/guide.md", max_len=6), "docs_g")
+        self.assertEqual(sanitize_ascii_key("/docs//guide.md/"), "_docs_guide.md_")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,9 @@
+import threading
 from unittest.mock import Mock
 
-from utils.api import format_chunks
+import pytest
+
+from utils.api import build_rephrase_messages, format_chunks, run_in_rag_executor
 
 
 def _make_node(text: str, score: float | None) -> Mock:
@@ -36,3 +39,24 @@ def test_format_chunks_multiple():
     assert result[0] == "Score: 0.9000 | Text: first"
     assert result[1] == "Score: n/a | Text: second"
     assert result[2] == "Score: 0.1000 | Text: third"
+
+
+@pytest.mark.asyncio
+async def test_run_in_rag_executor_runs_on_rag_pool_thread():
+    def work(a, b=0):
+        return a + b, threading.current_thread().name
+
+    result, thread_name = await run_in_rag_executor(work, 1, b=2)
+
+    assert result == 3
+    assert thread_name.startswith("rag")
+
+
+def test_build_rephrase_messages_joins_query_and_chunks():
+    messages = build_rephrase_messages("what?", [_make_node("first", 0.9), _make_node("second", 0.1)])
+    assert messages[0].content == "Rephrase the following content clearly and concisely."
+    assert messages[1].content == "Original Query: what?\n\nContent:\n\nfirst\n\nsecond"
+
+
+def test_build_rephrase_messages_without_chunks():
+    assert build_rephrase_messages("q", [])[1].content == "Original Query: q\n\nContent:\n\n"
@@ -0,0 +1,59 @@
+import json
+import struct
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from llama_index.core.schema import TextNode
+
+from tasks.helper_classes.vector_store import VectorStoreManager
+
+
+def _read_fields(row: bytes) -> list[bytes]:
+    (count,) = struct.unpack_from(">h", row)
+    offset, fields = 2, []
+    for _ in range(count):
+        (length,) = struct.unpack_from(">i", row, offset)
+        fields.append(row[offset + 4 : offset + 4 + length])
+        offset += 4 + length
+    assert offset == len(row)
+    return fields
+
+
+@pytest.mark.parametrize(
+    "metadata_type,embedding_type,dtype",
+    [("jsonb", "vector", ">f4"), ("json", "halfvec", ">f2")],
+)
+def test_encode_row_uses_postgres_binary_formats(metadata_type, embedding_type, dtype):
+    manager = VectorStoreManager()
+    manager.vector_store = Mock(flat_metadata=False)
+    manager._metadata_type = metadata_type
+    manager._embedding_type = embedding_type
+    node = TextNode(text="Grüße\tand tabs", metadata={"key": "k1"}, embedding=[0.5, -1.0, 2.0])
+
+    node_id, text, metadata, embedding = _read_fields(manager._encode_row(node))
+
+    assert node_id.decode() == node.node_id
+    assert text.decode() == "Grüße\tand tabs"
+    if metadata_type == "jsonb":
+        assert metadata[:1] == b"\x01"
+        metadata = metadata[1:]
+    assert json.loads(metadata)["key"] == "k1"
+    assert struct.unpack_from(">hh", embedding) == (3, 0)
+    assert np.frombuffer(embedding[4:], dtype=dtype).tolist() == [0.5, -1.0, 2.0]
+
+
+def test_insert_documents_reuses_one_uncached_pipeline():
+    manager = VectorStoreManager()
+    with (
+        patch("tasks.helper_classes.vector_store.get_vector_store"),
+        patch("tasks.helper_classes.vector_store.IngestionPipeline") as pipeline_class,
+        patch.object(manager, "_copy_nodes") as copy_nodes,
+    ):
+        manager.insert_documents(["doc-1"])
+        manager.insert_documents(["doc-2"])
+
+    pipeline_class.assert_called_once()
+    assert pipeline_class.call_args.kwargs["disable_cache"] is True
+    assert [c.kwargs["documents"] for c in pipeline_class.return_value.run.call_args_list] == [["doc-1"], ["doc-2"]]
+    assert copy_nodes.call_count == 2
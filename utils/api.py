@@ -1,17 +1,49 @@
-from typing import Any
+import asyncio
+import functools
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
 
+from llama_index.core.llms import ChatMessage, MessageRole
 
-def format_chunks(nodes_with_score: list[Any]) -> list[str]:
-    """Format retrieved nodes as human-readable strings with score and text."""
-    chunks: list[str] = []
+from utils.config import settings
+
+T = TypeVar("T")
+
+_REPHRASE_SYSTEM_PROMPT = "Rephrase the following content clearly and concisely."
+_REPHRASE_PROMPT_HEAD = "Original Query: "
+_REPHRASE_PROMPT_MID = "\n\nContent:\n\n"
+_REPHRASE_CHUNK_SEPARATOR = "\n\n"
+
+# Bounded pool for blocking retrieval work (embedding + DB query) so that a burst of
+# API/MCP requests queues here instead of growing the default executor and DB connections
+RAG_WORKERS = settings.env.RAG_WORKERS or min(8, os.cpu_count() or 1)
+rag_executor = ThreadPoolExecutor(max_workers=RAG_WORKERS, thread_name_prefix="rag")
 
-    for node_with_score in nodes_with_score:
-        score = node_with_score.score
 
-        if score is None:
-            chunks.append(f"Score: n/a | Text: {node_with_score.node.get_text()}")
-            continue
+async def run_in_rag_executor(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable on the bounded RAG thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(rag_executor, functools.partial(func, *args, **kwargs))
+
+
+def format_chunks(nodes_with_score: list[Any]) -> list[str]:
+    """Format retrieved nodes as human-readable strings with score and text."""
+    return [
+        f"Score: {'n/a' if n.score is None else f'{n.score:.4f}'} | Text: {n.node.get_text()}" for n in nodes_with_score
+    ]
 
-        chunks.append(f"Score: {score:.4f} | Text: {node_with_score.node.get_text()}")
 
-    return chunks
+def build_rephrase_messages(query: str, nodes_with_score: list[Any]) -> list[ChatMessage]:
+    """Build the rephrase chat prompt: the query followed by the retrieved chunk texts."""
+    # One join over all parts instead of joining the chunks and then copying them again into an f-string
+    parts = [_REPHRASE_PROMPT_HEAD, query, _REPHRASE_PROMPT_MID]
+    for i, n in enumerate(nodes_with_score):
+        if i:
+            parts.append(_REPHRASE_CHUNK_SEPARATOR)
+        parts.append(n.node.get_text())
+    return [
+        ChatMessage(role=MessageRole.SYSTEM, content=_REPHRASE_SYSTEM_PROMPT),
+        ChatMessage(role=MessageRole.USER, content="".join(parts)),
+    ]
@@ -1,4 +1,5 @@
 import os
+from functools import cached_property
 from pathlib import Path
 
 import yaml
@@ -45,6 +46,12 @@ class EnvSettings(BaseSettings):
 
     CORS_ORIGINS: list[str] = []
 
+    # Threads used by the API for blocking retrieval work (0 = min(8, CPU count))
+    RAG_WORKERS: int = 0
+
+    # Disable client-side connection pooling when an external pooler (PgBouncer) sits in front of Postgres
+    DATABASE_NULL_POOL: bool = False
+
     ENABLE_RATE_LIMIT: bool = False
     CHUNK_RATE_LIMIT: str = "30/minute"
     REPHRASE_RATE_LIMIT: str = "30/minute"
@@ -69,14 +76,29 @@ def load_yaml_with_env(path):
 
 
 class Settings:
+    """Settings from .env and config.yaml.
+
+    The derived sections (POSTGRES, EMBEDDING, SOURCES, LLM) are built on first
+    access and cached; call reload() to re-read both files.
+    """
+
+    _SECTIONS = ("POSTGRES", "EMBEDDING", "SOURCES", "LLM")
+
     def __init__(self):
         self.env = EnvSettings()
         self.yaml = load_yaml_with_env(YAML_PATH)
 
-    @property
+    def reload(self):
+        """Re-read .env and config.yaml and drop the cached sections."""
+        self.__init__()
+        for section in self._SECTIONS:
+            self.__dict__.pop(section, None)
+
+    @cached_property
     def POSTGRES(self):
         vector_store = self.yaml.get("vector_store", {})
         hnsw = vector_store.get("hnsw", {})
+        use_halfvec = vector_store.get("use_halfvec", False)
         return {
             "user": self.env.POSTGRES_USER,
             "password": self.env.POSTGRES_PASSWORD,
@@ -85,23 +107,31 @@ class Settings:
             "database": self.env.POSTGRES_DB,
             "table_name": vector_store.get("table_name", "embeddings"),
             "hybrid_search": vector_store.get("hybrid_search", True),
-            "hnsw_m": hnsw.get("hnsw_m", 16),
-            "hnsw_ef_construction": hnsw.get("hnsw_ef_construction", 64),
-            "hnsw_ef_search": hnsw.get("hnsw_ef_search", 40),
-            "hnsw_dist_method": hnsw.get("hnsw_dist_method", "vector_cosine_ops"),
+            "text_search_index": vector_store.get("text_search_index", "gin"),
+            "use_halfvec": use_halfvec,
+            "hnsw_m": hnsw.get("hnsw_m", 24),
+            "hnsw_ef_construction": hnsw.get("hnsw_ef_construction", 128),
+            "hnsw_ef_search": hnsw.get("hnsw_ef_search", "auto"),
+            "hnsw_maintenance_work_mem": hnsw.get("maintenance_work_mem"),
+            "hnsw_max_parallel_maintenance_workers": hnsw.get("max_parallel_maintenance_workers"),
+            "hnsw_dist_method": hnsw.get(
+                "hnsw_dist_method", "halfvec_cosine_ops" if use_halfvec else "vector_cosine_ops"
+            ),
             "chunk_size": vector_store.get("chunk_size", 512),
             "chunk_overlap": vector_store.get("chunk_overlap", 50),
         }
 
-    @property
+    @cached_property
     def EMBEDDING(self):
         return {
             "provider": self.yaml.get("embedding", {}).get("provider"),
             "model_config": self.yaml.get("embedding", {}).get("model_config"),
             "dim": self.yaml.get("embedding", {}).get("embedding_dim"),
+            # Texts per embedding request / forward pass (LlamaIndex defaults to 10)
+            "embed_batch_size": self.yaml.get("embedding", {}).get("embed_batch_size", 64),
         }
 
-    @property
+    @cached_property
     def SOURCES(self):
         """Generic loader for all sources (S3, future types)"""
         raw_sources = self.yaml.get("sources", [])
@@ -147,7 +177,7 @@ class Settings:
                 )
         return sources
 
-    @property
+    @cached_property
     def LLM(self):
         return {
             "api_key": self.env.OPENROUTER_API_KEY,
@@ -2,7 +2,7 @@ from contextlib import contextmanager
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import NullPool
 
 from utils.config import settings
 
@@ -18,16 +18,31 @@ per_worker_limit = max(1, MAX_TOTAL_CONNECTIONS // CELERY_CONCURRENCY)
 pool_size = max(1, per_worker_limit // 2)
 max_overflow = max(0, per_worker_limit - pool_size)
 
+
+def pool_kwargs(pool_size: int, max_overflow: int) -> dict:
+    """create_engine() pool arguments shared by every engine of the service.
+
+    With DATABASE_NULL_POOL set, connections are opened per checkout and closed on
+    release, leaving pooling to an external pooler such as PgBouncer (transaction mode).
+    """
+    if settings.env.DATABASE_NULL_POOL:
+        return {"poolclass": NullPool}
+    # No explicit poolclass: the default is QueuePool for sync and AsyncAdaptedQueuePool for
+    # async engines, and PGVectorStore passes these arguments to both
+    return {
+        "pool_size": pool_size,  # Number of connections to maintain
+        "max_overflow": max_overflow,  # Additional connections allowed under load
+        "pool_pre_ping": True,  # Verify connections before using them
+        "pool_recycle": 3600,  # Recycle connections after 1 hour
+        "pool_timeout": 30,  # Wait up to 30s for available connection
+    }
+
+
 # Configure connection pool for production use
 engine = create_engine(
     DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=pool_size,  # Number of connections to maintain
-    max_overflow=max_overflow,  # Additional connections allowed under load
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    pool_timeout=30,  # Wait up to 30s for available connection
     echo=False,  # Set to True for SQL query logging in dev
+    **pool_kwargs(pool_size, max_overflow),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -5,6 +5,7 @@ import time
 from typing import Any
 
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +17,19 @@ class RetrySession:
     - Network errors: exponential backoff (2**attempt seconds)
     - HTTP 429: honours Retry-After header, falls back to exponential backoff
     - HTTP 5xx: retries up to max_retries times
+
+    Connections are kept alive per host; pool_maxsize bounds how many are kept, so
+    callers sharing the session across more than 10 threads should raise it.
     """
 
-    def __init__(self, max_retries: int = 3, timeout: int = 30) -> None:
+    def __init__(self, max_retries: int = 3, timeout: int = 30, pool_maxsize: int = DEFAULT_POOLSIZE) -> None:
         self.max_retries = max_retries
         self.timeout = timeout
         self._session = requests.Session()
+        if pool_maxsize > DEFAULT_POOLSIZE:
+            adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
 
     def get(self, url: str, *, params: Any = None, headers: dict | None = None) -> requests.Response:
         return self._request("GET", url, params=params, headers=headers)
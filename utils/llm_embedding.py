@@ -1,5 +1,8 @@
 import os
+from typing import Any
 
+import numpy as np
+from llama_index.core.schema import BaseNode, TransformComponent
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openrouter import OpenRouter
@@ -17,15 +20,39 @@ llm_provider = settings.LLM.get("provider")
 # Initialize embedding model
 if embeddings_provider == "local":
     embed_model = HuggingFaceEmbedding(
-        model_name=settings.EMBEDDING["model_config"], trust_remote_code=True, device="cpu"
+        model_name=settings.EMBEDDING["model_config"],
+        trust_remote_code=True,
+        device="cpu",
+        embed_batch_size=settings.EMBEDDING["embed_batch_size"],
     )
 else:
     embed_model = OpenAIEmbedding(
         api_key=settings.LLM["api_key"],
         api_base=settings.LLM["base_url"],
         model_name=settings.EMBEDDING["model_config"],
+        embed_batch_size=settings.EMBEDDING["embed_batch_size"],
     )
 
+
+def l2_normalize(vector: list[float]) -> list[float]:
+    """Scale an embedding to unit length, so inner product equals cosine similarity (zero vectors are kept)."""
+    array = np.asarray(vector, dtype=np.float64)
+    norm = np.linalg.norm(array)
+    if not norm:
+        return list(vector)
+    return (array / norm).tolist()
+
+
+class NormalizeEmbeddings(TransformComponent):
+    """Ingestion step normalizing node embeddings to unit length (see l2_normalize)."""
+
+    def __call__(self, nodes: list[BaseNode], **kwargs: Any) -> list[BaseNode]:
+        for node in nodes:
+            if node.embedding is not None:
+                node.embedding = l2_normalize(node.embedding)
+        return nodes
+
+
 # Initialize LLM
 llm = None
 if llm_provider in ("openai", "openrouter"):
@@ -33,4 +60,4 @@ if llm_provider in ("openai", "openrouter"):
         api_key=settings.LLM.get("api_key"), model=settings.LLM.get("llm_model"), api_base=settings.LLM["base_url"]
     )
 
-__all__ = ["embed_model", "llm"]
+__all__ = ["NormalizeEmbeddings", "embed_model", "l2_normalize", "llm"]
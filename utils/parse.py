@@ -20,8 +20,8 @@ def parse_timestamp(value: Any) -> datetime | None:
     if not isinstance(value, str):
         return None
     try:
-        normalized = (value[:-1] + "+00:00") if value.endswith("Z") else value
-        return datetime.fromisoformat(normalized)
+        # fromisoformat accepts the "Z" suffix and "+0000" offsets natively since Python 3.11
+        return datetime.fromisoformat(value)
     except (ValueError, TypeError):
         return None
 
@@ -1,4 +1,5 @@
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from utils.config import settings
@@ -11,10 +12,12 @@ def get_s3_client(
     secret_key: str = None,
     region: str = None,
     use_ssl: bool = True,
+    max_pool_connections: int | None = None,
 ):
     """
     Return S3 client + bucket.
     If params are None, fallback to first S3 source in settings.SOURCES.
+    max_pool_connections overrides botocore's connection pool size (default 10).
     """
     try:
         # Use first S3 source if any parameter is missing
@@ -40,6 +43,7 @@ def get_s3_client(
             aws_secret_access_key=secret_key,
             region_name=region,
             use_ssl=use_ssl,
+            config=Config(max_pool_connections=max_pool_connections) if max_pool_connections else None,
         )
         return s3, bucket
     except ClientError as e:
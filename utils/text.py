@@ -6,6 +6,16 @@ import unicodedata
 
 import html2text
 
+_SLUG_DISALLOWED_RE = re.compile(r"[^\w\-_.]")
+_KEY_SEPARATORS_RE = re.compile(r"[ \\/]+")
+# Keys made of allowed characters with single "/" between non-empty segments sanitize to the key with "/" -> "_"
+_SAFE_KEY_RE = re.compile(r"[\w.-]+(?:/[\w.-]+)*", re.ASCII)
+# Deletes every ASCII character other than letters, digits, "-", "_" and "."
+_KEY_DISALLOWED = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if not c.isalnum() and c not in "-_."))
+# MarkItDown's normalization of every conversion result
+_LINE_BREAK_RE = re.compile(r"\r?\n")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
 
 def slugify(
     value: str,
@@ -29,7 +39,7 @@ def slugify(
     result = value
     for src, dst in (extra_replacements or {}).items():
         result = result.replace(src, dst)
-    result = re.sub(r"[^\w\-_.]", "_", result)
+    result = _SLUG_DISALLOWED_RE.sub("_", result)
     result = result.strip("_")[:max_len]
     if not result:
         result = hashlib.md5(value.encode("utf-8"), usedforsecurity=False).hexdigest()[:8]
@@ -44,13 +54,31 @@ def sanitize_ascii_key(value: str, max_len: int = 255) -> str:
     characters. Used for connectors that ingest file paths/keys where stable
     ASCII identifiers are preferred (e.g. S3 keys, local file paths).
     """
-    result = unicodedata.normalize("NFKD", value)
-    result = result.encode("ascii", "ignore").decode("ascii")
-    result = re.sub(r"[ \\/]+", "_", result)
-    result = re.sub(r"[^a-zA-Z0-9\-_\.]", "", result)
+    if _SAFE_KEY_RE.fullmatch(value):
+        return value.replace("/", "_")[:max_len]
+
+    result = value
+    # NFKD leaves ASCII untouched, and most paths/keys are ASCII
+    if not result.isascii():
+        result = unicodedata.normalize("NFKD", result)
+        result = result.encode("ascii", "ignore").decode("ascii")
+    result = _KEY_SEPARATORS_RE.sub("_", result)
+    # The value is ASCII at this point, so a translate table covers every character
+    result = result.translate(_KEY_DISALLOWED)
     return result[:max_len]
 
 
+def normalize_markitdown_text(text: str) -> str:
+    """Normalize text the way MarkItDown normalizes its conversion results.
+
+    Splits lines on LF or CRLF, strips trailing whitespace from each line and
+    collapses runs of three or more newlines into two. Text that skips
+    conversion must go through this to checksum the same as MarkItDown's output.
+    """
+    text = "\n".join(line.rstrip() for line in _LINE_BREAK_RE.split(text))
+    return _BLANK_LINES_RE.sub("\n\n", text)
+
+
 def html_to_markdown(html: str) -> str:
     """Convert an HTML string to plain Markdown using consistent settings.
 